@@ -359,7 +359,7 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'openbook_auth.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.AcceptHeaderVersioning',
     'DEFAULT_THROTTLE_RATES': {
@@ -384,6 +384,8 @@ OS_TRANSLATION_CONFIG = {
     }
 }
 
+TRANSLATION_CACHE_TIMEOUT_IN_SECONDS = int(os.environ.get('TRANSLATION_CACHE_TIMEOUT_IN_SECONDS', '2592000'))
+
 UNICODE_JSON = True
 
 # The sentry DSN for error reporting
@@ -512,7 +514,12 @@ MODERATED_OBJECT_DESCRIPTION_MAX_LENGTH = 1000
 GLOBAL_HIDE_CONTENT_AFTER_REPORTS_AMOUNT = int(os.environ.get('GLOBAL_HIDE_CONTENT_AFTER_REPORTS_AMOUNT', '20'))
 MODERATORS_COMMUNITY_NAME = os.environ.get('MODERATORS_COMMUNITY_NAME', 'mods')
 PROXY_BLACKLIST_DOMAIN_MAX_LENGTH = 150
-LINK_PREVIEW_TIMEOUT_IN_SECONDS = int(os.environ.get('GLOBAL_HIDE_CONTENT_AFTER_REPORTS_AMOUNT', 8))
+PROXY_BLACKLIST_VERSION_CHECK_INTERVAL_IN_SECONDS = int(
+    os.environ.get('PROXY_BLACKLIST_VERSION_CHECK_INTERVAL_IN_SECONDS', '30'))
+LINK_PREVIEW_TIMEOUT_IN_SECONDS = int(os.environ.get('LINK_PREVIEW_TIMEOUT_IN_SECONDS', 8))
+LINK_PREVIEW_CACHE_TIMEOUT_IN_SECONDS = int(os.environ.get('LINK_PREVIEW_CACHE_TIMEOUT_IN_SECONDS', '86400'))
+LINK_PREVIEW_NEGATIVE_CACHE_TIMEOUT_IN_SECONDS = int(
+    os.environ.get('LINK_PREVIEW_NEGATIVE_CACHE_TIMEOUT_IN_SECONDS', '3600'))
 
 SUPPORTED_MEDIA_MIMETYPES = [
     'video/mp4',
@@ -532,6 +539,34 @@ ALERT_HOOK_URL = os.environ.get('ALERT_HOOK_URL')
 MIN_UNIQUE_TOP_POST_REACTIONS_COUNT = int(os.environ.get('MIN_UNIQUE_TOP_POST_REACTIONS_COUNT', '5'))
 MIN_UNIQUE_TOP_POST_COMMENTS_COUNT = int(os.environ.get('MIN_UNIQUE_TOP_POST_COMMENTS_COUNT', '5'))
 MIN_UNIQUE_TRENDING_POST_REACTIONS_COUNT = int(os.environ.get('MIN_UNIQUE_TRENDING_POST_REACTIONS_COUNT', '5'))
+TRENDING_POST_SCORE_HALF_LIFE_IN_HOURS = int(os.environ.get('TRENDING_POST_SCORE_HALF_LIFE_IN_HOURS', '6'))
+
+TIMELINE_MAX_LENGTH = int(os.environ.get('TIMELINE_MAX_LENGTH', '800'))
+TIMELINE_BUILD_TIMEOUT_IN_MINUTES = int(os.environ.get('TIMELINE_BUILD_TIMEOUT_IN_MINUTES', '10'))
+
+POST_NOTIFICATIONS_FAN_OUT_CHUNK_SIZE = int(os.environ.get('POST_NOTIFICATIONS_FAN_OUT_CHUNK_SIZE', '500'))
+POST_SOFT_DELETE_IN_BACKGROUND_MIN_COMMENTS_COUNT = int(
+    os.environ.get('POST_SOFT_DELETE_IN_BACKGROUND_MIN_COMMENTS_COUNT', '500'))
+POST_SOFT_DELETE_NOTIFICATIONS_CHUNK_SIZE = int(os.environ.get('POST_SOFT_DELETE_NOTIFICATIONS_CHUNK_SIZE', '1000'))
+
+USER_VISIBILITY_EXCLUSIONS_CACHE_TIMEOUT_IN_SECONDS = int(
+    os.environ.get('USER_VISIBILITY_EXCLUSIONS_CACHE_TIMEOUT_IN_SECONDS', '3600'))
+
+USER_RELATIONSHIPS_CACHE_MAX_SIZE = int(os.environ.get('USER_RELATIONSHIPS_CACHE_MAX_SIZE', '1000'))
+
+AUTH_TOKEN_CREDENTIALS_CACHE_TIMEOUT_IN_SECONDS = int(
+    os.environ.get('AUTH_TOKEN_CREDENTIALS_CACHE_TIMEOUT_IN_SECONDS', '3600'))
+AUTH_TOKEN_CREDENTIALS_LOCAL_CACHE_TIMEOUT_IN_SECONDS = int(
+    os.environ.get('AUTH_TOKEN_CREDENTIALS_LOCAL_CACHE_TIMEOUT_IN_SECONDS', '5'))
+AUTH_TOKEN_CREDENTIALS_LOCAL_CACHE_MAX_SIZE = int(
+    os.environ.get('AUTH_TOKEN_CREDENTIALS_LOCAL_CACHE_MAX_SIZE', '10000'))
+
+LANGUAGE_DETECTION_IN_BACKGROUND = os.environ.get('LANGUAGE_DETECTION_IN_BACKGROUND', 'True') == 'True'
+LANGUAGE_DETECTION_MAX_TEXT_LENGTH = int(os.environ.get('LANGUAGE_DETECTION_MAX_TEXT_LENGTH', '900'))
+LANGUAGE_DETECTION_CACHE_MAX_SIZE = int(os.environ.get('LANGUAGE_DETECTION_CACHE_MAX_SIZE', '10000'))
+
+NOTIFICATIONS_UNREAD_COUNTS_CACHE_TIMEOUT_IN_SECONDS = int(
+    os.environ.get('NOTIFICATIONS_UNREAD_COUNTS_CACHE_TIMEOUT_IN_SECONDS', '86400'))
 
 # Email Config
 
@@ -555,6 +590,7 @@ if TESTING:
     MIN_UNIQUE_TOP_POST_REACTIONS_COUNT = 1
     MIN_UNIQUE_TOP_POST_COMMENTS_COUNT = 1
     MIN_UNIQUE_TRENDING_POST_REACTIONS_COUNT = 1
+    LANGUAGE_DETECTION_IN_BACKGROUND = False
 
 if IS_PRODUCTION:
     AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
@@ -583,7 +619,10 @@ if IS_PRODUCTION:
 # ONE SIGNAL
 ONE_SIGNAL_APP_ID = os.environ.get('ONE_SIGNAL_APP_ID')
 ONE_SIGNAL_API_KEY = os.environ.get('ONE_SIGNAL_API_KEY')
+ONE_SIGNAL_API_ROOT = os.environ.get('ONE_SIGNAL_API_ROOT', 'https://onesignal.com/api/v1')
+ONE_SIGNAL_TIMEOUT_IN_SECONDS = int(os.environ.get('ONE_SIGNAL_TIMEOUT_IN_SECONDS', '10'))
 
 # Peekalink
 
 PEEKALINK_API_KEY = os.environ.get('PEEKALINK_API_KEY', None)
+PEEKALINK_API_ROOT = os.environ.get('PEEKALINK_API_ROOT', 'https://api.peekalink.io')
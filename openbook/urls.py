@@ -71,7 +71,7 @@ from openbook_moderation.views.report.views import ReportUser, ReportPost, Repor
     ReportPostComment, ReportHashtag
 from openbook_moderation.views.user.views import UserModerationPenalties, UserPendingModeratedObjectsCommunities
 from openbook_notifications.views import Notifications, NotificationItem, ReadNotifications, ReadNotification, \
-    UnreadNotificationsCount
+    UnreadNotificationsCount, UnreadNotificationsCountChanges
 from openbook_posts.views.post.views import PostItem, PostOpen, PostClose, MutePost, UnmutePost, TranslatePost, \
     PostPreviewLinkData, SearchPostParticipants, GetPostParticipants, PublishPost, PostStatus
 from openbook_posts.views.post_comment.post_comment_reaction.views import PostCommentReactionItem
@@ -384,6 +384,8 @@ notifications_patterns = [
     path('', Notifications.as_view(), name='notifications'),
     path('read/', ReadNotifications.as_view(), name='read-notifications'),
     path('unread/count/', UnreadNotificationsCount.as_view(), name='unread-notifications-count'),
+    path('unread/count/changes/', UnreadNotificationsCountChanges.as_view(),
+         name='unread-notifications-count-changes'),
     path('<int:notification_id>/', include(notification_patterns)),
 ]
 
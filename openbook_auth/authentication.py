@@ -0,0 +1,65 @@
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from openbook_auth.token_credentials import get_token_credentials
+from openbook_common.utils.model_loaders import get_user_model
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication answering from the cached credentials of the token, so authenticating a request and
+    checking whether its user is suspended usually costs no queries. The user is only loaded once the request
+    needs more than that, with its relationships cache enabled for the request.
+    """
+
+    def authenticate_credentials(self, key):
+        token_credentials = get_token_credentials(key)
+
+        if token_credentials is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token_credentials['is_active'] or token_credentials['is_deleted']:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return TokenUser(user_id=token_credentials['user_id'],
+                         suspension_expiration=token_credentials['suspension_expiration']), key
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    The authenticated user of a token, loaded from the database the first time it's used for anything else than
+    its id, being authenticated or being suspended
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, suspension_expiration):
+        def load_user():
+            User = get_user_model()
+            user = User.objects.get(pk=user_id)
+            user.enable_relationships_cache()
+            return user
+
+        super(TokenUser, self).__init__(load_user)
+        # Set on the lazy object itself, setting an attribute would load the user
+        self.__dict__['_user_id'] = user_id
+        self.__dict__['_suspension_expiration'] = suspension_expiration
+
+    @property
+    def pk(self):
+        return self.__dict__['_user_id']
+
+    @property
+    def id(self):
+        return self.__dict__['_user_id']
+
+    def is_suspended(self):
+        suspension_expiration = self.__dict__['_suspension_expiration']
+        return suspension_expiration is not None and suspension_expiration > timezone.now()
+
+    def __bool__(self):
+        return True
@@ -0,0 +1,36 @@
+from django_rq import job
+import logging
+
+from openbook_common.utils.model_loaders import get_user_model, get_user_profile_model
+
+logger = logging.getLogger(__name__)
+
+
+@job('low')
+def reconcile_users_profiles_counts(chunk_size=1000):
+    """
+    This job should be scheduled to rebuild the stored followers, following and posts counts of every user, fixing
+    the ones that drifted from changes made without going through the models, e.g. deleted users or communities
+    whose type changed
+    """
+    User = get_user_model()
+    UserProfile = get_user_profile_model()
+
+    last_user_id = 0
+    reconciled_users = 0
+
+    while True:
+        users_ids = list(User.objects.filter(pk__gt=last_user_id).order_by('pk').values_list('pk', flat=True)[
+                         :chunk_size])
+
+        if not users_ids:
+            break
+
+        for user_id in users_ids:
+            UserProfile.rebuild_follows_counts_for_user_with_id(user_id=user_id)
+            UserProfile.rebuild_posts_counts_for_user_with_id(user_id=user_id)
+
+        reconciled_users += len(users_ids)
+        last_user_id = users_ids[-1]
+
+    return 'Reconciled the profile counts of %s users' % str(reconciled_users)
@@ -0,0 +1,69 @@
+# Generated by Django 2.2.16 on 2026-10-16 10:12
+
+from django.db import migrations, models
+
+
+def populate_users_profiles_counts(apps, schema_editor):
+    UserProfile = apps.get_model('openbook_auth', 'UserProfile')
+    Follow = apps.get_model('openbook_follows', 'Follow')
+    Post = apps.get_model('openbook_posts', 'Post')
+
+    followers_counts = {}
+    for followed_user_id, count in Follow.objects.values_list('followed_user_id').annotate(
+            count=models.Count('id')).order_by():
+        followers_counts[followed_user_id] = count
+
+    following_counts = {}
+    for user_id, count in Follow.objects.values_list('user_id').annotate(count=models.Count('id')).order_by():
+        following_counts[user_id] = count
+
+    posts_counts = {}
+    for creator_id, count in Post.objects.values_list('creator_id').annotate(count=models.Count('id')).order_by():
+        posts_counts[creator_id] = count
+
+    # The public and community posts counts need the world circle and the moderation state of the posts,
+    # they are filled by the openbook_auth.jobs.reconcile_users_profiles_counts job
+    for user_id in set(followers_counts) | set(following_counts) | set(posts_counts):
+        UserProfile.objects.filter(user_id=user_id).update(
+            followers_count=followers_counts.get(user_id, 0),
+            following_count=following_counts.get(user_id, 0),
+            posts_count=posts_counts.get(user_id, 0),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_auth', '0053_auto_20200510_1634'),
+        ('openbook_follows', '0001_initial'),
+        ('openbook_posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='community_posts_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='public_posts_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_users_profiles_counts, migrations.RunPython.noop),
+    ]
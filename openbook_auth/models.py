@@ -6,7 +6,8 @@ from django.contrib.auth.validators import UnicodeUsernameValidator, ASCIIUserna
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 from django.contrib.auth.models import AbstractUser
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import six, timezone, translation
 from django.template.loader import render_to_string
@@ -19,16 +20,25 @@ from django.core.mail import EmailMultiAlternatives
 
 from openbook.settings import USERNAME_MAX_LENGTH
 from openbook_auth.helpers import upload_to_user_cover_directory, upload_to_user_avatar_directory
-from openbook_common.peekalink_client import peekalink_client
+from openbook_auth.relationships_cache import UserRelationshipsCache
+from openbook_auth.token_credentials import invalidate_token_credentials, invalidate_token_credentials_for_user_with_id
+from openbook_common.link_previews import get_link_preview
 from openbook_hashtags.queries import make_search_hashtag_query_for_user_with_id, \
     make_get_hashtag_with_name_for_user_with_id_query
 from openbook_notifications.helpers import get_notification_language_code_for_target_user
-from openbook_posts.queries import make_get_hashtag_posts_for_user_with_id_query
+from openbook_notifications.unread_notifications_counts import count_unread_notifications, \
+    get_unread_notifications_counts, get_unread_notifications_version, clear_unread_notifications_counts, \
+    clear_unread_notifications_counts_on_commit, decrement_unread_notifications_count
+from openbook_posts.jobs import rebuild_timeline_for_user_with_id
+from openbook_posts.queries import make_get_hashtag_posts_for_user_query, \
+    make_exclude_posts_hidden_by_visibility_exclusions_query, make_exclude_posts_with_ids_query, \
+    make_exclude_posts_of_users_with_ids_query, make_exclude_posts_of_communities_with_ids_query
 from openbook_posts.query_collections import get_posts_for_user_collection
-from openbook_translation import translation_strategy
+from openbook_translation.translations import translate_text
 from openbook_common.helpers import get_supported_translation_language
 from openbook_common.models import Badge, Language
 from openbook_common.utils.helpers import delete_file_field
+from openbook_common.utils.pagination import paginate_queryset_by_id, paginate_union_by_id, union_querysets_pages
 from openbook_common.utils.model_loaders import get_connection_model, get_circle_model, get_follow_model, \
     get_list_model, get_community_invite_model, \
     get_post_comment_notification_model, get_follow_notification_model, get_connection_confirmed_notification_model, \
@@ -38,7 +48,8 @@ from openbook_common.utils.model_loaders import get_connection_model, get_circle
     get_moderation_penalty_model, get_post_comment_mute_model, get_post_comment_reaction_model, \
     get_post_comment_reaction_notification_model, get_top_post_model, get_top_post_community_exclusion_model, \
     get_hashtag_model, get_profile_posts_community_exclusion_model, get_user_new_post_notification_model, \
-    get_follow_request_model, get_follow_request_notification_model, get_follow_request_approved_notification_model
+    get_follow_request_model, get_follow_request_notification_model, get_follow_request_approved_notification_model, \
+    get_timeline_model
 from openbook_common.validators import name_characters_validator
 from openbook_notifications import helpers
 from openbook_auth.checkers import *
@@ -218,9 +229,10 @@ class User(AbstractUser):
         Count public posts for unauthenticated user
         :return:
         """
-        public_posts = cls.get_unauthenticated_public_posts_for_user_with_username(username=username)
+        user = cls.objects.select_related('profile').get(username=username)
+        check_can_get_unauthenticated_posts_for_user(user)
 
-        return public_posts.count()
+        return user.count_public_posts()
 
     @classmethod
     def get_unauthenticated_public_posts_for_user_with_username(cls, username, max_id=None, min_id=None):
@@ -240,7 +252,7 @@ class User(AbstractUser):
             user_query.add(Q(id__gt=min_id), Q.AND)
 
         posts_prefetch_related = (
-            'circles', 'creator', 'creator__profile__badges', 'hashtags', 'community')
+            'circles', 'creator', 'creator__profile__badges', 'hashtags', 'community', 'counter')
 
         posts_only = ('text', 'id', 'uuid', 'created',
                       'creator__username', 'creator__id', 'creator__profile__name',
@@ -293,12 +305,29 @@ class User(AbstractUser):
     def count_posts(self):
         return self.posts.count()
 
+    def count_public_posts(self):
+        """
+        Returns the stored count of the posts everyone can see, in the world circle and in public communities
+        """
+        public_posts_count = self.profile.public_posts_count
+
+        if self.has_profile_community_posts_visible():
+            public_posts_count += self.profile.community_posts_count
+
+        return public_posts_count
+
     def count_moderation_penalties_for_moderation_severity(self, moderation_severity):
         return self.moderation_penalties.filter(
             moderated_object__category__severity=moderation_severity).count()
 
-    def count_unread_notifications(self):
-        return self.notifications.filter(read=False).count()
+    def count_unread_notifications(self, types=None):
+        return count_unread_notifications(user_id=self.pk, types=types)
+
+    def get_unread_notifications_counts(self):
+        return get_unread_notifications_counts(user_id=self.pk)
+
+    def get_unread_notifications_version(self):
+        return get_unread_notifications_version(user_id=self.pk)
 
     def count_public_posts_for_user(self, user):
         """
@@ -317,10 +346,12 @@ class User(AbstractUser):
 
         exclude_reported_and_approved_posts_query = ~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED)
 
-        exclude_reported_posts_query = ~Q(moderated_object__reports__reporter_id=self.pk)
+        visibility_exclusions = self.get_visibility_exclusions()
 
-        exclude_blocked_posts_query = ~Q(Q(creator__blocked_by_users__blocker_id=self.pk) | Q(
-            creator__user_blocks__blocked_user_id=self.pk))
+        exclude_reported_posts_query = make_exclude_posts_with_ids_query(visibility_exclusions['reported_posts_ids'])
+
+        exclude_blocked_posts_query = make_exclude_posts_of_users_with_ids_query(
+            visibility_exclusions['blocked_users_ids'])
 
         exclude_deleted_posts_query = Q(is_deleted=False, status=Post.STATUS_PUBLISHED)
 
@@ -372,7 +403,7 @@ class User(AbstractUser):
         Count how many posts are with the given hashtag name relative to the user
         """
         Post = get_post_model()
-        hashtag_posts_query = make_get_hashtag_posts_for_user_with_id_query(user_id=self.pk, hashtag=hashtag)
+        hashtag_posts_query = make_get_hashtag_posts_for_user_query(user=self, hashtag=hashtag)
 
         return Post.objects.filter(hashtag_posts_query).distinct().cache().count()
 
@@ -383,11 +414,30 @@ class User(AbstractUser):
         :return: count
         """
         user = User.objects.get(pk=user_id)
+        return self.count_posts_for_user(user=user)
+
+    def count_posts_for_user(self, user):
+        """
+        Count how many posts has the user created relative to another user.
+        The stored count is used unless the other user can see more posts, being connected, or fewer, being blocked
+        with us or having reported some of our posts.
+        """
         if user.is_connected_with_user_with_id(self.pk):
-            count = user.get_posts_for_user_with_username(username=self.username).count()
-        else:
-            count = user.count_public_posts_for_user(user=self)
-        return count
+            return user.get_posts_for_user_with_username(username=self.username).count()
+
+        if user.is_blocked_with_user_with_id(self.pk) or user.has_reported_posts_of_user_with_id(self.pk):
+            return user.count_public_posts_for_user(user=self)
+
+        return self.count_public_posts()
+
+    def has_reported_posts_of_user_with_id(self, user_id):
+        reported_posts_ids = self.get_visibility_exclusions()['reported_posts_ids']
+
+        if not reported_posts_ids:
+            return False
+
+        Post = get_post_model()
+        return Post.objects.filter(pk__in=reported_posts_ids, creator_id=user_id).exists()
 
     def count_followers(self):
         Follow = get_follow_model()
@@ -421,6 +471,7 @@ class User(AbstractUser):
         self.delete_all_notifications()
         self.is_deleted = True
         self.save()
+        invalidate_token_credentials_for_user_with_id(user_id=self.pk)
 
     def unsoft_delete(self):
         for post in self.posts.all.iterator():
@@ -431,6 +482,7 @@ class User(AbstractUser):
 
         self.is_deleted = False
         self.save()
+        invalidate_token_credentials_for_user_with_id(user_id=self.pk)
 
     def update_profile_cover(self, cover, save=True):
         if cover is None:
@@ -627,6 +679,11 @@ class User(AbstractUser):
         return self.is_connected_with_user_with_id(user.pk)
 
     def is_connected_with_user_with_id(self, user_id):
+        connected_users_ids = self._get_cached_relationship('connected_users_ids')
+
+        if connected_users_ids is not None:
+            return user_id in connected_users_ids
+
         return self.connections.filter(
             target_connection__user_id=user_id).exists()
 
@@ -656,8 +713,21 @@ class User(AbstractUser):
         return self.is_following_user_with_id(user.pk)
 
     def is_following_user_with_id(self, user_id):
+        followed_users_ids = self._get_cached_relationship('followed_users_ids')
+
+        if followed_users_ids is not None:
+            return user_id in followed_users_ids
+
         return self.follows.filter(followed_user__id=user_id).exists()
 
+    def is_followed_by_user_with_id(self, user_id):
+        follower_users_ids = self._get_cached_relationship('follower_users_ids')
+
+        if follower_users_ids is not None:
+            return user_id in follower_users_ids
+
+        return self.followers.filter(user_id=user_id).exists()
+
     def is_following_user_with_username(self, user_username):
         return self.follows.filter(followed_user__username=user_username).exists()
 
@@ -710,18 +780,97 @@ class User(AbstractUser):
         return post.creator_id == self.pk
 
     def has_muted_post_with_id(self, post_id):
+        muted_posts_ids = self._get_cached_relationship('muted_posts_ids')
+
+        if muted_posts_ids is not None:
+            return post_id in muted_posts_ids
+
         return self.post_mutes.filter(post_id=post_id).exists()
 
     def has_muted_post_comment_with_id(self, post_comment_id):
         return self.post_comment_mutes.filter(post_comment_id=post_comment_id).exists()
 
     def has_blocked_user_with_id(self, user_id):
+        user_blocks = self._get_cached_relationship('user_blocks')
+
+        if user_blocks is not None:
+            return user_id in user_blocks['blocked_users_ids']
+
         return self.user_blocks.filter(blocked_user_id=user_id).exists()
 
     def is_blocked_with_user_with_id(self, user_id):
+        user_blocks = self._get_cached_relationship('user_blocks')
+
+        if user_blocks is not None:
+            return user_id in user_blocks['blocked_with_users_ids']
+
         UserBlock = get_user_block_model()
         return UserBlock.users_are_blocked(user_a_id=self.pk, user_b_id=user_id)
 
+    def has_user_blocks(self):
+        user_blocks = self._get_cached_relationship('user_blocks')
+
+        if user_blocks is not None:
+            return len(user_blocks['blocked_with_users_ids']) > 0
+
+        UserBlock = get_user_block_model()
+        return UserBlock.objects.filter(Q(blocker_id=self.pk) | Q(blocked_user_id=self.pk)).exists()
+
+    def get_visibility_exclusions(self):
+        """
+        Returns the ids of the users we blocked or that blocked us, of the posts we reported and of the
+        communities we're banned from. Kept in the cache until one of them changes, so the posts queries
+        can exclude them with short lists of ids instead of joining the blocks, reports and bans tables.
+        """
+        cache_key = self._get_visibility_exclusions_cache_key()
+        visibility_exclusions = cache.get(cache_key)
+
+        if visibility_exclusions is None:
+            UserBlock = get_user_block_model()
+            ModeratedObject = get_moderated_object_model()
+            ModerationReport = get_moderation_report_model()
+
+            user_blocks = UserBlock.objects.filter(Q(blocker_id=self.pk) | Q(blocked_user_id=self.pk)).values_list(
+                'blocker_id', 'blocked_user_id')
+
+            blocked_users_ids = {user_id for user_block in user_blocks for user_id in user_block}
+            blocked_users_ids.discard(self.pk)
+
+            reported_posts_ids = ModerationReport.objects.filter(
+                reporter_id=self.pk,
+                moderated_object__object_type=ModeratedObject.OBJECT_TYPE_POST).values_list(
+                'moderated_object__object_id', flat=True)
+
+            banned_communities_ids = self.banned_of_communities.values_list('id', flat=True)
+
+            visibility_exclusions = {
+                'blocked_users_ids': sorted(blocked_users_ids),
+                'reported_posts_ids': sorted(reported_posts_ids),
+                'banned_communities_ids': sorted(banned_communities_ids),
+            }
+
+            cache.set(cache_key, visibility_exclusions,
+                      timeout=settings.USER_VISIBILITY_EXCLUSIONS_CACHE_TIMEOUT_IN_SECONDS)
+
+        return visibility_exclusions
+
+    def invalidate_visibility_exclusions(self):
+        cache.delete(self._get_visibility_exclusions_cache_key())
+
+    def enable_relationships_cache(self):
+        """
+        Answers the relationship predicates, e.g. is_following_user_with_id, from the relationships loaded
+        once for this instance instead of a query per call. Only meant for the short lived instance of the
+        request user, the writes of other instances aren't seen.
+        """
+        self._relationships_cache = UserRelationshipsCache(user=self)
+
+    def invalidate_relationships_cache(self):
+        relationships_cache = getattr(self, '_relationships_cache', None)
+
+        if relationships_cache is not None:
+            relationships_cache.clear()
+
     def has_circles_with_ids(self, circles_ids):
         return self.circles.filter(id__in=circles_ids).count() == len(circles_ids)
 
@@ -733,6 +882,11 @@ class User(AbstractUser):
                                                        community__name=community_name).exists()
 
     def is_administrator_of_community_with_name(self, community_name):
+        communities_memberships = self._get_cached_relationship('communities_memberships')
+
+        if communities_memberships is not None:
+            return communities_memberships.get(community_name, {}).get('is_administrator', False)
+
         return self.communities_memberships.filter(community__name=community_name, is_administrator=True).exists()
 
     def is_staff_of_community_with_name(self, community_name):
@@ -743,6 +897,11 @@ class User(AbstractUser):
         return self.communities_memberships.all().exists()
 
     def is_member_of_community_with_name(self, community_name):
+        communities_memberships = self._get_cached_relationship('communities_memberships')
+
+        if communities_memberships is not None:
+            return community_name in communities_memberships
+
         return self.communities_memberships.filter(community__name=community_name).exists()
 
     def is_banned_from_community_with_name(self, community_name):
@@ -752,9 +911,19 @@ class User(AbstractUser):
         return self.created_communities.filter(name=community_name).exists()
 
     def is_moderator_of_community_with_name(self, community_name):
+        communities_memberships = self._get_cached_relationship('communities_memberships')
+
+        if communities_memberships is not None:
+            return communities_memberships.get(community_name, {}).get('is_moderator', False)
+
         return self.communities_memberships.filter(community__name=community_name, is_moderator=True).exists()
 
     def is_suspended(self):
+        is_suspended = self._get_cached_relationship('is_suspended')
+
+        if is_suspended is not None:
+            return is_suspended
+
         ModerationPenalty = get_moderation_penalty_model()
         return self.moderation_penalties.filter(type=ModerationPenalty.TYPE_SUSPENSION,
                                                 expiration__gt=timezone.now()).exists()
@@ -880,6 +1049,13 @@ class User(AbstractUser):
                                                moderated_object__object_type=ModeratedObject.OBJECT_TYPE_POST_COMMENT
                                                ).exists()
 
+    def has_reported_post_comments(self):
+        ModeratedObject = get_moderated_object_model()
+        ModerationReport = get_moderation_report_model()
+        return ModerationReport.objects.filter(reporter_id=self.pk,
+                                               moderated_object__object_type=ModeratedObject.OBJECT_TYPE_POST_COMMENT
+                                               ).exists()
+
     def has_reported_post_with_id(self, post_id):
         ModeratedObject = get_moderated_object_model()
         ModerationReport = get_moderation_report_model()
@@ -1031,6 +1207,63 @@ class User(AbstractUser):
 
         return [{'emoji': emoji, 'count': emoji.post_reactions__count} for emoji in emojis]
 
+    def get_emoji_counts_for_posts(self, posts):
+        """
+        Returns the reactions emoji counts of each of the posts, as get_emoji_counts_for_post would for each one,
+        with a query for the counts and another one for their emojis.
+        The posts must be ones we can see, e.g. a page of a feed.
+        """
+        posts_ids_by_community_id = {}
+        communities = {}
+
+        for post in posts:
+            posts_ids_by_community_id.setdefault(post.community_id, []).append(post.pk)
+            communities[post.community_id] = post.community
+
+        reactions_query = Q()
+
+        for community_id, posts_ids in posts_ids_by_community_id.items():
+            community_reactions_query = Q(post_id__in=posts_ids)
+            post_community = communities[community_id]
+
+            if not post_community:
+                # Exclude blocked users reactions
+                community_reactions_query.add(~Q(Q(reactor__blocked_by_users__blocker_id=self.pk) | Q(
+                    reactor__user_blocks__blocked_user_id=self.pk)), Q.AND)
+            elif not self.is_staff_of_community_with_name(community_name=post_community.name):
+                # Exclude blocked users reactions, except from staff members
+                blocked_users_query = ~Q(Q(reactor__blocked_by_users__blocker_id=self.pk) | Q(
+                    reactor__user_blocks__blocked_user_id=self.pk))
+                blocked_users_query_staff_members = Q(
+                    reactor__communities_memberships__community_id=post_community.pk)
+                blocked_users_query_staff_members.add(Q(reactor__communities_memberships__is_administrator=True) | Q(
+                    reactor__communities_memberships__is_moderator=True), Q.AND)
+
+                blocked_users_query.add(~blocked_users_query_staff_members, Q.AND)
+                community_reactions_query.add(blocked_users_query, Q.AND)
+
+            reactions_query.add(community_reactions_query, Q.OR)
+
+        posts_emoji_counts = {post.pk: [] for post in posts}
+
+        if not posts_emoji_counts:
+            return posts_emoji_counts
+
+        PostReaction = get_post_reaction_model()
+        emoji_counts = list(PostReaction.objects.filter(reactions_query).values(
+            'post_id', 'emoji_id').annotate(count=Count('id')).order_by('post_id', '-count'))
+
+        Emoji = get_emoji_model()
+        emojis = Emoji.objects.in_bulk({emoji_count['emoji_id'] for emoji_count in emoji_counts})
+
+        for emoji_count in emoji_counts:
+            posts_emoji_counts[emoji_count['post_id']].append({
+                'emoji': emojis[emoji_count['emoji_id']],
+                'count': emoji_count['count']
+            })
+
+        return posts_emoji_counts
+
     def get_emoji_counts_for_post_comment_with_id(self, post_comment_id, emoji_id=None):
         PostComment = get_post_comment_model()
         post_comment = PostComment.objects.get(pk=post_comment_id)
@@ -1163,7 +1396,9 @@ class User(AbstractUser):
     def get_comments_for_post_with_id(self, post_id, min_id=None, max_id=None):
         Post = get_post_model()
         post = Post.objects.get(pk=post_id)
+        return self.get_comments_for_post(post=post, min_id=min_id, max_id=max_id)
 
+    def get_comments_for_post(self, post, min_id=None, max_id=None):
         check_can_get_comments_for_post(user=self, post=post)
 
         comments_query = self._make_get_comments_for_post_query(post=post, max_id=max_id, min_id=min_id)
@@ -1171,6 +1406,83 @@ class User(AbstractUser):
         PostComment = get_post_comment_model()
         return PostComment.objects.filter(comments_query)
 
+    def get_first_replies_for_post_comments(self, post, post_comments_ids, count, sort_query='-created'):
+        """
+        Returns the first count replies of each of the post comments, read with a single query.
+        The post comments must come from get_comments_for_post, which checked we can see them.
+        """
+        replies_query = self._make_get_comments_for_post_query(post=post,
+                                                               post_comments_parents_ids=post_comments_ids)
+
+        PostComment = get_post_comment_model()
+        replies = PostComment.objects.filter(replies_query)
+
+        # The ids follow the creation order
+        ordering = '-id' if sort_query.startswith('-') else 'id'
+
+        replies_pages = [replies.filter(parent_comment_id=post_comment_id).order_by(ordering)[:count] for
+                         post_comment_id in post_comments_ids]
+
+        post_comments_replies = {post_comment_id: [] for post_comment_id in post_comments_ids}
+
+        for reply in union_querysets_pages(replies_pages, ordering=ordering):
+            post_comments_replies[reply.parent_comment_id].append(reply)
+
+        return post_comments_replies
+
+    def get_replies_counts_for_post_comments(self, post, post_comments_ids):
+        """
+        Returns the replies count of each of the post comments, as get_replies_count_for_post_comment
+        would for each one, with a single query.
+        """
+        PostComment = get_post_comment_model()
+        return PostComment.get_replies_counts_for_post_comments_with_ids_with_user(
+            post=post, post_comments_ids=post_comments_ids, user=self)
+
+    def get_emoji_counts_for_post_comments(self, post, post_comments_ids):
+        """
+        Returns the reactions emoji counts of each of the post comments, as get_emoji_counts_for_post_comment
+        would for each one, with a query for the counts and another one for their emojis.
+        The post comments must come from get_comments_for_post, which checked we can see them.
+        """
+        reactions_query = Q(post_comment_id__in=post_comments_ids)
+
+        post_community = post.community
+
+        if not post_community:
+            # Exclude blocked users reactions
+            reactions_query.add(~Q(Q(reactor__blocked_by_users__blocker_id=self.pk) | Q(
+                reactor__user_blocks__blocked_user_id=self.pk)), Q.AND)
+        elif not self.is_staff_of_community_with_name(community_name=post_community.name):
+            # Exclude blocked users reactions, except from staff members
+            blocked_users_query = ~Q(Q(reactor__blocked_by_users__blocker_id=self.pk) | Q(
+                reactor__user_blocks__blocked_user_id=self.pk))
+            blocked_users_query_staff_members = Q(reactor__communities_memberships__community_id=post_community.pk)
+            blocked_users_query_staff_members.add(Q(reactor__communities_memberships__is_administrator=True) | Q(
+                reactor__communities_memberships__is_moderator=True), Q.AND)
+
+            blocked_users_query.add(~blocked_users_query_staff_members, Q.AND)
+            reactions_query.add(blocked_users_query, Q.AND)
+
+        PostCommentReaction = get_post_comment_reaction_model()
+        emoji_counts = PostCommentReaction.objects.filter(reactions_query).values(
+            'post_comment_id', 'emoji_id').annotate(count=Count('id')).order_by('post_comment_id', '-count')
+
+        emoji_counts = list(emoji_counts)
+
+        Emoji = get_emoji_model()
+        emojis = Emoji.objects.in_bulk({emoji_count['emoji_id'] for emoji_count in emoji_counts})
+
+        post_comments_emoji_counts = {post_comment_id: [] for post_comment_id in post_comments_ids}
+
+        for emoji_count in emoji_counts:
+            post_comments_emoji_counts[emoji_count['post_comment_id']].append({
+                'emoji': emojis[emoji_count['emoji_id']],
+                'count': emoji_count['count']
+            })
+
+        return post_comments_emoji_counts
+
     def get_comment_replies_for_comment_with_id_with_post_with_uuid(self, post_comment_id, post_uuid, min_id=None,
                                                                     max_id=None):
         PostComment = get_post_comment_model()
@@ -1193,6 +1505,14 @@ class User(AbstractUser):
     def get_comments_count_for_post(self, post):
         return post.count_comments_with_user(user=self)
 
+    def get_comments_counts_for_posts(self, posts):
+        """
+        Returns the comments count of each of the posts, as get_comments_count_for_post would for each one,
+        with a single query.
+        """
+        Post = get_post_model()
+        return Post.get_comments_counts_for_posts_with_user(posts=posts, user=self)
+
     def get_replies_count_for_post_comment(self, post_comment):
         return post_comment.count_replies_with_user(user=self)
 
@@ -1250,9 +1570,17 @@ class User(AbstractUser):
             'id', 'username', 'notifications_settings__post_comment_notifications')
         PostCommentNotification = get_post_comment_notification_model()
 
+        post_notification_target_users = list(post_notification_target_users)
+
+        PostComment = get_post_comment_model()
+        users_ids_that_can_see_post_comment = PostComment.get_ids_of_users_that_can_see_post_comment(
+            post_comment=post_comment,
+            users_ids=[post_notification_target_user.pk for post_notification_target_user in
+                       post_notification_target_users])
+
         for post_notification_target_user in post_notification_target_users:
             if post_notification_target_user.pk == post_commenter.pk or \
-                    not post_notification_target_user.can_see_post_comment(post_comment=post_comment):
+                    post_notification_target_user.pk not in users_ids_that_can_see_post_comment:
                 continue
             post_notification_target_user_is_post_creator = post_notification_target_user.id == post_creator.id
             post_notification_target_has_comment_notifications_enabled = post_notification_target_user.has_comment_notifications_enabled_for_post_with_id(
@@ -1310,9 +1638,17 @@ class User(AbstractUser):
 
         PostCommentReplyNotification = get_post_comment_reply_notification_model()
 
+        post_notification_target_users = list(post_notification_target_users)
+
+        PostComment = get_post_comment_model()
+        users_ids_that_can_see_post_comment_reply = PostComment.get_ids_of_users_that_can_see_post_comment(
+            post_comment=post_comment_reply,
+            users_ids=[post_notification_target_user.pk for post_notification_target_user in
+                       post_notification_target_users])
+
         for post_notification_target_user in post_notification_target_users:
             if post_notification_target_user.pk == replier.pk or \
-                    not post_notification_target_user.can_see_post_comment(post_comment=post_comment_reply):
+                    post_notification_target_user.pk not in users_ids_that_can_see_post_comment_reply:
                 continue
             post_notification_target_user_is_post_comment_creator = post_notification_target_user.id == comment_creator
             post_notification_target_user_is_post_creator = post_notification_target_user.id == post_creator.id
@@ -1403,8 +1739,12 @@ class User(AbstractUser):
     def delete_circle_with_id(self, circle_id):
         check_can_delete_circle_with_id(user=self, circle_id=circle_id)
         circle = self.circles.get(id=circle_id)
+        circle_users_ids = list(circle.connections.values_list('target_user_id', flat=True))
         circle.delete()
 
+        Timeline = get_timeline_model()
+        Timeline.invalidate_timelines_for_users_with_ids(users_ids=circle_users_ids)
+
     def update_circle(self, circle, **kwargs):
         return self.update_circle_with_id(circle.pk, **kwargs)
 
@@ -1459,6 +1799,10 @@ class User(AbstractUser):
         check_is_connected_with_user_with_id_in_circle_with_id(user=self, user_id=user_id, circle_id=circle_id)
         connection = self.get_connection_for_user_with_id(user_id)
         connection.circles.remove(circle_id)
+
+        Timeline = get_timeline_model()
+        Timeline.invalidate_timelines_for_users_with_ids(users_ids=[user_id])
+
         return connection
 
     def add_circle_with_id_to_connection_with_user_with_id(self, user_id, circle_id):
@@ -1466,6 +1810,10 @@ class User(AbstractUser):
         check_is_not_connected_with_user_with_id_in_circle_with_id(user=self, user_id=user_id, circle_id=circle_id)
         connection = self.get_connection_for_user_with_id(user_id)
         connection.circles.add(circle_id)
+
+        Timeline = get_timeline_model()
+        Timeline.invalidate_timelines_for_users_with_ids(users_ids=[user_id])
+
         return connection
 
     def get_circle_with_id(self, circle_id):
@@ -1504,6 +1852,8 @@ class User(AbstractUser):
                                                categories_names=categories_names,
                                                invites_enabled=invites_enabled)
 
+        self.invalidate_relationships_cache()
+
         return community
 
     def delete_community(self, community):
@@ -1517,6 +1867,8 @@ class User(AbstractUser):
 
         community.delete()
 
+        self.invalidate_relationships_cache()
+
     def update_community(self, community, title=None, name=None, description=None, color=None, type=None,
                          user_adjective=None,
                          users_adjective=None, rules=None):
@@ -1613,6 +1965,11 @@ class User(AbstractUser):
         community_to_join = Community.objects.get(name=community_name)
         community_to_join.add_member(self)
 
+        self.invalidate_relationships_cache()
+
+        Timeline = get_timeline_model()
+        Timeline.invalidate_timelines_for_users_with_ids(users_ids=[self.pk])
+
         # Clean up_full any invites
         CommunityInvite = get_community_invite_model()
         CommunityInvite.objects.filter(community__name=community_name, invited_user__username=self.username).delete()
@@ -1637,6 +1994,12 @@ class User(AbstractUser):
 
         community_to_leave.remove_member(self)
 
+        self.invalidate_relationships_cache()
+
+        Timeline = get_timeline_model()
+        Timeline.remove_posts_of_community_with_id_from_timeline_for_user_with_id(community_id=community_to_leave.pk,
+                                                                                 user_id=self.pk)
+
         return community_to_leave
 
     def invite_user_with_username_to_community_with_name(self, username, community_name):
@@ -1802,6 +2165,7 @@ class User(AbstractUser):
 
         community_to_ban_user_from.banned_users.add(user_to_ban)
         community_to_ban_user_from.create_user_ban_log(source_user=self, target_user=user_to_ban)
+        user_to_ban.invalidate_visibility_exclusions()
 
         return community_to_ban_user_from
 
@@ -1815,6 +2179,7 @@ class User(AbstractUser):
 
         community_to_unban_user_from.banned_users.remove(user_to_unban)
         community_to_unban_user_from.create_user_unban_log(source_user=self, target_user=user_to_unban)
+        user_to_unban.invalidate_visibility_exclusions()
 
         return community_to_unban_user_from
 
@@ -1912,22 +2277,16 @@ class User(AbstractUser):
                         Q.AND)
         return users_query
 
-    def get_linked_users(self, max_id=None):
+    def get_linked_users(self, max_id=None, count=None):
         # All users which are connected with us and we have accepted by adding
         # them to a circle
         connected_users_query = self._make_connections_query()
         followers_query = self._make_followers_query()
 
-        if max_id:
-            connected_users_query.add(Q(id__lt=max_id), Q.AND)
-            followers_query.add(Q(id__lt=max_id), Q.AND)
-
         connected_users = User.objects.filter(connected_users_query)
         followers = User.objects.filter(followers_query)
 
-        linked_users = connected_users.union(followers)
-
-        return linked_users
+        return paginate_union_by_id([connected_users, followers], count=count, max_id=max_id)
 
     def search_linked_users_with_query(self, query):
         connected_users_query = self._make_connections_query()
@@ -2060,11 +2419,11 @@ class User(AbstractUser):
 
     def get_trending_posts(self, max_id=None, min_id=None):
         Post = get_post_model()
-        return Post.get_trending_posts_for_user_with_id(user_id=self.pk, max_id=max_id, min_id=min_id)
+        return Post.get_trending_posts_for_user(user=self, max_id=max_id, min_id=min_id)
 
     def get_trending_posts_old(self):
         Post = get_post_model()
-        return Post.get_trending_posts_old_for_user_with_id(user_id=self.pk)
+        return Post.get_trending_posts_old_for_user(user=self)
 
     def get_trending_communities(self, category_name=None):
         Community = get_community_model()
@@ -2226,7 +2585,7 @@ class User(AbstractUser):
         check_can_translate_post_with_id(user=self, post_id=post_id)
         Post = get_post_model()
         post = Post.objects.get(id=post_id)
-        result = translation_strategy.translate_text(
+        result = translate_text(
             source_language_code=post.language.code,
             target_language_code=self.translation_language.code,
             text=post.text
@@ -2240,6 +2599,7 @@ class User(AbstractUser):
         post.community.create_open_post_log(source_user=self, target_user=post.creator, post=post)
         post.is_closed = False
         post.save()
+        post.rebuild_creator_posts_counts()
 
         return post
 
@@ -2255,6 +2615,7 @@ class User(AbstractUser):
         excluded_users = self._get_excluded_users_for_deleting_community_notifications_on_close_post(post)
         post.delete_notifications_except_for_users(excluded_users)
         post.save()
+        post.rebuild_creator_posts_counts()
 
         return post
 
@@ -2268,13 +2629,18 @@ class User(AbstractUser):
         Hashtag = get_hashtag_model()
         hashtag = Hashtag.objects.get(name=hashtag_name)
 
-        hashtag_posts_query = make_get_hashtag_posts_for_user_with_id_query(user_id=self.pk, hashtag=hashtag)
+        hashtag_posts_query = make_get_hashtag_posts_for_user_query(user=self, hashtag=hashtag)
 
         if max_id:
             hashtag_posts_query.add(Q(id__lt=max_id), Q.AND)
 
+        posts_select_related = ('creator', 'creator__profile', 'community', 'language')
+
+        posts_prefetch_related = ('creator__profile__badges', 'hashtags', 'links')
+
         Post = get_post_model()
-        hashtag_posts = Post.objects.filter(hashtag_posts_query).distinct()
+        hashtag_posts = Post.objects.select_related(*posts_select_related).prefetch_related(
+            *posts_prefetch_related).filter(hashtag_posts_query).distinct()
 
         return hashtag_posts
 
@@ -2296,8 +2662,13 @@ class User(AbstractUser):
         if max_id:
             community_posts_query.add(Q(id__lt=max_id), Q.AND)
 
+        posts_select_related = ('creator', 'creator__profile', 'community', 'language')
+
+        posts_prefetch_related = ('creator__profile__badges', 'hashtags', 'links')
+
         Post = get_post_model()
-        profile_posts = Post.objects.filter(community_posts_query).distinct()
+        profile_posts = Post.objects.select_related(*posts_select_related).prefetch_related(
+            *posts_prefetch_related).filter(community_posts_query).distinct()
 
         return profile_posts
 
@@ -2400,7 +2771,7 @@ class User(AbstractUser):
         check_can_get_posts_for_user(user=self, target_user=user)
 
         posts_prefetch_related = (
-            'circles', 'creator', 'creator__profile__badges', 'hashtags', 'community')
+            'circles', 'creator', 'creator__profile__badges', 'hashtags', 'community', 'counter')
 
         posts_only = ('text', 'id', 'uuid', 'created',
                       'creator__username', 'creator__id', 'creator__profile__name',
@@ -2481,30 +2852,33 @@ class User(AbstractUser):
         TopPost = get_top_post_model()
         Community = get_community_model()
 
-        posts_select_related = ('post__creator', 'post__creator__profile', 'post__community', 'post__image')
-        posts_prefetch_related = ('post__circles', 'post__creator__profile__badges')
+        posts_select_related = ('post__creator', 'post__creator__profile', 'post__community', 'post__image',
+                                'post__language')
+        posts_prefetch_related = ('post__circles', 'post__creator__profile__badges', 'post__hashtags', 'post__links')
 
-        posts_only = ('id',
+        posts_only = ('id', 'created',
                       'post__text', 'post__id', 'post__uuid', 'post__created', 'post__image__width',
                       'post__image__height', 'post__image__image',
-                      'post__creator__username', 'post__creator__id', 'post__creator__profile__name',
-                      'post__creator__profile__avatar',
+                      'post__comments_enabled', 'post__public_reactions', 'post__is_edited', 'post__is_closed',
+                      'post__language', 'post__media_height', 'post__media_width', 'post__media_thumbnail',
+                      'post__creator__username', 'post__creator__id', 'post__creator__visibility',
+                      'post__creator__profile__name', 'post__creator__profile__avatar',
+                      'post__creator__profile__cover',
                       'post__creator__profile__badges__id', 'post__creator__profile__badges__keyword',
                       'post__creator__profile__id', 'post__community__id', 'post__community__name',
-                      'post__community__avatar',
+                      'post__community__avatar', 'post__community__cover',
                       'post__community__color', 'post__community__title')
 
-        reported_posts_exclusion_query = ~Q(post__moderated_object__reports__reporter_id=self.pk)
         excluded_top_posts_communities_query = ~Q(post__community__top_posts_community_exclusions__user=self.pk)
 
         top_community_posts_query = Q(post__is_closed=False,
                                       post__is_deleted=False,
                                       post__status=Post.STATUS_PUBLISHED)
 
-        top_community_posts_query.add(~Q(Q(post__creator__blocked_by_users__blocker_id=self.pk) | Q(
-            post__creator__user_blocks__blocked_user_id=self.pk)), Q.AND)
+        # Posts of blocked users, reported posts and posts of communities banned from
+        top_community_posts_query.add(make_exclude_posts_hidden_by_visibility_exclusions_query(
+            visibility_exclusions=self.get_visibility_exclusions(), post_field='post'), Q.AND)
         top_community_posts_query.add(Q(post__community__type=Community.COMMUNITY_TYPE_PUBLIC), Q.AND)
-        top_community_posts_query.add(~Q(post__community__banned_users__id=self.pk), Q.AND)
 
         if max_id:
             top_community_posts_query.add(Q(id__lt=max_id), Q.AND)
@@ -2519,7 +2893,6 @@ class User(AbstractUser):
             exclude_joined_communities_query = ~Q(post__community__memberships__user__id=self.pk)
             top_community_posts_query.add(exclude_joined_communities_query, Q.AND)
 
-        top_community_posts_query.add(reported_posts_exclusion_query, Q.AND)
         top_community_posts_query.add(excluded_top_posts_communities_query, Q.AND)
 
         top_community_posts_queryset = TopPost.objects.select_related(*posts_select_related).prefetch_related(
@@ -2530,14 +2903,17 @@ class User(AbstractUser):
     def get_timeline_posts(self, lists_ids=None, circles_ids=None, max_id=None, min_id=None, count=None):
         """
         Get the timeline posts for self. The results will be dynamic based on follows and connections.
+        Without filters, the materialized timeline is used when ready.
         """
 
         if not circles_ids and not lists_ids:
-            return self._get_timeline_posts_with_no_filters(max_id=max_id)
+            return self._get_timeline_posts_with_no_filters(max_id=max_id, count=count)
 
-        return self._get_timeline_posts_with_filters(max_id=max_id, circles_ids=circles_ids, lists_ids=lists_ids)
+        return self._get_timeline_posts_with_filters(max_id=max_id, circles_ids=circles_ids, lists_ids=lists_ids,
+                                                     count=count)
 
-    def _get_timeline_posts_with_filters(self, max_id=None, min_id=None, circles_ids=None, lists_ids=None):
+    def _get_timeline_posts_with_filters(self, max_id=None, min_id=None, circles_ids=None, lists_ids=None,
+                                         count=None):
         Post = get_post_model()
 
         world_circle_id = self._get_world_circle_id()
@@ -2573,57 +2949,110 @@ class User(AbstractUser):
             # Add all followed user circles
             timeline_posts_query.add(followed_user_query, Q.OR)
 
-        if max_id:
-            timeline_posts_query.add(Q(id__lt=max_id), Q.AND)
-        elif min_id:
-            timeline_posts_query.add(Q(id__gt=min_id), Q.AND)
-
         timeline_posts_query.add(Q(is_deleted=False, status=Post.STATUS_PUBLISHED), Q.AND)
 
-        timeline_posts_query.add(~Q(moderated_object__reports__reporter_id=self.pk), Q.AND)
+        visibility_exclusions = self.get_visibility_exclusions()
+
+        timeline_posts_query.add(make_exclude_posts_with_ids_query(visibility_exclusions['reported_posts_ids']),
+                                 Q.AND)
 
-        return Post.objects.filter(timeline_posts_query).distinct()
+        return paginate_queryset_by_id(Post.objects.filter(timeline_posts_query).distinct(), count=count,
+                                       max_id=max_id, min_id=min_id)
 
-    def _get_timeline_posts_with_no_filters(self, max_id=None):
+    def _get_timeline_posts_with_no_filters(self, max_id=None, count=None):
         """
         Being the main action of the network, an optimised call of the get timeline posts call with no filtering.
+        Served from the materialized timeline when ready, from the timeline sources otherwise.
+        """
+        Timeline = get_timeline_model()
+        timeline = Timeline.get_or_create_timeline_for_user_with_id(user_id=self.pk)
+
+        if timeline.can_serve_posts_with_max_id(max_id=max_id):
+            return self._get_materialized_timeline_posts(max_id=max_id, count=count)
+
+        if (timeline.is_cold() or timeline.is_stale_build()) and timeline.mark_as_building():
+            rebuild_timeline_for_user_with_id.delay(user_id=self.pk)
+
+        return self.get_source_timeline_posts_with_no_filters(max_id=max_id, count=count)
+
+    def _get_materialized_timeline_posts(self, max_id=None, count=None):
+        Post = get_post_model()
+        ModeratedObject = get_moderated_object_model()
+
+        posts_select_related = ('creator', 'creator__profile', 'community', 'image', 'language')
+
+        posts_prefetch_related = ('circles', 'creator__profile__badges', 'counter', 'hashtags', 'links')
+
+        posts_only = ('text', 'id', 'uuid', 'created', 'image__width', 'image__height', 'image__image',
+                      'comments_enabled', 'public_reactions', 'is_edited', 'is_closed', 'language',
+                      'media_height', 'media_width', 'media_thumbnail',
+                      'creator__username', 'creator__id', 'creator__visibility', 'creator__profile__name',
+                      'creator__profile__avatar', 'creator__profile__cover',
+                      'creator__profile__badges__id', 'creator__profile__badges__keyword',
+                      'creator__profile__id', 'community__id', 'community__name', 'community__avatar',
+                      'community__cover', 'community__color',
+                      'community__title')
+
+        timeline_posts_query = Q(timeline_entries__owner_id=self.pk, is_deleted=False, status=Post.STATUS_PUBLISHED)
+
+        # Community posts might have been closed or moderated after being added to the timeline
+        timeline_posts_query.add(Q(community__isnull=True) | Q(
+            Q(is_closed=False) & ~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED)), Q.AND)
+
+        visibility_exclusions = self.get_visibility_exclusions()
+
+        timeline_posts_query.add(make_exclude_posts_of_users_with_ids_query(
+            visibility_exclusions['blocked_users_ids']), Q.AND)
+
+        timeline_posts_query.add(make_exclude_posts_with_ids_query(visibility_exclusions['reported_posts_ids']),
+                                 Q.AND)
+
+        timeline_posts_queryset = Post.objects.select_related(*posts_select_related).prefetch_related(
+            *posts_prefetch_related).only(*posts_only).filter(timeline_posts_query)
+
+        return paginate_queryset_by_id(timeline_posts_queryset, count=count, max_id=max_id)
+
+    def get_source_timeline_posts_with_no_filters(self, max_id=None, count=None):
+        """
+        The timeline posts straight from its sources: own, communities and followed users posts.
+        Each source is paginated on its own before merging them, so every one of them reads at most a page.
         """
         world_circle_id = self._get_world_circle_id()
 
         Post = get_post_model()
 
-        posts_select_related = ('creator', 'creator__profile', 'community', 'image')
+        posts_select_related = ('creator', 'creator__profile', 'community', 'image', 'language')
 
-        posts_prefetch_related = ('circles', 'creator__profile__badges')
+        posts_prefetch_related = ('circles', 'creator__profile__badges', 'counter', 'hashtags', 'links')
 
         posts_only = ('text', 'id', 'uuid', 'created', 'image__width', 'image__height', 'image__image',
-                      'creator__username', 'creator__id', 'creator__profile__name', 'creator__profile__avatar',
+                      'comments_enabled', 'public_reactions', 'is_edited', 'is_closed', 'language',
+                      'media_height', 'media_width', 'media_thumbnail',
+                      'creator__username', 'creator__id', 'creator__visibility', 'creator__profile__name',
+                      'creator__profile__avatar', 'creator__profile__cover',
                       'creator__profile__badges__id', 'creator__profile__badges__keyword',
                       'creator__profile__id', 'community__id', 'community__name', 'community__avatar',
-                      'community__color',
+                      'community__cover', 'community__color',
                       'community__title')
 
         ModeratedObject = get_moderated_object_model()
-        reported_posts_exclusion_query = ~Q(moderated_object__reports__reporter_id=self.pk)
+        visibility_exclusions = self.get_visibility_exclusions()
+
+        reported_posts_exclusion_query = make_exclude_posts_with_ids_query(
+            visibility_exclusions['reported_posts_ids'])
 
         own_posts_query = Q(creator=self.pk, community__isnull=True, is_deleted=False, status=Post.STATUS_PUBLISHED)
 
         own_posts_query.add(reported_posts_exclusion_query, Q.AND)
 
-        if max_id:
-            own_posts_query.add(Q(id__lt=max_id), Q.AND)
-
         own_posts_queryset = self.posts.select_related(*posts_select_related).prefetch_related(
             *posts_prefetch_related).only(*posts_only).filter(own_posts_query)
 
         community_posts_query = Q(community__memberships__user__id=self.pk, is_closed=False, is_deleted=False,
                                   status=Post.STATUS_PUBLISHED)
 
-        community_posts_query.add(~Q(Q(creator__blocked_by_users__blocker_id=self.pk) | Q(
-            creator__user_blocks__blocked_user_id=self.pk)), Q.AND)
-
-        if max_id:
-            community_posts_query.add(Q(id__lt=max_id), Q.AND)
+        community_posts_query.add(make_exclude_posts_of_users_with_ids_query(
+            visibility_exclusions['blocked_users_ids']), Q.AND)
 
         community_posts_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
 
@@ -2640,21 +3069,18 @@ class User(AbstractUser):
 
         followed_users_query.add(reported_posts_exclusion_query, Q.AND)
 
-        if max_id:
-            followed_users_query.add(Q(id__lt=max_id), Q.AND)
-
         followed_users_query.add(
             Q(circles__id=world_circle_id) | Q(circles__connections__target_connection__circles__isnull=False,
                                                circles__connections__target_user=self.pk), Q.AND)
 
+        # A post can be in several of the circles we're connected through
         followed_users_queryset = Post.objects.select_related(*posts_select_related).prefetch_related(
-            *posts_prefetch_related).only(*posts_only).filter(followed_users_query)
+            *posts_prefetch_related).only(*posts_only).filter(followed_users_query).distinct()
 
-        final_queryset = own_posts_queryset.union(community_posts_queryset, followed_users_queryset)
+        return paginate_union_by_id([own_posts_queryset, community_posts_queryset, followed_users_queryset],
+                                    count=count, max_id=max_id)
 
-        return final_queryset
-
-    def get_global_moderated_objects(self, types=None, max_id=None, verified=None, statuses=None):
+    def get_global_moderated_objects(self, types=None, max_id=None, verified=None, statuses=None, count=None):
         check_can_get_global_moderated_objects(user=self)
         ModeratedObject = get_moderated_object_model()
 
@@ -2663,48 +3089,37 @@ class User(AbstractUser):
         if types:
             moderated_objects_query.add(Q(object_type__in=types), Q.AND)
 
-        if max_id:
-            moderated_objects_query.add(Q(id__lt=max_id), Q.AND)
-
         if verified is not None:
             moderated_objects_query.add(Q(verified=verified), Q.AND)
 
         if statuses is not None:
             moderated_objects_query.add(Q(status__in=statuses), Q.AND)
 
-        return ModeratedObject.objects.filter(moderated_objects_query)
+        return paginate_queryset_by_id(ModeratedObject.objects.filter(moderated_objects_query), count=count,
+                                       max_id=max_id)
 
-    def get_logs_for_moderated_object_with_id(self, moderated_object_id, max_id=None):
+    def get_logs_for_moderated_object_with_id(self, moderated_object_id, max_id=None, count=None):
         ModeratedObject = get_moderated_object_model()
         moderated_object = ModeratedObject.objects.get(pk=moderated_object_id)
-        return self.get_logs_for_moderated_object(moderated_object=moderated_object, max_id=max_id)
+        return self.get_logs_for_moderated_object(moderated_object=moderated_object, max_id=max_id, count=count)
 
-    def get_logs_for_moderated_object(self, moderated_object, max_id=None):
+    def get_logs_for_moderated_object(self, moderated_object, max_id=None, count=None):
         check_can_get_moderated_object(user=self, moderated_object=moderated_object)
 
-        query = Q()
-
-        if max_id:
-            query.add(Q(id__lt=max_id), Q.AND)
-
-        return moderated_object.logs.filter(query)
+        return paginate_queryset_by_id(moderated_object.logs.all(), count=count, max_id=max_id)
 
-    def get_reports_for_moderated_object_with_id(self, moderated_object_id, max_id=None):
+    def get_reports_for_moderated_object_with_id(self, moderated_object_id, max_id=None, count=None):
         ModeratedObject = get_moderated_object_model()
         moderated_object = ModeratedObject.objects.get(pk=moderated_object_id)
-        return self.get_reports_for_moderated_object(moderated_object=moderated_object, max_id=max_id)
+        return self.get_reports_for_moderated_object(moderated_object=moderated_object, max_id=max_id, count=count)
 
-    def get_reports_for_moderated_object(self, moderated_object, max_id=None):
+    def get_reports_for_moderated_object(self, moderated_object, max_id=None, count=None):
         check_can_get_moderated_object(user=self, moderated_object=moderated_object)
 
-        query = Q()
-
-        if max_id:
-            query.add(Q(id__lt=max_id), Q.AND)
-
-        return moderated_object.reports.filter(query)
+        return paginate_queryset_by_id(moderated_object.reports.all(), count=count, max_id=max_id)
 
-    def get_community_moderated_objects(self, community_name, types=None, max_id=None, verified=None, statuses=None):
+    def get_community_moderated_objects(self, community_name, types=None, max_id=None, verified=None, statuses=None,
+                                        count=None):
         check_can_get_community_moderated_objects(user=self, community_name=community_name)
         ModeratedObject = get_moderated_object_model()
 
@@ -2719,21 +3134,16 @@ class User(AbstractUser):
         if statuses is not None:
             moderated_objects_query.add(Q(status__in=statuses), Q.AND)
 
-        if max_id:
-            moderated_objects_query.add(Q(id__lt=max_id), Q.AND)
-
-        return ModeratedObject.objects.filter(moderated_objects_query)
+        return paginate_queryset_by_id(ModeratedObject.objects.filter(moderated_objects_query), count=count,
+                                       max_id=max_id)
 
-    def get_moderation_penalties(self, max_id=None):
-        query = Q()
-        if max_id:
-            query.add(Q(id__lt=max_id), Q.AND)
-        return self.moderation_penalties.filter(query)
+    def get_moderation_penalties(self, max_id=None, count=None):
+        return paginate_queryset_by_id(self.moderation_penalties.all(), count=count, max_id=max_id)
 
     def count_active_moderation_penalties(self):
         return self.get_moderation_penalties().filter(expiration__gt=timezone.now()).count()
 
-    def get_pending_moderated_objects_communities(self, max_id):
+    def get_pending_moderated_objects_communities(self, max_id, count=None):
         """Retrieves the communities staff of that have pending moderated objects"""
         query = Q(memberships__user_id=self.pk) & (
                 Q(memberships__is_moderator=True) | Q(memberships__is_administrator=True))
@@ -2741,12 +3151,9 @@ class User(AbstractUser):
         ModeratedObject = get_moderated_object_model()
         query.add(Q(moderated_objects__status=ModeratedObject.STATUS_PENDING), Q.AND)
 
-        if max_id:
-            query.add(Q(id__lt=max_id), Q.AND)
-
         Community = get_community_model()
 
-        return Community.objects.filter(query).distinct()
+        return paginate_queryset_by_id(Community.objects.filter(query).distinct(), count=count, max_id=max_id)
 
     def count_pending_communities_moderated_objects(self):
         ModeratedObject = get_moderated_object_model()
@@ -2830,8 +3237,12 @@ class User(AbstractUser):
 
         Follow = get_follow_model()
         follow = Follow.create_follow(user_id=self.pk, followed_user_id=user.pk, lists_ids=lists_ids)
+        self.invalidate_relationships_cache()
         self._create_follow_notification(followed_user_id=user.pk)
 
+        Timeline = get_timeline_model()
+        Timeline.invalidate_timelines_for_users_with_ids(users_ids=[self.pk])
+
         if not is_pre_approved:
             # When its preapproved by the user to be followed, do not send the person a push notification
             self._send_follow_push_notification(followed_user_id=user.pk)
@@ -2850,6 +3261,12 @@ class User(AbstractUser):
         follow = self.follows.get(followed_user_id=user_id)
         self._delete_follow_notification(followed_user_id=user_id)
         follow.delete()
+        UserProfile.decrement_follows_counts(user_id=self.pk, followed_user_id=user_id)
+        self.invalidate_relationships_cache()
+
+        Timeline = get_timeline_model()
+        Timeline.remove_posts_of_creator_with_id_from_timeline_for_user_with_id(creator_id=user_id, user_id=self.pk,
+                                                                               only_circles_posts=True)
 
     def update_follow_for_user(self, user, lists_ids=None):
         return self.update_follow_for_user_with_id(user.pk, lists_ids=lists_ids)
@@ -2912,6 +3329,7 @@ class User(AbstractUser):
 
         Connection = get_connection_model()
         connection = Connection.create_connection(user_id=self.pk, target_user_id=user.pk, circles_ids=circles_ids)
+        self.invalidate_relationships_cache()
 
         # Automatically follow user
         if not self.is_following_user_with_id(user.pk):
@@ -2939,6 +3357,9 @@ class User(AbstractUser):
 
         self._create_connection_confirmed_notification(user_connected_with_id=user_id)
 
+        Timeline = get_timeline_model()
+        Timeline.invalidate_timelines_for_users_with_ids(users_ids=[self.pk, user_id])
+
         return connection
 
     def update_connection_with_user_with_id(self, user_id, circles_ids=None):
@@ -2958,6 +3379,9 @@ class User(AbstractUser):
         connection.circles.add(*circles_ids)
         connection.save()
 
+        Timeline = get_timeline_model()
+        Timeline.invalidate_timelines_for_users_with_ids(users_ids=[user_id])
+
         return connection
 
     def disconnect_from_user(self, user):
@@ -2974,6 +3398,10 @@ class User(AbstractUser):
 
         connection = self.connections.get(target_connection__user_id=user_id)
         connection.delete()
+        self.invalidate_relationships_cache()
+
+        Timeline = get_timeline_model()
+        Timeline.invalidate_timelines_for_users_with_ids(users_ids=[self.pk, user_id])
 
         return connection
 
@@ -3004,6 +3432,7 @@ class User(AbstractUser):
             notifications_query.add(Q(id__lte=max_id), Q.AND)
 
         self.notifications.filter(notifications_query).update(read=True)
+        clear_unread_notifications_counts(user_id=self.pk)
 
     def get_unread_notifications(self, max_id=None, types=None):
         notifications_query = Q(read=False)
@@ -3018,8 +3447,12 @@ class User(AbstractUser):
     def read_notification_with_id(self, notification_id):
         check_can_read_notification_with_id(user=self, notification_id=notification_id)
         notification = self.notifications.get(id=notification_id)
-        notification.read = True
-        notification.save()
+
+        if not notification.read:
+            notification.read = True
+            notification.save()
+            decrement_unread_notifications_count(user_id=self.pk, notification_type=notification.notification_type)
+
         return notification
 
     def delete_notification_with_id(self, notification_id):
@@ -3027,8 +3460,12 @@ class User(AbstractUser):
         notification = self.notifications.get(id=notification_id)
         notification.delete()
 
+        if not notification.read:
+            clear_unread_notifications_counts_on_commit(users_ids=[self.pk])
+
     def delete_own_notifications(self):
         self.notifications.all().delete()
+        clear_unread_notifications_counts_on_commit(users_ids=[self.pk])
 
     def delete_outgoing_notifications(self):
         """
@@ -3094,6 +3531,7 @@ class User(AbstractUser):
         check_can_mute_post(user=self, post=post)
         PostMute = get_post_mute_model()
         PostMute.create_post_mute(post_id=post.pk, muter_id=self.pk)
+        self.invalidate_relationships_cache()
         return post
 
     def unmute_post_with_id(self, post_id):
@@ -3102,6 +3540,7 @@ class User(AbstractUser):
 
         check_can_unmute_post(user=self, post=post)
         self.post_mutes.filter(post_id=post_id).delete()
+        self.invalidate_relationships_cache()
         return post
 
     def mute_post_comment_with_id(self, post_comment_id):
@@ -3127,7 +3566,7 @@ class User(AbstractUser):
         check_can_translate_comment_with_id(user=self, post_comment_id=post_comment_id)
         PostComment = get_post_comment_model()
         post_comment = PostComment.objects.get(pk=post_comment_id)
-        result = translation_strategy.translate_text(
+        result = translate_text(
             source_language_code=post_comment.language.code,
             target_language_code=self.translation_language.code,
             text=post_comment.text
@@ -3201,6 +3640,14 @@ class User(AbstractUser):
         UserBlock = get_user_block_model()
         UserBlock.create_user_block(blocker_id=self.pk, blocked_user_id=user_id)
 
+        self.invalidate_relationships_cache()
+        self.invalidate_visibility_exclusions()
+        user_to_block.invalidate_visibility_exclusions()
+
+        Timeline = get_timeline_model()
+        Timeline.remove_posts_of_creator_with_id_from_timeline_for_user_with_id(creator_id=user_id, user_id=self.pk)
+        Timeline.remove_posts_of_creator_with_id_from_timeline_for_user_with_id(creator_id=self.pk, user_id=user_id)
+
         return user_to_block
 
     def unblock_user_with_username(self, username):
@@ -3210,7 +3657,13 @@ class User(AbstractUser):
     def unblock_user_with_id(self, user_id):
         check_can_unblock_user_with_id(user=self, user_id=user_id)
         self.user_blocks.filter(blocked_user_id=user_id).delete()
-        return User.objects.get(pk=user_id)
+        user_to_unblock = User.objects.get(pk=user_id)
+
+        self.invalidate_relationships_cache()
+        self.invalidate_visibility_exclusions()
+        user_to_unblock.invalidate_visibility_exclusions()
+
+        return user_to_unblock
 
     def report_comment_with_id_for_post_with_uuid(self, post_comment_id, post_uuid, category_id, description=None):
         PostComment = get_post_comment_model()
@@ -3243,6 +3696,7 @@ class User(AbstractUser):
                                                        category_id=category_id,
                                                        reporter_id=self.pk,
                                                        description=description)
+        self.invalidate_visibility_exclusions()
         post.delete_notifications_for_user(user=self)
 
     def report_user_with_username(self, username, category_id, description=None):
@@ -3408,9 +3862,9 @@ class User(AbstractUser):
 
     def preview_link(self, link):
         if self.language:
-            return peekalink_client.peek(link=link, language_code=self.language.code)
+            return get_link_preview(link=link, language_code=self.language.code)
 
-        return peekalink_client.peek(link=link)
+        return get_link_preview(link=link)
 
     def _generate_password_reset_link(self, token):
         return '{0}/api/auth/password/verify?token={1}'.format(settings.EMAIL_HOST, token)
@@ -3605,6 +4059,18 @@ class User(AbstractUser):
         Circle = get_circle_model()
         return Circle.get_world_circle().pk
 
+    def _get_visibility_exclusions_cache_key(self):
+        # The uuid, unlike the id, is never reused by another user
+        return 'user-visibility-exclusions-%s' % self.uuid
+
+    def _get_cached_relationship(self, relationship_name):
+        relationships_cache = getattr(self, '_relationships_cache', None)
+
+        if relationships_cache is None:
+            return None
+
+        return relationships_cache.get(relationship_name)
+
     def _get_default_connection_circles(self):
         """
         If no circles were given on a connection request or confirm,
@@ -3729,13 +4195,16 @@ class User(AbstractUser):
 
         return post_comments_query
 
-    def _make_get_comments_for_post_query(self, post, post_comment_parent_id=None, max_id=None, min_id=None):
+    def _make_get_comments_for_post_query(self, post, post_comment_parent_id=None, max_id=None, min_id=None,
+                                          post_comments_parents_ids=None):
 
         # Comments from the post
         comments_query = Q(post_id=post.pk)
 
         # If we are retrieving replies, add the parent_comment to the query
-        if post_comment_parent_id is None:
+        if post_comments_parents_ids is not None:
+            comments_query.add(Q(parent_comment_id__in=post_comments_parents_ids), Q.AND)
+        elif post_comment_parent_id is None:
             comments_query.add(Q(parent_comment__isnull=True), Q.AND)
         else:
             comments_query.add(Q(parent_comment__id=post_comment_parent_id), Q.AND)
@@ -3792,11 +4261,15 @@ class User(AbstractUser):
         ModeratedObject = get_moderated_object_model()
         community_posts_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
 
+        visibility_exclusions = self.get_visibility_exclusions()
+
         # Dont retrieve items we have reported
-        community_posts_query.add(~Q(moderated_object__reports__reporter_id=self.pk), Q.AND)
+        community_posts_query.add(make_exclude_posts_with_ids_query(visibility_exclusions['reported_posts_ids']),
+                                  Q.AND)
 
         # Only retrieve posts if we're not banned
-        community_posts_query.add(~Q(community__banned_users__id=self.pk), Q.AND)
+        community_posts_query.add(make_exclude_posts_of_communities_with_ids_query(
+            visibility_exclusions['banned_communities_ids']), Q.AND)
 
         # Ensure public/private visibility is respected
         community_posts_visibility_query = Q(community__memberships__user__id=self.pk)
@@ -3810,16 +4283,15 @@ class User(AbstractUser):
             community_posts_query.add(Q(is_closed=False) | Q(creator_id=self.pk), Q.AND)
 
             # Don't retrieve posts of blocked users, except if they're staff members
-            blocked_users_query = ~Q(Q(creator__blocked_by_users__blocker_id=self.pk) | Q(
-                creator__user_blocks__blocked_user_id=self.pk))
+            blocked_users_ids = visibility_exclusions['blocked_users_ids']
 
-            blocked_users_query_staff_members = Q(creator__communities_memberships__community_id=community)
-            blocked_users_query_staff_members.add(Q(creator__communities_memberships__is_administrator=True) | Q(
-                creator__communities_memberships__is_moderator=True), Q.AND)
+            if blocked_users_ids:
+                blocked_staff_members_ids = community.memberships.filter(
+                    Q(user_id__in=blocked_users_ids) & Q(Q(is_administrator=True) | Q(is_moderator=True))
+                ).values_list('user_id', flat=True)
 
-            blocked_users_query.add(~blocked_users_query_staff_members, Q.AND)
-
-            community_posts_query.add(blocked_users_query, Q.AND)
+                community_posts_query.add(make_exclude_posts_of_users_with_ids_query(
+                    set(blocked_users_ids) - set(blocked_staff_members_ids)), Q.AND)
         else:
             if not include_closed_posts_for_staff:
                 community_posts_query.add(Q(is_closed=False), Q.AND)
@@ -3842,6 +4314,14 @@ def create_auth_token(sender, instance=None, created=False, **kwargs):
         bootstrap_user_auth_token(instance)
 
 
+@receiver(post_delete, sender=Token, dispatch_uid='invalidate_auth_token_credentials')
+def invalidate_auth_token_credentials(sender, instance=None, **kwargs):
+    """"
+    Stop authenticating with a deleted token, e.g. reset on a password change
+    """
+    invalidate_token_credentials(instance.key)
+
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='bootstrap_user_circles')
 def bootstrap_circles(sender, instance=None, created=False, **kwargs):
     """"
@@ -3869,6 +4349,12 @@ class UserProfile(models.Model):
     followers_count_visible = models.BooleanField(_('followers count visible'), blank=False, null=False, default=False)
     community_posts_visible = models.BooleanField(_('community posts visible'), blank=False, null=False, default=True)
     badges = models.ManyToManyField(Badge, related_name='users_profiles')
+    # Stored counts, so fetching a profile doesn't count the follows and posts of the user
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    posts_count = models.PositiveIntegerField(default=0)
+    public_posts_count = models.PositiveIntegerField(default=0)
+    community_posts_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         verbose_name = _('user profile')
@@ -3878,6 +4364,61 @@ class UserProfile(models.Model):
             ('id', 'user'),
         ]
 
+    COUNTS_FIELDS = ('followers_count', 'following_count', 'posts_count', 'public_posts_count',
+                     'community_posts_count',)
+
+    def save(self, *args, **kwargs):
+        if self.pk and kwargs.get('update_fields') is None:
+            # The counts are only updated in the database, don't overwrite them with the ones loaded with the profile
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields if
+                                       not field.primary_key and field.name not in self.COUNTS_FIELDS]
+
+        return super(UserProfile, self).save(*args, **kwargs)
+
+    @classmethod
+    def increment_follows_counts(cls, user_id, followed_user_id):
+        cls.objects.filter(user_id=user_id).update(following_count=F('following_count') + 1)
+        cls.objects.filter(user_id=followed_user_id).update(followers_count=F('followers_count') + 1)
+
+    @classmethod
+    def decrement_follows_counts(cls, user_id, followed_user_id):
+        cls.objects.filter(user_id=user_id, following_count__gt=0).update(following_count=F('following_count') - 1)
+        cls.objects.filter(user_id=followed_user_id, followers_count__gt=0).update(
+            followers_count=F('followers_count') - 1)
+
+    @classmethod
+    def increment_posts_count_for_user_with_id(cls, user_id):
+        cls.objects.filter(user_id=user_id).update(posts_count=F('posts_count') + 1)
+
+    @classmethod
+    def rebuild_follows_counts_for_user_with_id(cls, user_id):
+        Follow = get_follow_model()
+
+        cls.objects.filter(user_id=user_id).update(
+            followers_count=Follow.objects.filter(followed_user_id=user_id).count(),
+            following_count=Follow.objects.filter(user_id=user_id).count(),
+        )
+
+    @classmethod
+    def rebuild_posts_counts_for_user_with_id(cls, user_id):
+        """
+        Counts the posts of the user, and the ones everyone can see in its world circle and in public communities
+        """
+        Post = get_post_model()
+        Circle = get_circle_model()
+        Community = get_community_model()
+        ModeratedObject = get_moderated_object_model()
+
+        visible_posts = Post.objects.filter(Q(creator_id=user_id, is_deleted=False, status=Post.STATUS_PUBLISHED) &
+                                            ~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED))
+
+        cls.objects.filter(user_id=user_id).update(
+            posts_count=Post.objects.filter(creator_id=user_id).count(),
+            public_posts_count=visible_posts.filter(circles__id=Circle.get_world_circle_id()).count(),
+            community_posts_count=visible_posts.filter(community__isnull=False, is_closed=False,
+                                                       community__type=Community.COMMUNITY_TYPE_PUBLIC).count(),
+        )
+
     def __repr__(self):
         return '<UserProfile %s>' % self.user.username
 
@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from openbook_common.utils.model_loaders import get_user_block_model, get_moderation_penalty_model
+
+
+class UserRelationshipsCache:
+    """
+    The relationships of a user, each one loaded with a single query the first time a predicate asks for it.
+    Enabled for the authenticated user of a request, so the checkers and the serializer fields stop querying
+    the same relationships over and over. A relationship with more rows than max_size isn't kept and its
+    predicates keep querying the database. The follows and connections are kept up to their own limits, which
+    already bound them.
+    """
+
+    def __init__(self, user, max_size=None):
+        self.user = user
+        self.max_size = max_size or settings.USER_RELATIONSHIPS_CACHE_MAX_SIZE
+        self._relationships = {}
+
+    def get(self, relationship_name):
+        """
+        Returns the relationship, or None if it's too big to be kept
+        """
+        if relationship_name not in self._relationships:
+            loader = getattr(self, '_load_%s' % relationship_name)
+            self._relationships[relationship_name] = loader()
+
+        return self._relationships[relationship_name]
+
+    def clear(self):
+        self._relationships = {}
+
+    def _load_followed_users_ids(self):
+        return self._load_bounded_set(self.user.follows.values_list('followed_user_id', flat=True),
+                                      max_size=max(self.max_size, settings.USER_MAX_FOLLOWS))
+
+    def _load_follower_users_ids(self):
+        return self._load_bounded_set(self.user.followers.values_list('user_id', flat=True))
+
+    def _load_connected_users_ids(self):
+        return self._load_bounded_set(self.user.connections.values_list('target_connection__user_id', flat=True),
+                                      max_size=max(self.max_size, settings.USER_MAX_CONNECTIONS))
+
+    def _load_communities_memberships(self):
+        communities_memberships = self._load_bounded_list(
+            self.user.communities_memberships.values_list('community__name', 'is_administrator', 'is_moderator'))
+
+        if communities_memberships is None:
+            return None
+
+        return {community_name: {'is_administrator': is_administrator, 'is_moderator': is_moderator} for
+                community_name, is_administrator, is_moderator in communities_memberships}
+
+    def _load_user_blocks(self):
+        UserBlock = get_user_block_model()
+
+        user_blocks = self._load_bounded_list(
+            UserBlock.objects.filter(Q(blocker_id=self.user.pk) | Q(blocked_user_id=self.user.pk)).values_list(
+                'blocker_id', 'blocked_user_id'))
+
+        if user_blocks is None:
+            return None
+
+        return {
+            # Users we blocked
+            'blocked_users_ids': {blocked_user_id for blocker_id, blocked_user_id in user_blocks if
+                                  blocker_id == self.user.pk},
+            # Users we blocked or that blocked us
+            'blocked_with_users_ids': {blocker_id if blocked_user_id == self.user.pk else blocked_user_id for
+                                       blocker_id, blocked_user_id in user_blocks},
+        }
+
+    def _load_muted_posts_ids(self):
+        return self._load_bounded_set(self.user.post_mutes.values_list('post_id', flat=True))
+
+    def _load_is_suspended(self):
+        ModerationPenalty = get_moderation_penalty_model()
+        return self.user.moderation_penalties.filter(type=ModerationPenalty.TYPE_SUSPENSION,
+                                                     expiration__gt=timezone.now()).exists()
+
+    def _load_bounded_set(self, values_queryset, max_size=None):
+        values = self._load_bounded_list(values_queryset, max_size=max_size)
+
+        if values is None:
+            return None
+
+        return set(values)
+
+    def _load_bounded_list(self, values_queryset, max_size=None):
+        max_size = max_size or self.max_size
+
+        values = list(values_queryset[:max_size + 1])
+
+        if len(values) > max_size:
+            return None
+
+        return values
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from faker import Faker
+from rest_framework.exceptions import AuthenticationFailed
+
+from openbook_auth.authentication import CachedTokenAuthentication
+from openbook_common.tests.helpers import make_user, make_moderated_object
+from openbook_common.tests.models import OpenbookAPITestCase
+from openbook_moderation.models import ModerationPenalty
+
+fake = Faker()
+
+
+class CachedTokenAuthenticationTests(OpenbookAPITestCase):
+    """
+    CachedTokenAuthentication
+    """
+
+    def test_authenticates_a_cached_token_without_queries(self):
+        """
+        should authenticate the token user without querying once its credentials are cached
+        """
+        user = make_user()
+        key = user.auth_token.key
+
+        CachedTokenAuthentication().authenticate_credentials(key)
+
+        with self.assertNumQueries(0):
+            token_user, token_key = CachedTokenAuthentication().authenticate_credentials(key)
+            self.assertEqual(token_user.pk, user.pk)
+            self.assertTrue(token_user.is_authenticated)
+            self.assertFalse(token_user.is_suspended())
+
+        self.assertEqual(token_key, key)
+        self.assertEqual(token_user.username, user.username)
+
+    def test_sees_a_new_suspension(self):
+        """
+        should see the user suspended right after a suspension penalty is placed
+        """
+        user = make_user()
+        key = user.auth_token.key
+
+        token_user, token_key = CachedTokenAuthentication().authenticate_credentials(key)
+        self.assertFalse(token_user.is_suspended())
+
+        ModerationPenalty.create_suspension_moderation_penalty(user_id=user.pk,
+                                                               moderated_object=make_moderated_object(),
+                                                               expiration=timezone.now() + timedelta(days=1))
+
+        token_user, token_key = CachedTokenAuthentication().authenticate_credentials(key)
+        self.assertTrue(token_user.is_suspended())
+
+    def test_rejects_a_soft_deleted_user(self):
+        """
+        should reject the token of a user right after soft deleting it
+        """
+        user = make_user()
+        key = user.auth_token.key
+
+        CachedTokenAuthentication().authenticate_credentials(key)
+
+        user.soft_delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            CachedTokenAuthentication().authenticate_credentials(key)
+
+    def test_rejects_a_reset_token(self):
+        """
+        should reject the previous token of a user right after updating its password
+        """
+        user = make_user()
+        key = user.auth_token.key
+
+        CachedTokenAuthentication().authenticate_credentials(key)
+
+        user.update_password(fake.password())
+
+        with self.assertRaises(AuthenticationFailed):
+            CachedTokenAuthentication().authenticate_credentials(key)
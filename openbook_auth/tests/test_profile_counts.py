@@ -0,0 +1,106 @@
+from faker import Faker
+
+from openbook_auth.jobs import reconcile_users_profiles_counts
+from openbook_auth.models import UserProfile
+from openbook_common.tests.helpers import make_user, make_community, make_fake_post_text
+from openbook_common.tests.models import OpenbookAPITestCase
+
+fake = Faker()
+
+
+class UserProfileCountsTests(OpenbookAPITestCase):
+    """
+    UserProfile counts
+    """
+
+    def test_follows_update_the_counts(self):
+        """
+        should update the followers and following counts when following and unfollowing a user
+        """
+        user = make_user()
+        followed_user = make_user()
+
+        user.follow_user(followed_user)
+
+        self.assertEqual(self._get_profile(user).following_count, 1)
+        self.assertEqual(self._get_profile(followed_user).followers_count, 1)
+
+        user.unfollow_user(followed_user)
+
+        self.assertEqual(self._get_profile(user).following_count, 0)
+        self.assertEqual(self._get_profile(followed_user).followers_count, 0)
+
+    def test_posts_update_the_counts(self):
+        """
+        should count the drafts in the posts count and only the published posts in the public counts
+        """
+        user = make_user()
+        community = make_community(creator=user)
+
+        user.create_public_post(text=make_fake_post_text())
+        user.create_community_post(community_name=community.name, text=make_fake_post_text())
+        draft_post = user.create_public_post(text=make_fake_post_text(), is_draft=True)
+
+        profile = self._get_profile(user)
+        self.assertEqual(profile.posts_count, 3)
+        self.assertEqual(profile.public_posts_count, 1)
+        self.assertEqual(profile.community_posts_count, 1)
+
+        user.delete_post(draft_post)
+
+        self.assertEqual(self._get_profile(user).posts_count, 2)
+
+    def test_soft_deleted_posts_are_not_counted_as_public(self):
+        """
+        should stop counting a soft deleted post in the public posts count
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        post.soft_delete()
+
+        self.assertEqual(self._get_profile(user).public_posts_count, 0)
+
+        post.unsoft_delete()
+
+        self.assertEqual(self._get_profile(user).public_posts_count, 1)
+
+    def test_saving_the_profile_keeps_the_counts(self):
+        """
+        should not overwrite the counts with the ones loaded with the profile when saving it
+        """
+        user = make_user()
+        follower = make_user()
+        profile = user.profile
+
+        follower.follow_user(user)
+        user.update(bio=fake.text(max_nb_chars=100))
+
+        self.assertEqual(self._get_profile(user).followers_count, 1)
+        self.assertEqual(profile.followers_count, 0)
+
+    def test_reconciles_the_counts(self):
+        """
+        should rebuild the counts that drifted from the follows and posts
+        """
+        user = make_user()
+        followed_user = make_user()
+
+        user.follow_user(followed_user)
+        user.create_public_post(text=make_fake_post_text())
+
+        UserProfile.objects.filter(user_id__in=[user.pk, followed_user.pk]).update(
+            followers_count=7, following_count=7, posts_count=7, public_posts_count=7, community_posts_count=7)
+
+        reconcile_users_profiles_counts(chunk_size=1)
+
+        profile = self._get_profile(user)
+        self.assertEqual(profile.following_count, 1)
+        self.assertEqual(profile.followers_count, 0)
+        self.assertEqual(profile.posts_count, 1)
+        self.assertEqual(profile.public_posts_count, 1)
+        self.assertEqual(profile.community_posts_count, 0)
+        self.assertEqual(self._get_profile(followed_user).followers_count, 1)
+
+    def _get_profile(self, user):
+        return UserProfile.objects.get(user_id=user.pk)
@@ -0,0 +1,93 @@
+from django.test import override_settings
+from faker import Faker
+
+from openbook_common.tests.helpers import make_user, make_community
+from openbook_common.tests.models import OpenbookAPITestCase
+
+fake = Faker()
+
+
+class UserRelationshipsCacheTests(OpenbookAPITestCase):
+    """
+    UserRelationshipsCache
+    """
+
+    def test_answers_repeated_predicates_with_a_single_query(self):
+        """
+        should query the followed users once for every is_following_user_with_id call
+        """
+        user = make_user()
+        followed_users = [make_user() for i in range(0, 3)]
+
+        for followed_user in followed_users:
+            user.follow_user(followed_user)
+
+        user.enable_relationships_cache()
+
+        with self.assertNumQueries(1):
+            for followed_user in followed_users:
+                self.assertTrue(user.is_following_user_with_id(followed_user.pk))
+            self.assertFalse(user.is_following_user_with_id(user.pk))
+
+    def test_is_invalidated_by_the_writes_of_the_user(self):
+        """
+        should answer the predicates right after following, blocking and joining a community
+        """
+        user = make_user()
+        user.enable_relationships_cache()
+
+        user_to_follow = make_user()
+        self.assertFalse(user.is_following_user_with_id(user_to_follow.pk))
+        user.follow_user(user_to_follow)
+        self.assertTrue(user.is_following_user_with_id(user_to_follow.pk))
+        user.unfollow_user_with_id(user_to_follow.pk)
+        self.assertFalse(user.is_following_user_with_id(user_to_follow.pk))
+
+        user_to_block = make_user()
+        self.assertFalse(user.is_blocked_with_user_with_id(user_to_block.pk))
+        user.block_user_with_id(user_id=user_to_block.pk)
+        self.assertTrue(user.has_blocked_user_with_id(user_to_block.pk))
+        self.assertTrue(user.is_blocked_with_user_with_id(user_to_block.pk))
+
+        community = make_community()
+        self.assertFalse(user.is_member_of_community_with_name(community_name=community.name))
+        user.join_community_with_name(community_name=community.name)
+        self.assertTrue(user.is_member_of_community_with_name(community_name=community.name))
+        self.assertFalse(user.is_administrator_of_community_with_name(community_name=community.name))
+        user.leave_community_with_name(community_name=community.name)
+        self.assertFalse(user.is_member_of_community_with_name(community_name=community.name))
+
+    @override_settings(USER_RELATIONSHIPS_CACHE_MAX_SIZE=2)
+    def test_queries_relationships_bigger_than_the_max_size(self):
+        """
+        should keep querying the relationships with more rows than the max size
+        """
+        user = make_user()
+        follower_users = [make_user() for i in range(0, 3)]
+
+        for follower_user in follower_users:
+            follower_user.follow_user(user)
+
+        user.enable_relationships_cache()
+
+        # The cache load and a query per call
+        with self.assertNumQueries(4):
+            for follower_user in follower_users:
+                self.assertTrue(user.is_followed_by_user_with_id(follower_user.pk))
+
+    @override_settings(USER_RELATIONSHIPS_CACHE_MAX_SIZE=2, USER_MAX_FOLLOWS=3)
+    def test_keeps_the_follows_up_to_the_max_follows(self):
+        """
+        should keep the followed users bigger than the max size but within the max follows
+        """
+        user = make_user()
+        followed_users = [make_user() for i in range(0, 3)]
+
+        for followed_user in followed_users:
+            user.follow_user(followed_user)
+
+        user.enable_relationships_cache()
+
+        with self.assertNumQueries(1):
+            for followed_user in followed_users:
+                self.assertTrue(user.is_following_user_with_id(followed_user.pk))
@@ -1,18 +1,23 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.urls import reverse
 from faker import Faker
 
 from rest_framework import status
-from rest_framework.test import APITestCase
 import logging
 
+from openbook_common.models import ProxyBlacklistedDomain
 from openbook_common.tests.helpers import make_authentication_headers_for_user, make_user, make_proxy_blacklisted_domain
+from openbook_common.tests.models import OpenbookAPITestCase
 
 fake = Faker()
 
 logger = logging.getLogger(__name__)
 
 
-class ProxyAuthAPITests(APITestCase):
+class ProxyAuthAPITests(OpenbookAPITestCase):
     """
     ProxyAuthAPI tests
     """
@@ -104,5 +109,50 @@ class ProxyAuthAPITests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
 
+    def test_proxy_auth_disallows_subdomain_of_blacklisted_subdomain(self):
+        """
+        should disallow when calling with a subdomain of a blacklisted subdomain and return 403
+        """
+        url = self._get_url()
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        make_proxy_blacklisted_domain(domain='test.blogspot.com')
+
+        headers['HTTP_X_PROXY_URL'] = 'https://images.test.blogspot.com:8080/image.jpg'
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_checks_blacklisted_domains_without_queries(self):
+        """
+        should check the urls against the blacklisted domains kept in memory without querying the database
+        """
+        make_proxy_blacklisted_domain(domain='techcrunch.com')
+
+        self.assertTrue(ProxyBlacklistedDomain.is_url_domain_blacklisted('https://techcrunch.com'))
+
+        with self.assertNumQueries(0):
+            self.assertTrue(ProxyBlacklistedDomain.is_url_domain_blacklisted('https://www.techcrunch.com'))
+            self.assertFalse(ProxyBlacklistedDomain.is_url_domain_blacklisted('https://notblacklisted.com'))
+
+        ProxyBlacklistedDomain.objects.filter(domain='techcrunch.com').delete()
+
+        self.assertFalse(ProxyBlacklistedDomain.is_url_domain_blacklisted('https://techcrunch.com'))
+
+    def test_flushes_blacklisted_domains_invalidating_once(self):
+        """
+        should invalidate the blacklisted domains once when flushing them, not once per domain
+        """
+        for domain in ['techcrunch.com', 'blogspot.com', 'test.okuna.io']:
+            make_proxy_blacklisted_domain(domain=domain)
+
+        self.assertTrue(ProxyBlacklistedDomain.is_url_domain_blacklisted('https://techcrunch.com'))
+
+        with mock.patch('openbook_common.proxy_blacklist.cache.set', wraps=cache.set) as mock_cache_set:
+            call_command('flush_proxy_blacklisted_domains')
+
+        self.assertEqual(mock_cache_set.call_count, 1)
+        self.assertFalse(ProxyBlacklistedDomain.is_url_domain_blacklisted('https://techcrunch.com'))
+
     def _get_url(self):
         return reverse('proxy-auth')
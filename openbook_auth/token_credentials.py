@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from rest_framework.authtoken.models import Token
+
+from openbook_common.utils.model_loaders import get_moderation_penalty_model
+
+
+def get_token_credentials(key):
+    """
+    Returns the id, active and deleted flags and suspension expiration of the user of the token, or None if the
+    token doesn't exist. They're kept for a few seconds in the process, in front of the cache where they're kept
+    until the token, the user deletion or the user suspensions change.
+    """
+    key_hash = sha256(key.encode('utf-8')).hexdigest()
+
+    with _local_token_credentials_lock:
+        local_token_credentials = _local_token_credentials.get(key_hash)
+
+    if local_token_credentials is not None:
+        expires_at, token_credentials = local_token_credentials
+
+        if expires_at > time.monotonic():
+            return token_credentials
+
+    cache_key = _make_token_credentials_cache_key(key_hash)
+    token_credentials = cache.get(cache_key)
+
+    if token_credentials is None:
+        token_credentials = _load_token_credentials(key)
+
+        if token_credentials is None:
+            return None
+
+        cache.set(cache_key, token_credentials, timeout=settings.AUTH_TOKEN_CREDENTIALS_CACHE_TIMEOUT_IN_SECONDS)
+
+    with _local_token_credentials_lock:
+        _local_token_credentials[key_hash] = (
+            time.monotonic() + settings.AUTH_TOKEN_CREDENTIALS_LOCAL_CACHE_TIMEOUT_IN_SECONDS, token_credentials)
+        _local_token_credentials.move_to_end(key_hash)
+
+        if len(_local_token_credentials) > settings.AUTH_TOKEN_CREDENTIALS_LOCAL_CACHE_MAX_SIZE:
+            _local_token_credentials.popitem(last=False)
+
+    return token_credentials
+
+
+def invalidate_token_credentials(key):
+    """
+    Drops the credentials of the token from the cache and this process, the other processes drop theirs
+    within AUTH_TOKEN_CREDENTIALS_LOCAL_CACHE_TIMEOUT_IN_SECONDS
+    """
+    key_hash = sha256(key.encode('utf-8')).hexdigest()
+
+    cache.delete(_make_token_credentials_cache_key(key_hash))
+
+    with _local_token_credentials_lock:
+        _local_token_credentials.pop(key_hash, None)
+
+
+def invalidate_token_credentials_for_user_with_id(user_id):
+    for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        invalidate_token_credentials(key)
+
+
+def _load_token_credentials(key):
+    try:
+        token = Token.objects.select_related('user').only('user__id', 'user__is_active', 'user__is_deleted').get(
+            key=key)
+    except Token.DoesNotExist:
+        return None
+
+    ModerationPenalty = get_moderation_penalty_model()
+
+    suspension_expiration = ModerationPenalty.objects.filter(
+        user_id=token.user_id, type=ModerationPenalty.TYPE_SUSPENSION).aggregate(
+        suspension_expiration=Max('expiration'))['suspension_expiration']
+
+    return {
+        'user_id': token.user_id,
+        'is_active': token.user.is_active,
+        'is_deleted': token.user.is_deleted,
+        'suspension_expiration': suspension_expiration,
+    }
+
+
+def _make_token_credentials_cache_key(key_hash):
+    return 'auth-token-credentials-%s' % key_hash
+
+
+_local_token_credentials = OrderedDict()
+_local_token_credentials_lock = threading.Lock()
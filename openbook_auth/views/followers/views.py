@@ -3,6 +3,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from openbook_common.utils.pagination import paginate_queryset_by_id
 from openbook_auth.views.followers.serializers import GetFollowersSerializer, FollowersUserSerializer, \
     SearchFollowersSerializer
 
@@ -21,8 +22,7 @@ class Followers(APIView):
         max_id = data.get('max_id')
 
         user = request.user
-        users = user.get_followers(max_id=max_id).order_by(
-            '-id')[:count]
+        users = paginate_queryset_by_id(user.get_followers(max_id=max_id), count=count)
 
         users_serializer = FollowersUserSerializer(users, many=True, context={'request': request})
 
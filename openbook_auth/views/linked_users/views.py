@@ -22,8 +22,7 @@ class LinkedUsers(APIView):
         with_community = data.get('with_community')
 
         user = request.user
-        users = user.get_linked_users(max_id=max_id).order_by(
-            '-id')[:count]
+        users = user.get_linked_users(max_id=max_id, count=count)
 
         users_serializer = LinkedUsersUserSerializer(users, many=True, context={'request': request,
                                                                                 'communities_names': [
@@ -1,4 +1,7 @@
 import tempfile
+import threading
+from collections import OrderedDict
+from hashlib import sha256
 from json import dumps
 
 import requests
@@ -17,20 +20,84 @@ DetectorFactory.seed = 0
 
 
 def get_detected_language_code(text):
+    """
+    Returns the code of the language of the text, detected once for every text with the same sample
+    """
+    text_sample = _make_language_detection_sample(text)
+    text_sample_hash = sha256(text_sample.encode('utf-8')).hexdigest()
+
+    with _detected_languages_codes_lock:
+        if text_sample_hash in _detected_languages_codes:
+            _detected_languages_codes.move_to_end(text_sample_hash)
+            return _detected_languages_codes[text_sample_hash]
+
     try:
-        detected_lang = translation_strategy.get_detected_language_code(text)
+        detected_lang = translation_strategy.get_detected_language_code(text_sample)
     except LangDetectException:
         detected_lang = None
+
+    with _detected_languages_codes_lock:
+        _detected_languages_codes[text_sample_hash] = detected_lang
+
+        if len(_detected_languages_codes) > settings.LANGUAGE_DETECTION_CACHE_MAX_SIZE:
+            _detected_languages_codes.popitem(last=False)
+
     return detected_lang
 
 
 def get_language_for_text(text):
     language_code = get_detected_language_code(text)
-    Language = get_language_model()
-    if language_code is not None and Language.objects.filter(code=language_code).exists():
-        return Language.objects.get(code=language_code)
 
-    return None
+    if language_code is None:
+        return None
+
+    return get_language_with_code(language_code)
+
+
+def get_language_with_code(language_code):
+    """
+    Returns the language with the code, or None if there is none.
+    The languages are loaded once per process and loaded again when one of them is saved or deleted.
+    """
+    global _languages_by_code
+
+    languages_by_code = _languages_by_code
+
+    if languages_by_code is None:
+        Language = get_language_model()
+        languages_by_code = {language.code: language for language in Language.objects.all()}
+        _languages_by_code = languages_by_code
+
+    return languages_by_code.get(language_code)
+
+
+def clear_languages_cache():
+    global _languages_by_code
+    _languages_by_code = None
+
+
+# The detected language code for the hash of every text sample, least recently detected first
+_detected_languages_codes = OrderedDict()
+_detected_languages_codes_lock = threading.Lock()
+
+_languages_by_code = None
+
+
+def _make_language_detection_sample(text):
+    """
+    Returns the text, or for a text longer than LANGUAGE_DETECTION_MAX_TEXT_LENGTH its beginning, middle and end,
+    which is plenty to detect its language and way faster than the whole of it
+    """
+    max_length = settings.LANGUAGE_DETECTION_MAX_TEXT_LENGTH
+
+    if len(text) <= max_length:
+        return text
+
+    chunk_length = max_length // 3
+    middle_chunk_start = (len(text) - chunk_length) // 2
+
+    return ' '.join((text[:chunk_length], text[middle_chunk_start:middle_chunk_start + chunk_length],
+                     text[-chunk_length:]))
 
 
 def get_supported_translation_language(language_code):
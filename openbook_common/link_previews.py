@@ -0,0 +1,91 @@
+from collections import Counter
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openbook_common.peekalink_client import peekalink_client
+from openbook_common.utils.helpers import normalize_url
+
+# The links previewability found in the cache or not, e.g. to log along the peekalink_client metrics
+link_previews_counters = Counter()
+
+
+def is_link_previewable(link):
+    """
+    Returns whether the link can be previewed, checked once for every post sharing the same normalized link.
+    The links that can't be previewed, or whose check failed, are checked again sooner than the others.
+    """
+    return are_links_previewable(links=[link])[link]
+
+
+def are_links_previewable(links):
+    """
+    Returns whether each of the links can be previewed, the ones not in the cache are checked concurrently
+    """
+    cache_keys = {link: _make_link_cache_key(prefix='link-is-previewable', link=link) for link in set(links)}
+
+    cached_are_previewable = cache.get_many(list(cache_keys.values()))
+
+    links_are_previewable = {}
+
+    for link, cache_key in cache_keys.items():
+        if cache_key in cached_are_previewable:
+            links_are_previewable[link] = cached_are_previewable[cache_key]
+
+    uncached_links = [link for link in cache_keys if link not in links_are_previewable]
+
+    link_previews_counters['hits'] += len(links_are_previewable)
+    link_previews_counters['misses'] += len(uncached_links)
+
+    if uncached_links:
+        checked_links_are_peekable = peekalink_client.are_peekable(links=uncached_links)
+
+        for link, is_peekable in checked_links_are_peekable.items():
+            if is_peekable is None:
+                # Not checked while Peekalink is unavailable, it's not kept so it's checked next time
+                links_are_previewable[link] = False
+            else:
+                _cache_link_is_previewable(link=link, is_previewable=is_peekable)
+                links_are_previewable[link] = is_peekable
+
+    return links_are_previewable
+
+
+def get_link_preview(link, language_code=None):
+    """
+    Returns the preview of the link, fetched once for every user asking for the same normalized link and language
+    """
+    preview_cache_key = _make_link_cache_key(prefix='link-preview-%s' % (language_code or ''), link=link)
+
+    link_preview = cache.get(preview_cache_key)
+
+    if link_preview is None:
+        link_previews_counters['misses'] += 1
+
+        if language_code:
+            link_preview = peekalink_client.peek(link=link, language_code=language_code)
+        else:
+            link_preview = peekalink_client.peek(link=link)
+
+        cache.set(preview_cache_key, link_preview, timeout=settings.LINK_PREVIEW_CACHE_TIMEOUT_IN_SECONDS)
+
+        # A link we got a preview for is a previewable one
+        _cache_link_is_previewable(link=link, is_previewable=True)
+    else:
+        link_previews_counters['hits'] += 1
+
+    return link_preview
+
+
+def _cache_link_is_previewable(link, is_previewable):
+    timeout = settings.LINK_PREVIEW_CACHE_TIMEOUT_IN_SECONDS if is_previewable else \
+        settings.LINK_PREVIEW_NEGATIVE_CACHE_TIMEOUT_IN_SECONDS
+
+    cache.set(_make_link_cache_key(prefix='link-is-previewable', link=link), is_previewable, timeout=timeout)
+
+
+def _make_link_cache_key(prefix, link):
+    # Links can be longer than what a cache key allows
+    normalized_link = normalize_url(link).encode('utf-8')
+    return '%s-%s' % (prefix, sha256(normalized_link).hexdigest())
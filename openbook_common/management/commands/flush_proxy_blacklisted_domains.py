@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from openbook_common.models import ProxyBlacklistedDomain
+from openbook_common.proxy_blacklist import deferred_proxy_blacklisted_domains_invalidation
 from openbook_common.utils.model_loaders import get_user_invite_model, get_badge_model
 
 import logging
@@ -16,4 +17,5 @@ class Command(BaseCommand):
     help = 'Flush all of the proxy blacklisted domains'
 
     def handle(self, *args, **options):
-        ProxyBlacklistedDomain.objects.all().delete()
+        with deferred_proxy_blacklisted_domains_invalidation():
+            ProxyBlacklistedDomain.objects.all().delete()
@@ -5,6 +5,7 @@ from django.core.management.base import BaseCommand
 from tldextract import tldextract
 
 from openbook_common.models import ProxyBlacklistedDomain
+from openbook_common.proxy_blacklist import deferred_proxy_blacklisted_domains_invalidation
 from openbook_common.utils.model_loaders import get_user_invite_model, get_badge_model
 
 import logging
@@ -29,7 +30,7 @@ class Command(BaseCommand):
 
         file_path = options.get('file', None)
 
-        with open(file_path, newline='') as file:
+        with open(file_path, newline='') as file, deferred_proxy_blacklisted_domains_invalidation():
             line = file.readline()
 
             while line:
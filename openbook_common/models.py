@@ -1,17 +1,17 @@
 # Create your models here.
 # Create your models here.
-from urllib.parse import urlparse
-
 from django.conf import settings
 from django.db import models
 from django.db.models import QuerySet, Q, Count
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 # Create your views here.
 from openbook.settings import COLOR_ATTR_MAX_LENGTH
+from openbook_common.proxy_blacklist import is_url_domain_blacklisted, invalidate_proxy_blacklisted_domains
 from openbook_common.validators import hex_color_validator
-import tldextract
 
 
 class EmojiGroup(models.Model):
@@ -110,25 +110,22 @@ class Language(models.Model):
         return super(Language, self).save(*args, **kwargs)
 
 
+@receiver(post_save, sender=Language, dispatch_uid='clear_languages_cache_on_save')
+@receiver(post_delete, sender=Language, dispatch_uid='clear_languages_cache_on_delete')
+def clear_languages_cache_on_change(sender, **kwargs):
+    from openbook_common.helpers import clear_languages_cache
+    clear_languages_cache()
+
+
 class ProxyBlacklistedDomain(models.Model):
     domain = models.CharField(max_length=settings.PROXY_BLACKLIST_DOMAIN_MAX_LENGTH, unique=True)
 
     @classmethod
     def is_url_domain_blacklisted(cls, url):
-        url = url.lower()
-
-        if not urlparse(url).scheme:
-            url = 'http://' + url
-
-        # This uses a list of public suffixes
-        tld_extract_result = tldextract.extract(url)
-
-        # given test.blogspot.com
-
-        # blogspot.com
-        url_root_domain = '.'.join([tld_extract_result.domain, tld_extract_result.suffix])
+        return is_url_domain_blacklisted(url)
 
-        # test.blogspot.com
-        url_full_domain = '.'.join([tld_extract_result.subdomain, tld_extract_result.domain, tld_extract_result.suffix])
 
-        return cls.objects.filter(Q(domain=url_root_domain) | Q(domain=url_full_domain)).exists()
+@receiver(post_save, sender=ProxyBlacklistedDomain, dispatch_uid='invalidate_proxy_blacklisted_domains_on_save')
+@receiver(post_delete, sender=ProxyBlacklistedDomain, dispatch_uid='invalidate_proxy_blacklisted_domains_on_delete')
+def invalidate_proxy_blacklisted_domains_on_change(sender, **kwargs):
+    invalidate_proxy_blacklisted_domains()
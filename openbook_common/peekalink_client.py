@@ -1,5 +1,15 @@
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
 
 
 class PeekalinkError(Exception):
@@ -14,34 +24,158 @@ class PeekalinkUnexpectedResponseError(PeekalinkError):
         super().__init__(self.message)
 
 
+class PeekalinkUnavailableError(PeekalinkError):
+    def __init__(self, message="Peekalink is failing too often, the requests are paused for a while."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class PeekalinkCircuitBreaker:
+    """
+    Keeps the outcome of the last requests and opens when too many of them failed, so the requests fail right away
+    instead of waiting on a failing Peekalink. Once open for open_duration_in_seconds, a single request goes through
+    to probe Peekalink and closes it again if it succeeds.
+    """
+
+    def __init__(self, failure_rate_threshold=0.5, window_size=20, min_requests=10, open_duration_in_seconds=30):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_requests = min_requests
+        self.open_duration_in_seconds = open_duration_in_seconds
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = None
+        self._is_probing = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+
+            if self._is_probing or time.monotonic() - self._opened_at < self.open_duration_in_seconds:
+                return False
+
+            self._is_probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                self._close()
+
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            self._outcomes.append(False)
+
+            if self._opened_at is not None:
+                # The probe failed, stay open for another while
+                self._open()
+                return
+
+            failures_count = self._outcomes.count(False)
+
+            if len(self._outcomes) >= self.min_requests and \
+                    failures_count / len(self._outcomes) >= self.failure_rate_threshold:
+                self._open()
+
+    def is_open(self):
+        return self._opened_at is not None
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._is_probing = False
+        logger.warning('Peekalink circuit breaker opened')
+
+    def _close(self):
+        self._opened_at = None
+        self._is_probing = False
+        self._outcomes.clear()
+        logger.info('Peekalink circuit breaker closed')
+
+
 class PeekalinkClient:
-    def __init__(self, api_key, default_timeout=None):
+    """
+    Previews links through the Peekalink API.
+    The requests go through a pooled session and a circuit breaker, so a slow or failing Peekalink makes them fail
+    fast instead of holding the workers. The requests and their latency are kept in the counters.
+    """
+
+    def __init__(self, api_key, api_root=None, pool_maxsize=10, max_retries=1, backoff_factor=0.3,
+                 circuit_breaker=None):
         self.api_key = api_key
+        self.api_root = api_root or 'https://api.peekalink.io'
+        self.pool_maxsize = pool_maxsize
+        self.circuit_breaker = circuit_breaker or PeekalinkCircuitBreaker()
+        self.counters = Counter()
+        self._counters_lock = threading.Lock()
+
+        # Only the connections that couldn't be made are retried, a slow Peekalink is left to the circuit breaker
+        retry = Retry(total=max_retries, read=0, status=0, backoff_factor=backoff_factor,
+                      method_whitelist=frozenset(['POST']), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+
         self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({'X-API-Key': self.api_key})
 
     def peek(self, link: str, language_code=None):
-        headers = {}
+        response = self._post(path='/', link=link, language_code=language_code)
+        return response.json()
 
-        if language_code:
-            headers['Accept-Language'] = language_code
+    def is_peekable(self, link: str, language_code=None):
+        response = self._post(path='/is-peekable/', link=link, language_code=language_code)
 
-        request_data = {
-            'link': link
-        }
+        response_data = response.json()
 
-        response = self.session.post(
-            'https://api.peekalink.io/',
-            headers=headers,
-            data=request_data,
-            timeout=(3, settings.LINK_PREVIEW_TIMEOUT_IN_SECONDS),
-        )
+        if 'isPeekable' not in response_data:
+            raise PeekalinkUnexpectedResponseError()
 
-        response.raise_for_status()
+        return response_data['isPeekable']
 
-        return response.json()
+    def are_peekable(self, links, language_code=None):
+        """
+        Checks whether each of the links is peekable, concurrently over the connections pool.
+        The links whose check failed are returned as not peekable, and the ones that weren't checked because
+        the circuit breaker is open as None.
+        """
+        links = list(set(links))
 
-    def is_peekable(self, link: str, language_code=None):
+        if not links:
+            return {}
+
+        def is_link_peekable(link):
+            try:
+                return self.is_peekable(link=link, language_code=language_code)
+            except PeekalinkUnavailableError:
+                return None
+            except Exception as e:
+                # We dont care whether it succeeded or not
+                return False
+
+        with ThreadPoolExecutor(max_workers=min(self.pool_maxsize, len(links))) as executor:
+            return dict(zip(links, executor.map(is_link_peekable, links)))
+
+    def get_metrics(self):
+        with self._counters_lock:
+            metrics = dict(self.counters)
+
+        timed_requests_count = metrics.get('requests', 0) - metrics.get('short_circuited_requests', 0)
+
+        if timed_requests_count:
+            metrics['average_latency_in_seconds'] = metrics.get('latency_in_seconds', 0) / timed_requests_count
+
+        metrics['is_circuit_open'] = self.circuit_breaker.is_open()
+
+        return metrics
+
+    def _post(self, path, link, language_code=None):
+        self._increment_counter('requests')
+
+        if not self.circuit_breaker.allow_request():
+            self._increment_counter('short_circuited_requests')
+            raise PeekalinkUnavailableError()
 
         headers = {}
 
@@ -52,21 +186,36 @@ class PeekalinkClient:
             'link': link
         }
 
-        response = self.session.post(
-            'https://api.peekalink.io/is-peekable/',
-            headers=headers,
-            data=request_data,
-            timeout=(3, settings.LINK_PREVIEW_TIMEOUT_IN_SECONDS),
-        )
+        started_at = time.monotonic()
 
-        response.raise_for_status()
+        try:
+            response = self.session.post(
+                '%s%s' % (self.api_root, path),
+                headers=headers,
+                data=request_data,
+                timeout=(3, settings.LINK_PREVIEW_TIMEOUT_IN_SECONDS),
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self._increment_counter('failed_requests')
 
-        response_data = response.json()
+            # A link Peekalink rejects isn't Peekalink failing
+            if e.response is None or e.response.status_code >= 500 or e.response.status_code == 429:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
 
-        if 'isPeekable' not in response_data:
-            raise PeekalinkUnexpectedResponseError()
+            raise
+        else:
+            self.circuit_breaker.record_success()
+        finally:
+            self._increment_counter('latency_in_seconds', time.monotonic() - started_at)
 
-        return response_data['isPeekable']
+        return response
+
+    def _increment_counter(self, name, amount=1):
+        with self._counters_lock:
+            self.counters[name] += amount
 
 
-peekalink_client = PeekalinkClient(api_key=settings.PEEKALINK_API_KEY)
+peekalink_client = PeekalinkClient(api_key=settings.PEEKALINK_API_KEY, api_root=settings.PEEKALINK_API_ROOT)
@@ -0,0 +1,143 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openbook_common.utils.model_loaders import get_proxy_blacklist_domain_model
+
+PROXY_BLACKLISTED_DOMAINS_VERSION_CACHE_KEY = 'proxy-blacklisted-domains-version'
+
+# Marks the trie nodes of the blacklisted domains, labels are never empty
+_BLACKLISTED = ''
+
+
+class ProxyBlacklistedDomainsTrie:
+    """
+    The blacklisted domains as a trie of their labels, from the top level one down, e.g. com -> blogspot -> test.
+    A domain is blacklisted when the walk down its labels goes through a blacklisted domain, so blacklisting a
+    domain blacklists all of its subdomains.
+    """
+
+    def __init__(self, domains=()):
+        self._root = {}
+
+        for domain in domains:
+            self.add(domain)
+
+    def add(self, domain):
+        labels = _get_domain_labels(domain)
+
+        if not labels:
+            return
+
+        node = self._root
+
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+
+        node[_BLACKLISTED] = True
+
+    def is_domain_blacklisted(self, domain):
+        node = self._root
+
+        for label in reversed(_get_domain_labels(domain)):
+            node = node.get(label)
+
+            if node is None:
+                return False
+
+            if _BLACKLISTED in node:
+                return True
+
+        return False
+
+
+_trie = None
+_trie_version = None
+_trie_version_checked_at = 0
+_trie_lock = threading.Lock()
+_deferred_invalidation = threading.local()
+
+
+def is_url_domain_blacklisted(url):
+    """
+    Checks the domain of the url and its parent domains against the blacklisted domains kept in memory.
+    The blacklist is only loaded again when its version in the cache changed, which is checked at most
+    every PROXY_BLACKLIST_VERSION_CHECK_INTERVAL_IN_SECONDS.
+    """
+    url = url.strip().lower()
+
+    if not urlparse(url).scheme:
+        url = 'http://' + url
+
+    domain = urlparse(url).hostname
+
+    if not domain:
+        return False
+
+    return _get_trie().is_domain_blacklisted(domain)
+
+
+def invalidate_proxy_blacklisted_domains():
+    """
+    Makes every process load the blacklisted domains again, e.g. after importing or flushing them
+    """
+    if getattr(_deferred_invalidation, 'active', False):
+        return
+
+    cache.set(PROXY_BLACKLISTED_DOMAINS_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+    clear_proxy_blacklisted_domains_cache()
+
+
+@contextmanager
+def deferred_proxy_blacklisted_domains_invalidation():
+    """
+    Invalidates the blacklisted domains once on exit instead of once per domain saved or deleted within,
+    e.g. while importing or flushing them
+    """
+    _deferred_invalidation.active = True
+
+    try:
+        yield
+    finally:
+        _deferred_invalidation.active = False
+        invalidate_proxy_blacklisted_domains()
+
+
+def clear_proxy_blacklisted_domains_cache():
+    global _trie
+
+    with _trie_lock:
+        _trie = None
+
+
+def _get_trie():
+    global _trie, _trie_version, _trie_version_checked_at
+
+    trie = _trie
+    now = time.monotonic()
+
+    if trie is not None and now - _trie_version_checked_at < settings.PROXY_BLACKLIST_VERSION_CHECK_INTERVAL_IN_SECONDS:
+        return trie
+
+    with _trie_lock:
+        # Read before loading, so a change made while loading is picked up on the next check
+        version = cache.get(PROXY_BLACKLISTED_DOMAINS_VERSION_CACHE_KEY)
+
+        if _trie is None or version != _trie_version:
+            ProxyBlacklistedDomain = get_proxy_blacklist_domain_model()
+            _trie = ProxyBlacklistedDomainsTrie(
+                domains=ProxyBlacklistedDomain.objects.values_list('domain', flat=True).iterator())
+            _trie_version = version
+
+        _trie_version_checked_at = now
+
+        return _trie
+
+
+def _get_domain_labels(domain):
+    return [label for label in domain.strip().lower().split('.') if label]
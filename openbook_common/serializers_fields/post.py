@@ -1,17 +1,68 @@
+from django.db import models
 from rest_framework.fields import Field
+from rest_framework.serializers import ListSerializer, Serializer
 
-from openbook_common.utils.model_loaders import get_post_model
+from openbook_common.utils.model_loaders import get_post_model, get_circle_model
 from openbook_communities.models import CommunityMembership
-from openbook_posts.models import PostReaction, PostCommentReaction
+from openbook_posts.models import PostReaction, PostCommentReaction, PostCounter, PostReactionEmojiCount
 
 
-class ReactionField(Field):
-    def __init__(self, reaction_serializer=None, **kwargs):
+class PostListSerializer(ListSerializer):
+    """
+    Runs the batch loaders of the post fields once for the whole page of posts, so the fields
+    read their values from the serializer context instead of querying them post by post.
+    Set as the list_serializer_class of the post serializers (or of serializers nesting one).
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+
+        _batch_load_fields(fields=self.child.fields, instances=items)
+
+        return super(PostListSerializer, self).to_representation(items)
+
+
+class BatchLoadedPostField(Field):
+    """
+    A post field which can load its values for a list of posts at once.
+    When serializing a single post there are no batch loaded values and the field loads its own value.
+    """
+
+    def __init__(self, **kwargs):
         kwargs['source'] = '*'
         kwargs['read_only'] = True
+        super(BatchLoadedPostField, self).__init__(**kwargs)
+
+    def load_for_posts(self, posts, request_user):
+        """
+        Returns the values for the given posts, or None if they can't be batch loaded for the request user.
+        By default nothing is batch loaded and the field loads its own value post by post.
+        """
+        return None
+
+    def batch_load(self, posts):
+        request = self.context.get('request')
+        posts_batch_loads = self.context.setdefault('posts_batch_loads', {})
+        posts_batch_loads[self] = self.load_for_posts(posts=posts, request_user=request.user)
+
+    def get_batch_loaded(self):
+        return self.context.get('posts_batch_loads', {}).get(self)
+
+
+class ReactionField(BatchLoadedPostField):
+    def __init__(self, reaction_serializer=None, **kwargs):
         self.reaction_serializer = reaction_serializer
         super(ReactionField, self).__init__(**kwargs)
 
+    def load_for_posts(self, posts, request_user):
+        if request_user.is_anonymous:
+            return None
+
+        reactions = PostReaction.objects.filter(reactor_id=request_user.pk,
+                                                post_id__in=[post.pk for post in posts]).select_related('emoji')
+
+        return {reaction.post_id: reaction for reaction in reactions}
+
     def to_representation(self, post):
         request = self.context.get('request')
         request_user = request.user
@@ -19,20 +70,36 @@ class ReactionField(Field):
         serialized_reaction = None
 
         if not request_user.is_anonymous:
+            reactions = self.get_batch_loaded()
+
             try:
-                reaction = request_user.get_reaction_for_post_with_id(post.pk)
-                serialized_reaction = self.reaction_serializer(reaction, context={'request': request}).data
+                if reactions is not None:
+                    reaction = reactions.get(post.pk)
+                else:
+                    reaction = request_user.get_reaction_for_post_with_id(post.pk)
+
+                if reaction:
+                    serialized_reaction = self.reaction_serializer(reaction, context={'request': request}).data
             except PostReaction.DoesNotExist:
                 pass
 
         return serialized_reaction
 
 
-class CommentsCountField(Field):
-    def __init__(self, **kwargs):
-        kwargs['source'] = '*'
-        kwargs['read_only'] = True
-        super(CommentsCountField, self).__init__(**kwargs)
+class CommentsCountField(BatchLoadedPostField):
+    def load_for_posts(self, posts, request_user):
+        if request_user.is_anonymous:
+            return None
+
+        if _request_user_has_user_blocks(context=self.context, request_user=request_user) or \
+                _request_user_has_reported_post_comments(context=self.context, request_user=request_user):
+            # The counters can't be used, the comments are counted for the request user instead
+            return request_user.get_comments_counts_for_posts(posts=posts)
+
+        post_counters = PostCounter.objects.filter(post_id__in=[post.pk for post in posts]). \
+            values_list('post_id', 'comments_count')
+
+        return dict(post_counters)
 
     def to_representation(self, post):
         request = self.context.get('request')
@@ -43,91 +110,178 @@ class CommentsCountField(Field):
         if request_user.is_anonymous:
             comments_count = post.count_comments()
         else:
-            comments_count = request_user.get_comments_count_for_post(post=post)
+            comments_counts = self.get_batch_loaded()
+
+            if comments_counts is not None and post.pk in comments_counts:
+                comments_count = comments_counts[post.pk]
+            else:
+                post_counter = _get_post_counter(post=post)
+
+                if post_counter and not _request_user_has_user_blocks(context=self.context,
+                                                                      request_user=request_user) \
+                        and not _request_user_has_reported_post_comments(context=self.context,
+                                                                         request_user=request_user):
+                    comments_count = post_counter.comments_count
+                else:
+                    comments_count = request_user.get_comments_count_for_post(post=post)
 
         return comments_count
 
-class PostReactionsEmojiCountField(Field):
+
+class PostReactionsEmojiCountField(BatchLoadedPostField):
     def __init__(self, emoji_count_serializer=None, **kwargs):
-        kwargs['source'] = '*'
-        kwargs['read_only'] = True
         self.emoji_count_serializer = emoji_count_serializer
         super(PostReactionsEmojiCountField, self).__init__(**kwargs)
 
+    def load_for_posts(self, posts, request_user):
+        if not request_user.is_anonymous and _request_user_has_user_blocks(context=self.context,
+                                                                           request_user=request_user):
+            # The counters can't be used, the reactions are counted for the request user instead
+            return request_user.get_emoji_counts_for_posts(posts=posts)
+
+        posts_ids = [post.pk for post in posts]
+
+        # Posts without counters are left out and counted on their own
+        reaction_emoji_counts = {post_id: [] for post_id in
+                                 PostCounter.objects.filter(post_id__in=posts_ids).values_list('post_id', flat=True)}
+
+        post_reaction_emoji_counts = PostReactionEmojiCount.objects.filter(post_id__in=posts_ids, count__gt=0). \
+            select_related('emoji'). \
+            order_by('-count')
+
+        for post_reaction_emoji_count in post_reaction_emoji_counts:
+            if post_reaction_emoji_count.post_id in reaction_emoji_counts:
+                reaction_emoji_counts[post_reaction_emoji_count.post_id].append(
+                    {'emoji': post_reaction_emoji_count.emoji, 'count': post_reaction_emoji_count.count})
+
+        return reaction_emoji_counts
+
     def to_representation(self, post):
         request = self.context.get('request')
         request_user = request.user
 
         reaction_emoji_count = []
 
-        if request_user.is_anonymous:
-            if post.public_reactions:
-                Post = get_post_model()
-                reaction_emoji_count = Post.get_emoji_counts_for_post_with_id(post.pk)
-        else:
-            reaction_emoji_count = request_user.get_emoji_counts_for_post_with_id(post.pk)
+        if not request_user.is_anonymous or post.public_reactions:
+            reaction_emoji_counts = self.get_batch_loaded()
+
+            if reaction_emoji_counts is not None and post.pk in reaction_emoji_counts:
+                reaction_emoji_count = reaction_emoji_counts[post.pk]
+            else:
+                reaction_emoji_count = self._get_reaction_emoji_count(post=post, request_user=request_user)
 
         post_reactions_serializer = self.emoji_count_serializer(reaction_emoji_count, many=True,
                                                                 context={"request": request, 'post': post})
 
         return post_reactions_serializer.data
 
+    def _get_reaction_emoji_count(self, post, request_user):
+        post_counter = _get_post_counter(post=post)
+
+        if request_user.is_anonymous:
+            if post_counter:
+                return PostReactionEmojiCount.get_emoji_counts_for_post_with_id(post.pk)
+
+            Post = get_post_model()
+            return Post.get_emoji_counts_for_post_with_id(post.pk)
+
+        if post_counter and not _request_user_has_user_blocks(context=self.context, request_user=request_user):
+            return PostReactionEmojiCount.get_emoji_counts_for_post_with_id(post.pk)
+
+        return request_user.get_emoji_counts_for_post_with_id(post.pk)
 
-class CirclesField(Field):
+
+class CirclesField(BatchLoadedPostField):
     def __init__(self, circle_serializer=None, **kwargs):
-        kwargs['source'] = '*'
-        kwargs['read_only'] = True
         self.circle_serializer = circle_serializer
         super(CirclesField, self).__init__(**kwargs)
 
+    def load_for_posts(self, posts, request_user):
+        Post = get_post_model()
+
+        own_posts_ids = [post.pk for post in posts if post.creator_id == request_user.pk]
+
+        posts_circles = {}
+
+        if own_posts_ids:
+            for post_circle in Post.circles.through.objects.filter(post_id__in=own_posts_ids).select_related(
+                    'circle'):
+                posts_circles.setdefault(post_circle.post_id, []).append(post_circle.circle)
+
+        return posts_circles
+
     def to_representation(self, post):
         request = self.context.get('request')
         request_user = request.user
         circles = []
 
         if post.creator_id == request_user.pk:
-            circles = post.circles
+            posts_circles = self.get_batch_loaded()
+
+            if posts_circles is not None:
+                circles = posts_circles.get(post.pk, [])
+            else:
+                circles = post.circles
 
         return self.circle_serializer(circles, many=True, context={"request": request, 'post': post}).data
 
 
-class PostCreatorField(Field):
+class PostCreatorField(BatchLoadedPostField):
     def __init__(self, community_membership_serializer, post_creator_serializer, **kwargs):
-        kwargs['source'] = '*'
-        kwargs['read_only'] = True
         self.community_membership_serializer = community_membership_serializer
         self.post_creator_serializer = post_creator_serializer
         super(PostCreatorField, self).__init__(**kwargs)
 
+    def load_for_posts(self, posts, request_user):
+        community_posts = [post for post in posts if post.community_id]
+
+        if not community_posts:
+            return {}
+
+        memberships = CommunityMembership.objects.filter(
+            community_id__in={post.community_id for post in community_posts},
+            user_id__in={post.creator_id for post in community_posts})
+
+        return {(membership.community_id, membership.user_id): membership for membership in memberships}
+
     def to_representation(self, post):
         request = self.context.get('request')
 
         post_creator = post.creator
-        post_community = post.community
+        post_community_id = post.community_id
 
         post_creator_serializer = self.post_creator_serializer(post_creator, context={"request": request}).data
 
-        if post_community:
+        if post_community_id:
+            memberships = self.get_batch_loaded()
+
             try:
-                post_creator_membership = post_community.memberships.get(user_id=post_creator.pk)
-                post_creator_serializer['communities_memberships'] = [
-                    self.community_membership_serializer(
-                        post_creator_membership,
-                        many=False,
-                        context={
-                            "request": request}).data
-                ]
+                if memberships is not None:
+                    post_creator_membership = memberships.get((post_community_id, post_creator.pk))
+                else:
+                    post_creator_membership = post.community.memberships.get(user_id=post_creator.pk)
+
+                if post_creator_membership:
+                    post_creator_serializer['communities_memberships'] = [
+                        self.community_membership_serializer(
+                            post_creator_membership,
+                            many=False,
+                            context={
+                                "request": request}).data
+                    ]
             except CommunityMembership.DoesNotExist:
                 pass
 
         return post_creator_serializer
 
 
-class PostIsMutedField(Field):
-    def __init__(self, **kwargs):
-        kwargs['source'] = '*'
-        kwargs['read_only'] = True
-        super(PostIsMutedField, self).__init__(**kwargs)
+class PostIsMutedField(BatchLoadedPostField):
+    def load_for_posts(self, posts, request_user):
+        if request_user.is_anonymous:
+            return None
+
+        return set(request_user.post_mutes.filter(post_id__in=[post.pk for post in posts]).values_list('post_id',
+                                                                                                       flat=True))
 
     def to_representation(self, post):
         request = self.context.get('request')
@@ -136,16 +290,32 @@ class PostIsMutedField(Field):
         is_muted = False
 
         if not request_user.is_anonymous:
-            is_muted = request_user.has_muted_post_with_id(post_id=post.pk)
+            muted_posts_ids = self.get_batch_loaded()
+
+            if muted_posts_ids is not None:
+                is_muted = post.pk in muted_posts_ids
+            else:
+                is_muted = request_user.has_muted_post_with_id(post_id=post.pk)
 
         return is_muted
 
 
-class IsEncircledField(Field):
-    def __init__(self, **kwargs):
-        kwargs['source'] = '*'
-        kwargs['read_only'] = True
-        super(IsEncircledField, self).__init__(**kwargs)
+class IsEncircledField(BatchLoadedPostField):
+    def load_for_posts(self, posts, request_user):
+        if request_user.is_anonymous:
+            return None
+
+        Post = get_post_model()
+        Circle = get_circle_model()
+
+        non_community_posts_ids = [post.pk for post in posts if not post.community_id]
+
+        if not non_community_posts_ids:
+            return set()
+
+        return set(Post.circles.through.objects.filter(post_id__in=non_community_posts_ids,
+                                                       circle_id=Circle.get_world_circle_id()).values_list('post_id',
+                                                                                                            flat=True))
 
     def to_representation(self, post):
         request = self.context.get('request')
@@ -154,6 +324,52 @@ class IsEncircledField(Field):
         is_encircled = False
 
         if not request_user.is_anonymous:
-            is_encircled = post.is_encircled_post()
+            public_posts_ids = self.get_batch_loaded()
+
+            if public_posts_ids is not None:
+                is_encircled = not post.community_id and post.pk not in public_posts_ids
+            else:
+                is_encircled = post.is_encircled_post()
 
         return is_encircled
+
+
+def _batch_load_fields(fields, instances):
+    for field in fields.values():
+        if isinstance(field, BatchLoadedPostField):
+            field.batch_load(posts=instances)
+        elif isinstance(field, Serializer) and _has_batch_loaded_fields(fields=field.fields):
+            # Nested post serializers, e.g. the post of a top post
+            nested_instances = [field.get_attribute(instance) for instance in instances]
+            _batch_load_fields(fields=field.fields,
+                               instances=[nested_instance for nested_instance in nested_instances if nested_instance])
+
+
+def _has_batch_loaded_fields(fields):
+    for field in fields.values():
+        if isinstance(field, BatchLoadedPostField):
+            return True
+        if isinstance(field, Serializer) and _has_batch_loaded_fields(fields=field.fields):
+            return True
+    return False
+
+
+def _get_post_counter(post):
+    try:
+        return post.counter
+    except PostCounter.DoesNotExist:
+        return None
+
+
+def _request_user_has_user_blocks(context, request_user):
+    # The post counters don't account for blocks, checked once per serialization
+    if 'request_user_has_user_blocks' not in context:
+        context['request_user_has_user_blocks'] = request_user.has_user_blocks()
+    return context['request_user_has_user_blocks']
+
+
+def _request_user_has_reported_post_comments(context, request_user):
+    # The post comments counters don't account for reported comments, checked once per serialization
+    if 'request_user_has_reported_post_comments' not in context:
+        context['request_user_has_reported_post_comments'] = request_user.has_reported_post_comments()
+    return context['request_user_has_reported_post_comments']
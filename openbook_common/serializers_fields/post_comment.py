@@ -39,9 +39,12 @@ class RepliesCountField(Field):
 
     def to_representation(self, post_comment):
         request = self.context.get('request')
+        post_comments_replies_counts = self.context.get('post_comments_replies_counts')
         request_user = request.user
 
-        if request_user.is_anonymous:
+        if post_comments_replies_counts is not None and post_comment.pk in post_comments_replies_counts:
+            replies_count = post_comments_replies_counts[post_comment.pk]
+        elif request_user.is_anonymous:
             replies_count = post_comment.count_replies()
         else:
             replies_count = request_user.get_replies_count_for_post_comment(post_comment=post_comment)
@@ -58,9 +61,13 @@ class PostCommentReactionsEmojiCountField(Field):
 
     def to_representation(self, post_comment):
         request = self.context.get('request')
+        post_comments_reactions_emoji_counts = self.context.get('post_comments_reactions_emoji_counts')
         request_user = request.user
 
-        if request_user.is_anonymous:
+        if post_comments_reactions_emoji_counts is not None and \
+                post_comment.pk in post_comments_reactions_emoji_counts:
+            reaction_emoji_count = post_comments_reactions_emoji_counts[post_comment.pk]
+        elif request_user.is_anonymous:
             PostComment = get_post_comment_model()
             reaction_emoji_count = PostComment.get_emoji_counts_for_post_comment_with_id(post_comment.pk)
         else:
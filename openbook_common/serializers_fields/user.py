@@ -50,7 +50,7 @@ class IsFollowedField(Field):
         if not request.user.is_anonymous:
             if request.user.pk == user.pk:
                 return False
-            return user.is_following_user_with_id(request.user.pk)
+            return request.user.is_followed_by_user_with_id(user.pk)
 
         return False
 
@@ -202,7 +202,7 @@ class FollowersCountField(Field):
         if not user.profile.followers_count_visible and user.pk != request_user.pk:
             return None
 
-        return user.count_followers()
+        return user.profile.followers_count
 
 
 class IsGlobalModeratorField(Field):
@@ -222,7 +222,7 @@ class FollowingCountField(Field):
         super(FollowingCountField, self).__init__(**kwargs)
 
     def to_representation(self, value):
-        return value.count_following()
+        return value.profile.following_count
 
 
 class UserPostsCountField(Field):
@@ -236,8 +236,8 @@ class UserPostsCountField(Field):
 
         if not request.user.is_anonymous:
             if request.user.pk == value.pk:
-                return value.count_posts()
-            return value.count_posts_for_user_with_id(request.user.pk)
+                return value.profile.posts_count
+            return value.count_posts_for_user(user=request.user)
 
         User = get_user_model()
         return User.count_unauthenticated_public_posts_for_user_with_username(username=value.username)
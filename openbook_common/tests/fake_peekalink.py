@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+
+
+class FakePeekalinkServer:
+    """
+    A local stand-in for the Peekalink API, to preview links without the network.
+    Answers the links in peekable_links as peekable, the given statuses first, e.g. to open the circuit breaker,
+    and every response after response_delay_in_seconds, e.g. to check links concurrently.
+
+        with FakePeekalinkServer(peekable_links=['https://okuna.io/']) as fake_peekalink:
+            client = PeekalinkClient(api_key='key', api_root=fake_peekalink.api_root)
+    """
+
+    def __init__(self, peekable_links=None, responses_statuses=None, response_delay_in_seconds=0):
+        self.peekable_links = set(peekable_links or [])
+        self.responses_statuses = list(responses_statuses or [])
+        self.response_delay_in_seconds = response_delay_in_seconds
+        self.requests_count = 0
+        self.max_concurrent_requests_count = 0
+        self._concurrent_requests_count = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def api_root(self):
+        host, port = self._server.server_address
+        return 'http://%s:%d' % (host, port)
+
+    def __enter__(self):
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), self._make_request_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _make_request_handler(self):
+        fake_server = self
+
+        class FakePeekalinkRequestHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                with fake_server._lock:
+                    fake_server.requests_count += 1
+                    fake_server._concurrent_requests_count += 1
+                    fake_server.max_concurrent_requests_count = max(fake_server.max_concurrent_requests_count,
+                                                                    fake_server._concurrent_requests_count)
+                    status = fake_server.responses_statuses.pop(0) if fake_server.responses_statuses else 200
+
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+                link = _parse_link(body)
+
+                time.sleep(fake_server.response_delay_in_seconds)
+
+                if status != 200:
+                    response_body = {'error': 'Fake error'}
+                elif self.path == '/is-peekable/':
+                    response_body = {'isPeekable': link in fake_server.peekable_links}
+                else:
+                    response_body = {'url': link, 'title': 'Preview of %s' % link}
+
+                response_content = json.dumps(response_body).encode('utf-8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response_content)))
+                self.end_headers()
+                self.wfile.write(response_content)
+
+                with fake_server._lock:
+                    fake_server._concurrent_requests_count -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return FakePeekalinkRequestHandler
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def _parse_link(body):
+    return parse_qs(body).get('link', [None])[0]
@@ -2,11 +2,21 @@ from unittest.mock import patch
 
 from rest_framework.test import APITestCase
 
+from openbook_common.helpers import clear_languages_cache
+from openbook_common.proxy_blacklist import clear_proxy_blacklisted_domains_cache
+
 
 class OpenbookAPITestCase(APITestCase):
     def setUp(self):
         self.patcher = patch('openbook_notifications.helpers._send_notification_to_user')
         self.mock_foo = self.patcher.start()
+        self.users_patcher = patch('openbook_notifications.helpers._send_notification_to_users')
+        self.users_patcher.start()
+        # The languages of a previous test are rolled back without a signal
+        clear_languages_cache()
+        # As are the proxy blacklisted domains
+        clear_proxy_blacklisted_domains_cache()
 
     def tearDown(self):
         self.patcher.stop()
+        self.users_patcher.stop()
@@ -0,0 +1,37 @@
+from openbook_auth.models import User
+from openbook_common.tests.helpers import make_user
+from openbook_common.tests.models import OpenbookAPITestCase
+from openbook_common.utils.pagination import paginate_union_by_id
+
+
+class PaginateUnionByIdTests(OpenbookAPITestCase):
+    """
+    paginate_union_by_id
+    """
+
+    def test_returns_a_list_of_the_highest_ids(self):
+        """
+        should return a list with the highest ids of the union below max_id, without repeating items
+        """
+        users = [make_user() for i in range(0, 6)]
+        users_ids = [user.pk for user in users]
+
+        even_users = User.objects.filter(pk__in=users_ids[::2])
+        odd_users = User.objects.filter(pk__in=users_ids[1::2])
+        all_users = User.objects.filter(pk__in=users_ids)
+
+        page = paginate_union_by_id([even_users, odd_users, all_users], count=3, max_id=users_ids[-1])
+
+        self.assertIsInstance(page, list)
+        self.assertEqual([user.pk for user in page], list(reversed(users_ids[2:5])))
+
+    def test_returns_a_list_for_a_single_queryset(self):
+        """
+        should return a list when there's a single queryset to paginate
+        """
+        users = [make_user() for i in range(0, 2)]
+
+        page = paginate_union_by_id([User.objects.filter(pk__in=[user.pk for user in users])], count=1)
+
+        self.assertIsInstance(page, list)
+        self.assertEqual([user.pk for user in page], [users[-1].pk])
@@ -0,0 +1,98 @@
+from openbook_common.peekalink_client import PeekalinkClient, PeekalinkCircuitBreaker, PeekalinkUnavailableError
+from openbook_common.tests.fake_peekalink import FakePeekalinkServer
+from openbook_common.tests.models import OpenbookAPITestCase
+
+
+class PeekalinkClientTests(OpenbookAPITestCase):
+    """
+    PeekalinkClient
+    """
+
+    def test_checks_links_concurrently(self):
+        """
+        should check whether several links are peekable concurrently
+        """
+        peekable_links = ['https://www.okuna.io/%d' % i for i in range(0, 4)]
+        links = peekable_links + ['https://www.okuna.io/not-peekable']
+
+        with FakePeekalinkServer(peekable_links=peekable_links, response_delay_in_seconds=0.2) as fake_peekalink:
+            client = PeekalinkClient(api_key='key', api_root=fake_peekalink.api_root, pool_maxsize=5)
+            links_are_peekable = client.are_peekable(links=links)
+
+        self.assertEqual(fake_peekalink.requests_count, 5)
+        self.assertGreater(fake_peekalink.max_concurrent_requests_count, 1)
+
+        for link in peekable_links:
+            self.assertTrue(links_are_peekable[link])
+
+        self.assertFalse(links_are_peekable['https://www.okuna.io/not-peekable'])
+
+    def test_opens_circuit_when_peekalink_fails(self):
+        """
+        should stop requesting Peekalink once too many requests failed
+        """
+        circuit_breaker = PeekalinkCircuitBreaker(window_size=4, min_requests=4, open_duration_in_seconds=60)
+
+        with FakePeekalinkServer(responses_statuses=[503] * 4) as fake_peekalink:
+            client = PeekalinkClient(api_key='key', api_root=fake_peekalink.api_root, max_retries=0,
+                                     circuit_breaker=circuit_breaker)
+
+            for i in range(0, 4):
+                link = 'https://www.okuna.io/%d' % i
+                self.assertFalse(client.are_peekable(links=[link])[link])
+
+            self.assertTrue(circuit_breaker.is_open())
+
+            self.assertIsNone(client.are_peekable(links=['https://www.okuna.io/'])['https://www.okuna.io/'])
+            self.assertRaises(PeekalinkUnavailableError, client.is_peekable, 'https://www.okuna.io/')
+
+        self.assertEqual(fake_peekalink.requests_count, 4)
+
+    def test_closes_circuit_when_probe_succeeds(self):
+        """
+        should close the circuit once a probe request succeeds
+        """
+        circuit_breaker = PeekalinkCircuitBreaker(window_size=2, min_requests=2, open_duration_in_seconds=0)
+
+        with FakePeekalinkServer(peekable_links=['https://www.okuna.io/'],
+                                 responses_statuses=[503, 503]) as fake_peekalink:
+            client = PeekalinkClient(api_key='key', api_root=fake_peekalink.api_root, max_retries=0,
+                                     circuit_breaker=circuit_breaker)
+
+            client.are_peekable(links=['https://www.okuna.io/a'])
+            client.are_peekable(links=['https://www.okuna.io/b'])
+
+            self.assertTrue(circuit_breaker.is_open())
+
+            self.assertTrue(client.is_peekable('https://www.okuna.io/'))
+
+        self.assertFalse(circuit_breaker.is_open())
+
+    def test_does_not_open_circuit_for_rejected_links(self):
+        """
+        should not count the links rejected by Peekalink as Peekalink failing
+        """
+        circuit_breaker = PeekalinkCircuitBreaker(window_size=2, min_requests=2)
+
+        with FakePeekalinkServer(responses_statuses=[400, 400]) as fake_peekalink:
+            client = PeekalinkClient(api_key='key', api_root=fake_peekalink.api_root, circuit_breaker=circuit_breaker)
+            client.are_peekable(links=['https://www.okuna.io/a', 'https://www.okuna.io/b'])
+
+        self.assertFalse(circuit_breaker.is_open())
+
+    def test_keeps_metrics(self):
+        """
+        should keep the requests count, failures and latency
+        """
+        with FakePeekalinkServer(peekable_links=['https://www.okuna.io/'],
+                                 responses_statuses=[200, 503]) as fake_peekalink:
+            client = PeekalinkClient(api_key='key', api_root=fake_peekalink.api_root, max_retries=0)
+            client.is_peekable('https://www.okuna.io/')
+            client.are_peekable(links=['https://www.okuna.io/a'])
+
+        metrics = client.get_metrics()
+
+        self.assertEqual(metrics['requests'], 2)
+        self.assertEqual(metrics['failed_requests'], 1)
+        self.assertIn('average_latency_in_seconds', metrics)
+        self.assertFalse(metrics['is_circuit_open'])
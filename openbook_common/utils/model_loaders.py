@@ -25,10 +25,34 @@ def get_top_post_model():
     return apps.get_model('openbook_posts.TopPost')
 
 
+def get_posts_curation_watermark_model():
+    return apps.get_model('openbook_posts.PostsCurationWatermark')
+
+
 def get_trending_post_model():
     return apps.get_model('openbook_posts.TrendingPost')
 
 
+def get_trending_post_score_model():
+    return apps.get_model('openbook_posts.TrendingPostScore')
+
+
+def get_post_counter_model():
+    return apps.get_model('openbook_posts.PostCounter')
+
+
+def get_post_reaction_emoji_count_model():
+    return apps.get_model('openbook_posts.PostReactionEmojiCount')
+
+
+def get_timeline_model():
+    return apps.get_model('openbook_posts.Timeline')
+
+
+def get_timeline_post_model():
+    return apps.get_model('openbook_posts.TimelinePost')
+
+
 def get_top_post_community_exclusion_model():
     return apps.get_model('openbook_posts.TopPostCommunityExclusion')
 
@@ -89,6 +113,10 @@ def get_post_comment_model():
     return apps.get_model('openbook_posts.PostComment')
 
 
+def get_post_link_model():
+    return apps.get_model('openbook_posts.PostLink')
+
+
 def get_post_reaction_model():
     return apps.get_model('openbook_posts.PostReaction')
 
@@ -197,6 +225,10 @@ def get_user_model():
     return apps.get_model('openbook_auth.User')
 
 
+def get_user_profile_model():
+    return apps.get_model('openbook_auth.UserProfile')
+
+
 def get_user_notifications_subscription_model():
     return apps.get_model('openbook_auth.UserNotificationsSubscription')
 
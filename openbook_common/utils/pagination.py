@@ -0,0 +1,125 @@
+import time
+
+from django.db import connections
+from django.db.models import Q
+
+
+def paginate_queryset_by_id(queryset, count=None, max_id=None, min_id=None):
+    """
+    Returns the page of the queryset with the highest ids below max_id or above min_id.
+    The page is read newest first from the id index, so deep pages cost the same as the first one.
+    """
+    queryset = _filter_by_id_boundary(queryset, max_id=max_id, min_id=min_id).order_by('-id')
+
+    if count is not None:
+        queryset = queryset[:count]
+
+    return queryset
+
+
+def paginate_union_by_id(querysets, count=None, max_id=None, min_id=None):
+    """
+    Returns the page of the union of the querysets with the highest ids below max_id or above min_id, as a list
+    on every database. The boundary and the limit are pushed into every queryset of the union, so each one reads
+    at most a page from the id index and only those pages are merged.
+    """
+    querysets = [_filter_by_id_boundary(queryset, max_id=max_id, min_id=min_id) for queryset in querysets]
+
+    first_queryset = querysets[0]
+
+    if len(querysets) == 1:
+        return list(paginate_queryset_by_id(first_queryset, count=count))
+
+    if count is None:
+        return list(first_queryset.union(*querysets[1:]).order_by('-id'))
+
+    querysets_pages = [paginate_queryset_by_id(queryset, count=count) for queryset in querysets]
+
+    if connections[first_queryset.db].features.supports_slicing_ordering_in_compound:
+        return list(querysets_pages[0].union(*querysets_pages[1:]).order_by('-id')[:count])
+
+    # The database can't limit the queries of a union (e.g. SQLite), the pages are merged here instead
+    items_by_id = {}
+
+    for queryset_page in querysets_pages:
+        for item in queryset_page:
+            items_by_id.setdefault(item.pk, item)
+
+    return [items_by_id[item_id] for item_id in sorted(items_by_id, reverse=True)[:count]]
+
+
+def paginate_window_by_id(queryset, max_id=None, min_id=None, count_max=None, count_min=None, reverse=True):
+    """
+    Returns the count_max items below max_id and the count_min items from min_id onwards (min_id included),
+    e.g. the comments around a linked comment. Both halves are read with a single union query and sorted
+    by id in the database, newest first unless reverse is False.
+    """
+    querysets_pages = []
+
+    if max_id:
+        querysets_pages.append(queryset.filter(Q(id__lt=max_id)).order_by('-id')[:count_max])
+
+    if min_id:
+        querysets_pages.append(queryset.filter(Q(id__gte=min_id)).order_by('id')[:count_min])
+
+    return union_querysets_pages(querysets_pages, ordering='-id' if reverse else 'id')
+
+
+def union_querysets_pages(querysets_pages, ordering):
+    """
+    Returns the items of the already limited querysets, e.g. the first replies of several comments,
+    read with a single union query and sorted by the given id ordering.
+    """
+    if not querysets_pages:
+        return []
+
+    first_queryset_page = querysets_pages[0]
+
+    if len(querysets_pages) == 1:
+        items = list(first_queryset_page)
+
+        # A single page is already sorted by id, only its direction can differ
+        if tuple(first_queryset_page.query.order_by) != (ordering,):
+            items.reverse()
+
+        return items
+
+    if connections[first_queryset_page.db].features.supports_slicing_ordering_in_compound:
+        return list(first_queryset_page.union(*querysets_pages[1:]).order_by(ordering))
+
+    # The database can't limit the queries of a union (e.g. SQLite), the pages are merged here instead
+    items_by_id = {}
+
+    for queryset_page in querysets_pages:
+        for item in queryset_page:
+            items_by_id.setdefault(item.pk, item)
+
+    return [items_by_id[item_id] for item_id in
+            sorted(items_by_id, reverse=ordering.startswith('-'))]
+
+
+def chunked_queryset_ids_iterator(queryset, size, durations=None):
+    """
+    Split the ids of a queryset into keyset paginated chunks.
+    If durations is given, the time spent retrieving the ids is added to its candidates key
+    """
+    last_id = 0
+    while True:
+        chunk_started = time.perf_counter()
+        ids = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:size])
+        if durations is not None:
+            durations['candidates'] += time.perf_counter() - chunk_started
+        if not ids:
+            return
+        yield ids
+        if len(ids) < size:
+            return
+        last_id = ids[-1]
+
+
+def _filter_by_id_boundary(queryset, max_id=None, min_id=None):
+    if max_id:
+        return queryset.filter(Q(id__lt=max_id))
+    elif min_id:
+        return queryset.filter(Q(id__gt=min_id))
+    return queryset
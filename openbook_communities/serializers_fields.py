@@ -1,6 +1,7 @@
 from rest_framework.fields import Field
 
-from openbook_communities.models import Community
+from openbook_common.serializers_fields.post import BatchLoadedPostField
+from openbook_communities.models import Community, CommunityMembership
 
 
 class IsInvitedField(Field):
@@ -117,22 +118,40 @@ class AdministratorsField(Field):
         return self.administrator_serializer(administrators, context={"request": request}, many=True).data
 
 
-class CommunityMembershipsField(Field):
+class CommunityMembershipsField(BatchLoadedPostField):
     def __init__(self, community_membership_serializer=None, **kwargs):
-        kwargs['source'] = '*'
-        kwargs['read_only'] = True
         self.community_membership_serializer = community_membership_serializer
         super(CommunityMembershipsField, self).__init__(**kwargs)
 
+    def load_for_posts(self, posts, request_user):
+        # Nested in a post serializer, the field is batch loaded for the communities of the posts
+        if request_user.is_anonymous:
+            return None
+
+        memberships = CommunityMembership.objects.filter(user_id=request_user.pk,
+                                                         community_id__in={community.pk for community in posts})
+
+        return {membership.community_id: membership for membership in memberships}
+
     def to_representation(self, community):
         request = self.context.get('request')
         request_user = request.user
 
-        if request_user.is_anonymous or not request_user.is_member_of_community_with_name(
-                community_name=community.name):
+        if request_user.is_anonymous:
             return None
 
-        membership = community.memberships.get(user=request_user)
+        memberships = self.get_batch_loaded()
+
+        if memberships is not None:
+            membership = memberships.get(community.pk)
+
+            if not membership:
+                return None
+        else:
+            if not request_user.is_member_of_community_with_name(community_name=community.name):
+                return None
+
+            membership = community.memberships.get(user=request_user)
 
         return self.community_membership_serializer([membership], context={"request": request}, many=True).data
 
@@ -1,3 +1,5 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from faker import Faker
 from openbook_common.tests.models import OpenbookAPITestCase
@@ -7,10 +9,12 @@ import logging
 import json
 
 from openbook_common.tests.helpers import make_user, make_authentication_headers_for_user, \
-    make_community, make_fake_post_text, make_post_image, make_moderation_category
+    make_community, make_fake_post_text, make_post_image, make_moderation_category, make_emoji, \
+    make_reactions_emoji_group, make_fake_post_comment_text
 from openbook_communities.models import Community, CommunityNotificationsSubscription
 from openbook_moderation.models import ModeratedObject
 from openbook_notifications.models import CommunityNewPostNotification
+from openbook_posts.jobs import fan_out_post_notifications
 from openbook_posts.models import Post, PostUserMention
 from openbook_notifications.models import Notification
 
@@ -727,6 +731,9 @@ class CommunityPostsAPITest(OpenbookAPITestCase):
             'text': make_fake_post_text()
         }
         response = self.client.put(url, data, **headers, format='multipart')
+        response_post = json.loads(response.content)
+
+        fan_out_post_notifications(post_id=response_post['id'])
 
         community_notifications_subscription = CommunityNotificationsSubscription.objects.get(subscriber=user,
                                                                                               community=community)
@@ -763,6 +770,9 @@ class CommunityPostsAPITest(OpenbookAPITestCase):
             'text': make_fake_post_text()
         }
         response = self.client.put(url, data, **headers, format='multipart')
+        response_post = json.loads(response.content)
+
+        fan_out_post_notifications(post_id=response_post['id'])
 
         community_notifications_subscription = CommunityNotificationsSubscription.objects.get(subscriber=blocking_user,
                                                                                               community=community)
@@ -795,6 +805,9 @@ class CommunityPostsAPITest(OpenbookAPITestCase):
             'text': make_fake_post_text()
         }
         response = self.client.put(url, data, **headers, format='multipart')
+        response_post = json.loads(response.content)
+
+        fan_out_post_notifications(post_id=response_post['id'])
 
         community_notifications_subscription = CommunityNotificationsSubscription.objects.get(
             subscriber=community_admin,
@@ -834,6 +847,9 @@ class CommunityPostsAPITest(OpenbookAPITestCase):
             'text': make_fake_post_text()
         }
         response = self.client.put(url, data, **headers, format='multipart')
+        response_post = json.loads(response.content)
+
+        fan_out_post_notifications(post_id=response_post['id'])
 
         # notification should only be for community susbcribed to
         self.assertEqual(CommunityNewPostNotification.objects.filter(
@@ -849,6 +865,145 @@ class CommunityPostsAPITest(OpenbookAPITestCase):
         self.assertEqual(retrieved_notifications_subscription.pk, community_notifications_subscription.pk)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_retrieves_batch_loaded_post_fields_for_each_post(self):
+        """
+        should retrieve the reaction, muted state, comments count and creator membership of each post of the page
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community_creator = make_user()
+        community = make_community(creator=community_creator, type='P')
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        reacted_post = community_creator.create_community_post(community_name=community.name,
+                                                               text=make_fake_post_text())
+        user.react_to_post_with_id(post_id=reacted_post.pk, emoji_id=emoji.pk)
+        user.comment_post(post=reacted_post, text=make_fake_post_comment_text())
+
+        muted_post = community_creator.create_community_post(community_name=community.name,
+                                                             text=make_fake_post_text())
+        user.mute_post_with_id(post_id=muted_post.pk)
+
+        url = self._get_url(community_name=community.name)
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = {response_post['id']: response_post for response_post in json.loads(response.content)}
+
+        response_reacted_post = response_posts[reacted_post.pk]
+        self.assertEqual(response_reacted_post['reaction']['emoji']['id'], emoji.pk)
+        self.assertFalse(response_reacted_post['is_muted'])
+        self.assertEqual(response_reacted_post['comments_count'], 1)
+        self.assertEqual(response_reacted_post['reactions_emoji_counts'][0]['count'], 1)
+
+        response_muted_post = response_posts[muted_post.pk]
+        self.assertIsNone(response_muted_post['reaction'])
+        self.assertTrue(response_muted_post['is_muted'])
+        self.assertEqual(response_muted_post['comments_count'], 0)
+
+        for response_post in response_posts.values():
+            creator_memberships = response_post['creator']['communities_memberships']
+            self.assertEqual(len(creator_memberships), 1)
+            self.assertTrue(creator_memberships[0]['is_administrator'])
+
+    def test_retrieves_posts_with_as_many_queries_for_any_number_of_posts(self):
+        """
+        should retrieve a page of posts running the same number of queries no matter how many posts it has
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community_creator = make_user()
+        community = make_community(creator=community_creator, type='P')
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        url = self._get_url(community_name=community.name)
+
+        queries_counts = []
+
+        for posts_count in [2, 6]:
+            while Post.objects.filter(community_id=community.pk).count() < posts_count:
+                post_creator = make_user()
+                post_creator.join_community_with_name(community_name=community.name)
+                post = post_creator.create_community_post(community_name=community.name,
+                                                          text=make_fake_post_text())
+                user.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+                post_creator.comment_post(post=post, text=make_fake_post_comment_text())
+                user.mute_post_with_id(post_id=post.pk)
+
+            # The first request warms up the caches, e.g. the one of the request user relationships
+            self.client.get(url, **headers)
+
+            with CaptureQueriesContext(connection) as queries_context:
+                response = self.client.get(url, **headers)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(json.loads(response.content)), posts_count)
+
+            queries_counts.append(len(queries_context.captured_queries))
+
+        self.assertEqual(queries_counts[0], queries_counts[1])
+
+    def test_retrieves_posts_counts_for_a_user_with_blocks_with_as_many_queries_for_any_number_of_posts(self):
+        """
+        should leave the blocked users comments and reactions out of the counts of a user with blocks, running the
+        same number of queries no matter how many posts the page has
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community_creator = make_user()
+        community = make_community(creator=community_creator, type='P')
+
+        blocked_user = make_user()
+        blocked_user.join_community_with_name(community_name=community.name)
+        user.block_user_with_id(user_id=blocked_user.pk)
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        url = self._get_url(community_name=community.name)
+
+        queries_counts = []
+
+        for posts_count in [2, 6]:
+            while Post.objects.filter(community_id=community.pk).count() < posts_count:
+                post_creator = make_user()
+                post_creator.join_community_with_name(community_name=community.name)
+                post = post_creator.create_community_post(community_name=community.name,
+                                                          text=make_fake_post_text())
+                post_creator.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+                post_creator.comment_post(post=post, text=make_fake_post_comment_text())
+                blocked_user.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+                blocked_user.comment_post(post=post, text=make_fake_post_comment_text())
+
+            # The first request warms up the caches, e.g. the one of the request user relationships
+            self.client.get(url, **headers)
+
+            with CaptureQueriesContext(connection) as queries_context:
+                response = self.client.get(url, **headers)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response_posts = json.loads(response.content)
+            self.assertEqual(len(response_posts), posts_count)
+
+            for response_post in response_posts:
+                self.assertEqual(response_post['comments_count'], 1)
+                self.assertEqual(len(response_post['reactions_emoji_counts']), 1)
+                self.assertEqual(response_post['reactions_emoji_counts'][0]['emoji']['id'], emoji.pk)
+                self.assertEqual(response_post['reactions_emoji_counts'][0]['count'], 1)
+
+            queries_counts.append(len(queries_context.captured_queries))
+
+        self.assertEqual(queries_counts[0], queries_counts[1])
+
     def _get_url(self, community_name):
         return reverse('community-posts', kwargs={
             'community_name': community_name
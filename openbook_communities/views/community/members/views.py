@@ -7,6 +7,7 @@ from rest_framework.views import APIView
 
 from openbook_moderation.permissions import IsNotSuspended
 from openbook_common.utils.helpers import normalise_request_data, normalize_list_value_in_request_data
+from openbook_common.utils.pagination import paginate_queryset_by_id
 from openbook_communities.views.community.members.serializers import JoinCommunitySerializer, \
     GetCommunityMembersSerializer, GetCommunityMembersMemberSerializer, LeaveCommunitySerializer, \
     InviteCommunityMemberSerializer, MembersCommunitySerializer, SearchCommunityMembersSerializer, InviteUserSerializer
@@ -32,8 +33,8 @@ class CommunityMembers(APIView):
         user = request.user
 
         members = user.get_community_with_name_members(community_name=community_name, max_id=max_id,
-                                                       exclude_keywords=exclude).order_by(
-            '-id')[:count]
+                                                       exclude_keywords=exclude)
+        members = paginate_queryset_by_id(members, count=count)
 
         response_serializer = GetCommunityMembersMemberSerializer(members, many=True,
                                                                   context={"request": request})
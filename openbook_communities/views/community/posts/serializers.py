@@ -6,7 +6,7 @@ from openbook_common.serializers import CommonPublicUserSerializer, \
     CommonPostReactionSerializer, CommonPostLanguageSerializer, CommonHashtagSerializer, CommonPostLinkSerializer
 from openbook_common.serializers_fields.community import CommunityPostsCountField
 from openbook_common.serializers_fields.post import PostReactionsEmojiCountField, CommentsCountField, PostCreatorField, \
-    PostIsMutedField, ReactionField
+    PostIsMutedField, ReactionField, PostListSerializer
 from openbook_common.serializers_fields.request import RestrictedImageFileSizeField
 from openbook_communities.models import Community
 from openbook_communities.validators import community_name_characters_validator, community_name_exists
@@ -55,6 +55,7 @@ class CommunityPostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
+        list_serializer_class = PostListSerializer
         fields = (
             'id',
             'uuid',
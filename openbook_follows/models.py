@@ -1,7 +1,7 @@
 from django.db import models
 
 # Create your models here.
-from openbook_auth.models import User
+from openbook_auth.models import User, UserProfile
 
 
 class Follow(models.Model):
@@ -21,6 +21,8 @@ class Follow(models.Model):
         if lists_ids:
             follow.lists.add(*lists_ids)
 
+        UserProfile.increment_follows_counts(user_id=user_id, followed_user_id=followed_user_id)
+
         return follow
 
 
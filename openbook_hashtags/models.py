@@ -70,6 +70,27 @@ class Hashtag(models.Model):
 
         return hashtag
 
+    @classmethod
+    def get_or_create_hashtags_with_names(cls, names):
+        """
+        Returns the hashtags with the names, the missing ones are created with a single insert
+        """
+        names = set(name.lower() for name in names)
+
+        existing_names = set(cls.objects.filter(name__in=names).values_list('name', flat=True))
+
+        created = timezone.now()
+        missing_hashtags = [cls(name=name, color=get_random_pastel_color(), created=created) for name in names if
+                            name not in existing_names]
+
+        for missing_hashtag in missing_hashtags:
+            # Unique names are left to the insert, a hashtag created meanwhile is ignored
+            missing_hashtag.full_clean(validate_unique=False)
+
+        cls.objects.bulk_create(missing_hashtags, ignore_conflicts=True)
+
+        return list(cls.objects.filter(name__in=names))
+
     @classmethod
     def hashtag_with_name_exists(cls, hashtag_name):
         return cls.objects.filter(name=hashtag_name).exists()
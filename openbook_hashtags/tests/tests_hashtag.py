@@ -1,5 +1,7 @@
 import json
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from faker import Faker
 from rest_framework import status
@@ -9,6 +11,7 @@ from openbook_common.tests.helpers import make_user, make_authentication_headers
 from openbook_common.tests.models import OpenbookAPITestCase
 from openbook_communities.models import Community
 from openbook_moderation.models import ModeratedObject
+from openbook_posts.models import Post
 
 fake = Faker()
 
@@ -350,6 +353,46 @@ class HashtagPostsAPITests(OpenbookAPITestCase):
 
         self.assertEqual(len(parsed_response), 0)
 
+    def test_retrieves_posts_with_hashtag_with_as_many_queries_for_any_number_of_posts(self):
+        """
+        should retrieve a page of posts with a given hashtag running the same number of queries no matter how many
+        posts it has
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+        user.join_community_with_name(community_name=community.name)
+
+        hashtag = make_hashtag()
+
+        url = self._get_url(hashtag_name=hashtag.name)
+
+        queries_counts = []
+
+        for posts_count in [2, 6]:
+            while Post.objects.filter(hashtags__id=hashtag.pk).count() < posts_count:
+                post_creator = make_user()
+                post_creator.join_community_with_name(community_name=community.name)
+
+                fake_post_text = make_fake_post_text() + ' and a little hashtag #%s' % hashtag.name
+                post_creator.create_public_post(text=fake_post_text)
+                post_creator.create_community_post(community_name=community.name, text=fake_post_text)
+
+            # The first request warms up the caches, e.g. the one of the request user relationships
+            self.client.get(url, **headers)
+
+            with CaptureQueriesContext(connection) as queries_context:
+                response = self.client.get(url, **headers)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(json.loads(response.content)), posts_count)
+
+            queries_counts.append(len(queries_context.captured_queries))
+
+        self.assertEqual(queries_counts[0], queries_counts[1])
+
     def _get_url(self, hashtag_name):
         return reverse('hashtag-posts', kwargs={
             'hashtag_name': hashtag_name
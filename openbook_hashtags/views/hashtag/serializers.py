@@ -7,7 +7,7 @@ from openbook_common.serializers import CommonPublicUserSerializer, \
     CommonEmojiSerializer
 from openbook_common.serializers_fields.hashtag import HashtagPostsCountField, IsHashtagReportedField
 from openbook_common.serializers_fields.post import ReactionField, CommentsCountField, PostCreatorField, \
-    PostReactionsEmojiCountField, PostIsMutedField, IsEncircledField, CirclesField
+    PostReactionsEmojiCountField, PostIsMutedField, IsEncircledField, CirclesField, PostListSerializer
 from openbook_hashtags.models import Hashtag
 from openbook_hashtags.validators import hashtag_name_exists
 from openbook_posts.models import Post
@@ -68,6 +68,7 @@ class GetHashtagPostsPostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
+        list_serializer_class = PostListSerializer
         fields = (
             'id',
             'uuid',
@@ -2,14 +2,17 @@ from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 
 # Create your models here.
 from django.utils import timezone
 
 from openbook_auth.models import User
+from openbook_auth.token_credentials import invalidate_token_credentials_for_user_with_id
 from openbook_common.utils.model_loaders import get_post_model, get_post_comment_model, get_community_model, \
-    get_user_model, get_moderation_penalty_model, get_hashtag_model
+    get_user_model, get_moderation_penalty_model, get_hashtag_model, get_post_counter_model
 
 
 class ModerationCategory(models.Model):
@@ -283,6 +286,12 @@ class ModeratedObject(models.Model):
 
         self.save()
 
+        if isinstance(content_object, PostComment):
+            self._rebuild_post_comments_count(post_comment=content_object)
+        elif isinstance(content_object, Post):
+            # Approved posts are not counted in the profile of their creator
+            content_object.rebuild_creator_posts_counts()
+
     def reject_with_actor_with_id(self, actor_id):
         current_status = self.status
         self.status = ModeratedObject.STATUS_REJECTED
@@ -290,6 +299,21 @@ class ModeratedObject(models.Model):
             changed_from=current_status, changed_to=self.status, moderated_object_id=self.pk, actor_id=actor_id)
         self.save()
 
+        Post = get_post_model()
+        PostComment = get_post_comment_model()
+        content_object = self.content_object
+
+        if isinstance(content_object, PostComment):
+            self._rebuild_post_comments_count(post_comment=content_object)
+        elif isinstance(content_object, Post):
+            # Approved posts are not counted in the profile of their creator
+            content_object.rebuild_creator_posts_counts()
+
+    def _rebuild_post_comments_count(self, post_comment):
+        # Approved post comments are not counted in community posts
+        PostCounter = get_post_counter_model()
+        PostCounter.rebuild_comments_count_for_post_with_id(post_id=post_comment.post_id)
+
     def get_reporters(self):
         return User.objects.filter(moderation_reports__moderated_object_id=self.pk).all()
 
@@ -479,3 +503,12 @@ class ModeratedObjectVerifiedChangedLog(models.Model):
         ModeratedObjectLog.create_moderated_object_log(log_type=ModeratedObjectLog.LOG_TYPE_VERIFIED_CHANGED,
                                                        content_object=moderated_object_description_changed_log,
                                                        moderated_object_id=moderated_object_id, actor_id=actor_id)
+
+
+@receiver(post_save, sender=ModerationPenalty, dispatch_uid='moderation_penalty_saved_invalidate_token_credentials')
+@receiver(post_delete, sender=ModerationPenalty, dispatch_uid='moderation_penalty_deleted_invalidate_token_credentials')
+def invalidate_penalized_user_token_credentials(sender, instance=None, **kwargs):
+    """"
+    Make the authentication of the user see its suspension change
+    """
+    invalidate_token_credentials_for_user_with_id(user_id=instance.user_id)
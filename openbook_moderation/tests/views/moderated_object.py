@@ -25,6 +25,7 @@ from openbook_communities.models import Community
 from openbook_moderation.models import ModeratedObject, ModeratedObjectDescriptionChangedLog, \
     ModeratedObjectCategoryChangedLog, ModerationPenalty, ModerationCategory, ModeratedObjectStatusChangedLog, \
     ModeratedObjectVerifiedChangedLog
+from openbook_posts.jobs import fan_out_post_notifications
 from openbook_posts.models import Post, PostComment
 
 fake = Faker()
@@ -1006,6 +1007,8 @@ class ApproveModeratedObjectApiTests(OpenbookAPITestCase):
         reporter_user.enable_new_post_notifications_for_user_with_username(username=user.username)
         post = user.create_public_post(text=make_fake_post_text())
 
+        fan_out_post_notifications(post_id=post.pk)
+
         report_category = make_moderation_category(severity=ModerationCategory.SEVERITY_CRITICAL)
         reporter_user.report_user_with_username(username=user.username, category_id=report_category.pk)
 
@@ -1205,6 +1208,8 @@ class ApproveModeratedObjectApiTests(OpenbookAPITestCase):
 
         post = community_admin.create_community_post(text=make_fake_post_text(), community_name=community.name)
 
+        fan_out_post_notifications(post_id=post.pk)
+
         report_category = make_moderation_category()
         reporter_community.report_community(community=community,
                                             category_id=report_category.pk)
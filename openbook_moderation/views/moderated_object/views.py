@@ -148,9 +148,8 @@ class ModeratedObjectLogs(APIView):
         user = request.user
 
         with transaction.atomic():
-            moderated_object_logs = user.get_logs_for_moderated_object_with_id(max_id=max_id,
-                                                                               moderated_object_id=moderated_object_id).order_by(
-                '-id')[:count]
+            moderated_object_logs = user.get_logs_for_moderated_object_with_id(max_id=max_id, count=count,
+                                                                               moderated_object_id=moderated_object_id)
 
         moderated_object_logs_serializer = ModeratedObjectLogSerializer(moderated_object_logs, many=True,
                                                                         context={"request": request})
@@ -176,10 +175,8 @@ class ModeratedObjectReports(APIView):
         user = request.user
 
         with transaction.atomic():
-            moderated_object_reports = user.get_reports_for_moderated_object_with_id(max_id=max_id,
-                                                                                     moderated_object_id=moderated_object_id).order_by(
-                '-id')[
-                                       :count]
+            moderated_object_reports = user.get_reports_for_moderated_object_with_id(
+                max_id=max_id, count=count, moderated_object_id=moderated_object_id)
 
         moderated_object_reports_serializer = ModeratedObjectReportSerializer(moderated_object_reports,
                                                                               many=True,
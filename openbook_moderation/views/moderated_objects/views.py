@@ -34,8 +34,8 @@ class GlobalModeratedObjects(APIView):
 
         moderated_objects = user.get_global_moderated_objects(max_id=max_id, types=types,
                                                               verified=verified,
-                                                              statuses=statuses).order_by('-id')[
-                            :count]
+                                                              statuses=statuses,
+                                                              count=count)
 
         response_serializer = ModeratedObjectSerializer(moderated_objects, many=True,
                                                         context={"request": request})
@@ -70,8 +70,8 @@ class CommunityModeratedObjects(APIView):
                                                                  max_id=max_id,
                                                                  verified=verified,
                                                                  types=types,
-                                                                 statuses=statuses).order_by('-id')[
-                            :count]
+                                                                 statuses=statuses,
+                                                                 count=count)
 
         response_serializer = ModeratedObjectSerializer(moderated_objects, many=True,
                                                         context={"request": request})
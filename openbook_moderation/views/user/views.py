@@ -24,8 +24,7 @@ class UserModerationPenalties(APIView):
 
         user = request.user
 
-        moderated_objects = user.get_moderation_penalties(max_id=max_id, ).order_by('-id')[
-                            :count]
+        moderated_objects = user.get_moderation_penalties(max_id=max_id, count=count)
 
         response_serializer = ModerationPenaltySerializer(moderated_objects, many=True,
                                                           context={"request": request})
@@ -49,8 +48,7 @@ class UserPendingModeratedObjectsCommunities(APIView):
 
         user = request.user
 
-        communities = user.get_pending_moderated_objects_communities(max_id=max_id, ).order_by('-id')[
-                      :count]
+        communities = user.get_pending_moderated_objects_communities(max_id=max_id, count=count)
 
         response_serializer = PendingModeratedObjectsCommunitySerializer(communities, many=True,
                                                                          context={"request": request})
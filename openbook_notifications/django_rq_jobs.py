@@ -1,32 +1,77 @@
 from hashlib import sha256
-import onesignal as onesignal_sdk
-from django.conf import settings
+from django.utils import timezone
 from django_rq import job
 
-from openbook_common.utils.model_loaders import get_user_model
+from openbook_common.utils.model_loaders import get_user_model, get_notification_model
+from openbook_notifications.onesignal_client import onesignal_client
+from openbook_notifications.unread_notifications_counts import rebuild_unread_notifications_counts
 
-onesignal_client = onesignal_sdk.Client(
-    app_id=settings.ONE_SIGNAL_APP_ID,
-    app_auth_key=settings.ONE_SIGNAL_API_KEY
-)
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @job('default')
 def send_notification_to_user_with_id(user_id, notification):
+    return send_notification_to_users_with_ids(users_ids=[user_id], notification=notification)
+
+
+@job('default')
+def send_notification_to_users_with_ids(users_ids, notification):
+    """
+    Sends the same notification to every device of several users, e.g. the subscribers of a new post.
+    The devices are targeted with OR'd filters, so they're all reached with a request per filters batch.
+    """
     User = get_user_model()
-    user = User.objects.only('username', 'uuid', 'id').get(pk=user_id)
+    users = User.objects.only('username', 'uuid', 'id').filter(pk__in=users_ids).prefetch_related('devices')
+
+    devices_filters_groups = []
+
+    for user in users:
+        user_id_tag = _make_user_id_tag(user=user)
+
+        for device in user.devices.all():
+            devices_filters_groups.append([
+                {"field": "tag", "key": "user_id", "relation": "=", "value": user_id_tag},
+                {"field": "tag", "key": "device_uuid", "relation": "=", "value": device.uuid},
+            ])
+
+    if not devices_filters_groups:
+        return 'No devices to notify'
+
+    notification.set_parameter('ios_badgeType', 'Increase')
+    notification.set_parameter('ios_badgeCount', '1')
+
+    requests_count = onesignal_client.send_notification_to_filters_groups(notification=notification,
+                                                                          filters_groups=devices_filters_groups)
+
+    logger.info('Push notifications counters: %s' % dict(onesignal_client.counters))
+
+    return 'Notified %d devices of %d users with %d requests' % (len(devices_filters_groups), len(users),
+                                                                   requests_count)
+
+
+def _make_user_id_tag(user):
+    user_id_contents = (str(user.uuid) + str(user.id)).encode('utf-8')
+    return sha256(user_id_contents).hexdigest()
+
 
-    for device in user.devices.all():
-        notification.set_parameter('ios_badgeType', 'Increase')
-        notification.set_parameter('ios_badgeCount', '1')
+@job('low')
+def reconcile_unread_notifications_counts(since_minutes=60):
+    """
+    This job should be scheduled to count again the unread notifications of the users that got notifications lately,
+    fixing the cached counts that drifted, e.g. from notifications created in a transaction that was rolled back
+    """
+    Notification = get_notification_model()
 
-        user_id_contents = (str(user.uuid) + str(user.id)).encode('utf-8')
+    owners_ids = Notification.objects.filter(
+        created__gte=timezone.now() - timezone.timedelta(minutes=since_minutes)).values_list('owner_id',
+                                                                                             flat=True).distinct()
 
-        user_id = sha256(user_id_contents).hexdigest()
+    reconciled_users = 0
 
-        notification.set_filters([
-            {"field": "tag", "key": "user_id", "relation": "=", "value": user_id},
-            {"field": "tag", "key": "device_uuid", "relation": "=", "value": device.uuid},
-        ])
+    for owner_id in owners_ids.iterator():
+        rebuild_unread_notifications_counts(user_id=owner_id)
+        reconciled_users += 1
 
-        onesignal_client.send_notification(notification)
+    return 'Reconciled the unread notifications counts of %s users' % str(reconciled_users)
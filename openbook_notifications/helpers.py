@@ -4,7 +4,8 @@ from django.utils.translation import ugettext_lazy as _
 import onesignal as onesignal_sdk
 
 from openbook_common.utils.model_loaders import get_notification_model
-from openbook_notifications.django_rq_jobs import send_notification_to_user_with_id
+from openbook_notifications.django_rq_jobs import send_notification_to_user_with_id, \
+    send_notification_to_users_with_ids
 from openbook_translation import translation_strategy
 
 import logging
@@ -295,41 +296,66 @@ def send_community_invite_push_notification(community_invite):
         _send_notification_to_user(notification=one_signal_notification, user=invited_user)
 
 
-def send_community_new_post_push_notification(community_notifications_subscription):
-    community_name = community_notifications_subscription.community.name
-    target_user = community_notifications_subscription.subscriber
+def send_community_new_post_push_notifications(community_notifications_subscriptions):
+    """
+    Sends the new post push notification of a community to its subscribers, one batch per language
+    """
+    target_users = [community_notifications_subscription.subscriber for community_notifications_subscription in
+                    community_notifications_subscriptions if
+                    community_notifications_subscription.subscriber.has_community_new_post_notifications_enabled()]
 
-    if target_user.has_community_new_post_notifications_enabled():
-        target_user_language_code = get_notification_language_code_for_target_user(target_user)
-        with translation.override(target_user_language_code):
+    if not target_users:
+        return
+
+    community_name = community_notifications_subscriptions[0].community.name
+
+    Notification = get_notification_model()
+
+    notification_data = {
+        'type': Notification.COMMUNITY_NEW_POST,
+    }
+
+    notification_group = NOTIFICATION_GROUP_HIGH_PRIORITY
+
+    for target_users_language_code, language_target_users in _group_users_by_notification_language_code(
+            users=target_users).items():
+        with translation.override(target_users_language_code):
             one_signal_notification = onesignal_sdk.Notification(
                 post_body={"contents": {"en": _('A new post was posted in c/%(community_name)s.') % {
                     'community_name': community_name,
                 }}})
 
-        Notification = get_notification_model()
-
-        notification_data = {
-            'type': Notification.COMMUNITY_NEW_POST,
-        }
-
-        notification_group = NOTIFICATION_GROUP_HIGH_PRIORITY
-
         one_signal_notification.set_parameter('data', notification_data)
         one_signal_notification.set_parameter('!thread_id', notification_group)
         one_signal_notification.set_parameter('android_group', notification_group)
 
-        _send_notification_to_user(notification=one_signal_notification, user=target_user)
+        _send_notification_to_users(notification=one_signal_notification, users=language_target_users)
 
 
-def send_user_new_post_push_notification(user_notifications_subscription, post):
-    post_creator_name = user_notifications_subscription.user.profile.name
-    post_creator_username = user_notifications_subscription.user.username
-    target_user = user_notifications_subscription.subscriber
+def send_user_new_post_push_notifications(user_notifications_subscriptions):
+    """
+    Sends the new post push notification of a user to its subscribers, one batch per language
+    """
+    target_users = [user_notifications_subscription.subscriber for user_notifications_subscription in
+                    user_notifications_subscriptions if
+                    user_notifications_subscription.subscriber.has_user_new_post_notifications_enabled()]
 
-    if target_user.has_user_new_post_notifications_enabled():
-        target_user_language_code = get_notification_language_code_for_target_user(target_user)
-        with translation.override(target_user_language_code):
+    if not target_users:
+        return
+
+    post_creator = user_notifications_subscriptions[0].user
+    post_creator_name = post_creator.profile.name
+    post_creator_username = post_creator.username
+
+    Notification = get_notification_model()
+
+    notification_data = {
+        'type': Notification.USER_NEW_POST,
+    }
+
+    for target_users_language_code, language_target_users in _group_users_by_notification_language_code(
+            users=target_users).items():
+        with translation.override(target_users_language_code):
             one_signal_notification = onesignal_sdk.Notification(
                 post_body={
                     "contents": {"en": _('%(post_creator_name)s · @%(post_creator_username)s posted something.') % {
@@ -337,14 +363,9 @@ def send_user_new_post_push_notification(user_notifications_subscription, post):
                         'post_creator_name': post_creator_name,
                     }}})
 
-        Notification = get_notification_model()
-
-        notification_data = {
-            'type': Notification.USER_NEW_POST,
-        }
         one_signal_notification.set_parameter('data', notification_data)
 
-        _send_notification_to_user(notification=one_signal_notification, user=target_user)
+        _send_notification_to_users(notification=one_signal_notification, users=language_target_users)
 
 
 def get_notification_language_code_for_target_user(target_user):
@@ -354,5 +375,18 @@ def get_notification_language_code_for_target_user(target_user):
     return translation_strategy.get_default_translation_language_code()
 
 
+def _group_users_by_notification_language_code(users):
+    users_by_language_code = {}
+
+    for user in users:
+        users_by_language_code.setdefault(get_notification_language_code_for_target_user(user), []).append(user)
+
+    return users_by_language_code
+
+
 def _send_notification_to_user(user, notification):
     send_notification_to_user_with_id.delay(user_id=user.pk, notification=notification)
+
+
+def _send_notification_to_users(users, notification):
+    send_notification_to_users_with_ids.delay(users_ids=[user.pk for user in users], notification=notification)
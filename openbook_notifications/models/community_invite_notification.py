@@ -5,11 +5,12 @@ from django.dispatch import receiver
 
 from openbook_auth.models import User
 from openbook_communities.models import CommunityInvite
-from openbook_notifications.models.notification import Notification
+from openbook_notifications.models.notification import Notification, NotificationContentObjectQuerySet
 
 
 class CommunityInviteNotification(models.Model):
     notification = GenericRelation(Notification)
+    objects = NotificationContentObjectQuerySet.as_manager()
     community_invite = models.ForeignKey(CommunityInvite, on_delete=models.CASCADE)
 
     @classmethod
@@ -5,11 +5,12 @@ from django.db.models.signals import pre_delete
 from django.dispatch import receiver
 
 from openbook_auth.models import User
-from openbook_notifications.models.notification import Notification
+from openbook_notifications.models.notification import Notification, NotificationContentObjectQuerySet
 
 
 class ConnectionRequestNotification(models.Model):
     notification = GenericRelation(Notification)
+    objects = NotificationContentObjectQuerySet.as_manager()
     connection_requester = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
 
     @classmethod
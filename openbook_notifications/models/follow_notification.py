@@ -2,11 +2,12 @@ from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 
 from openbook_auth.models import User
-from openbook_notifications.models.notification import Notification
+from openbook_notifications.models.notification import Notification, NotificationContentObjectQuerySet
 
 
 class FollowNotification(models.Model):
     notification = GenericRelation(Notification)
+    objects = NotificationContentObjectQuerySet.as_manager()
     follower = models.ForeignKey(User, on_delete=models.CASCADE)
 
     @classmethod
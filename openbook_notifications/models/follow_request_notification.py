@@ -2,11 +2,12 @@ from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 
 from openbook_follows.models import FollowRequest
-from openbook_notifications.models.notification import Notification
+from openbook_notifications.models.notification import Notification, NotificationContentObjectQuerySet
 
 
 class FollowRequestNotification(models.Model):
     notification = GenericRelation(Notification)
+    objects = NotificationContentObjectQuerySet.as_manager()
     follow_request = models.ForeignKey(FollowRequest, on_delete=models.CASCADE)
 
     @classmethod
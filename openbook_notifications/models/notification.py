@@ -1,9 +1,20 @@
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 from openbook_auth.models import User
+from openbook_common.utils.model_loaders import get_post_comment_notification_model, \
+    get_post_comment_reply_notification_model, get_post_comment_reaction_notification_model, \
+    get_post_reaction_notification_model, get_connection_request_notification_model, \
+    get_connection_confirmed_notification_model, get_follow_notification_model, get_follow_request_notification_model, \
+    get_follow_request_approved_notification_model, get_community_invite_notification_model, \
+    get_post_user_mention_notification_model, get_post_comment_user_mention_notification_model, \
+    get_community_new_post_notification_model, get_user_new_post_notification_model
+from openbook_notifications.unread_notifications_counts import increment_unread_notifications_counts, \
+    clear_unread_notifications_counts, clear_unread_notifications_counts_on_commit
 
 
 class Notification(models.Model):
@@ -52,7 +63,53 @@ class Notification(models.Model):
 
     @classmethod
     def create_notification(cls, owner_id, type, content_object):
-        return cls.objects.create(notification_type=type, content_object=content_object, owner_id=owner_id)
+        notification = cls.objects.create(notification_type=type, content_object=content_object, owner_id=owner_id)
+        increment_unread_notifications_counts(users_ids=[owner_id], notification_type=type)
+        return notification
+
+    @classmethod
+    def bulk_create_notifications(cls, type, owners_ids_and_content_objects):
+        """
+        Creates a notification for each (owner_id, content_object) pair with a single insert
+        """
+        created = timezone.now()
+
+        notifications = cls.objects.bulk_create([
+            cls(notification_type=type, content_object=content_object, owner_id=owner_id, created=created)
+            for owner_id, content_object in owners_ids_and_content_objects
+        ])
+
+        increment_unread_notifications_counts(users_ids=[notification.owner_id for notification in notifications],
+                                              notification_type=type)
+
+        return notifications
+
+    @classmethod
+    def load_content_objects(cls, notifications):
+        """
+        Loads the content objects of the notifications, with everything they are serialized with, using a query
+        per notification type instead of several queries per notification
+        """
+        notifications_by_type = {}
+
+        for notification in notifications:
+            notifications_by_type.setdefault(notification.notification_type, []).append(notification)
+
+        content_object_field = cls._meta.get_field('content_object')
+
+        for notification_type, type_notifications in notifications_by_type.items():
+            content_object_model, select_related, prefetch_related = _get_content_object_related(notification_type)
+
+            content_objects = content_object_model.objects.select_related(*select_related).prefetch_related(
+                *prefetch_related).in_bulk([notification.object_id for notification in type_notifications])
+
+            for notification in type_notifications:
+                content_object = content_objects.get(notification.object_id)
+
+                if content_object is not None:
+                    content_object_field.set_cached_value(notification, content_object)
+
+        return notifications
 
     @classmethod
     def get_notification_types_values(cls):
@@ -64,3 +121,108 @@ class Notification(models.Model):
             self.created = timezone.now()
 
         return super(Notification, self).save(*args, **kwargs)
+
+
+class NotificationContentObjectQuerySet(models.QuerySet):
+    """
+    The queryset of a notification content object model. Deleting its objects deletes their notifications in
+    cascade, so it drops the unread notifications counts of their owners once, after the transaction commits.
+    """
+
+    def delete(self):
+        content_type = ContentType.objects.get_for_model(self.model)
+
+        owners_ids = list(Notification.objects.filter(content_type=content_type, object_id__in=self.values('pk'),
+                                                      read=False).values_list('owner_id', flat=True).distinct())
+
+        deleted = super(NotificationContentObjectQuerySet, self).delete()
+
+        clear_unread_notifications_counts_on_commit(users_ids=owners_ids)
+
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+def _get_content_object_related(notification_type):
+    """
+    Returns the content object model of the notification type and the relations to select and prefetch with it
+    """
+    if notification_type == Notification.POST_COMMENT:
+        return (get_post_comment_notification_model(),) + _get_post_comment_related('post_comment')
+    elif notification_type == Notification.POST_COMMENT_REPLY:
+        return (get_post_comment_reply_notification_model(),) + _get_post_comment_related('post_comment')
+    elif notification_type == Notification.POST_COMMENT_REACTION:
+        return (get_post_comment_reaction_notification_model(),) + _merge_related(
+            (['post_comment_reaction__emoji'], []),
+            _get_user_related('post_comment_reaction__reactor'),
+            _get_post_comment_related('post_comment_reaction__post_comment'))
+    elif notification_type == Notification.POST_REACTION:
+        return (get_post_reaction_notification_model(),) + _merge_related(
+            (['post_reaction__emoji'], []),
+            _get_user_related('post_reaction__reactor'),
+            _get_post_related('post_reaction__post'))
+    elif notification_type == Notification.CONNECTION_REQUEST:
+        return (get_connection_request_notification_model(),) + _get_user_related('connection_requester')
+    elif notification_type == Notification.CONNECTION_CONFIRMED:
+        return (get_connection_confirmed_notification_model(),) + _get_user_related('connection_confirmator')
+    elif notification_type == Notification.FOLLOW:
+        return (get_follow_notification_model(),) + _get_user_related('follower')
+    elif notification_type == Notification.FOLLOW_REQUEST:
+        return (get_follow_request_notification_model(),) + _merge_related(
+            _get_user_related('follow_request__creator'),
+            _get_user_related('follow_request__target_user'))
+    elif notification_type == Notification.FOLLOW_REQUEST_APPROVED:
+        return (get_follow_request_approved_notification_model(),) + _merge_related(
+            ([], ['follow__lists']),
+            _get_user_related('follow__followed_user'))
+    elif notification_type == Notification.COMMUNITY_INVITE:
+        return (get_community_invite_notification_model(),) + _merge_related(
+            (['community_invite__community'], []),
+            _get_user_related('community_invite__creator'))
+    elif notification_type == Notification.POST_USER_MENTION:
+        return (get_post_user_mention_notification_model(),) + _merge_related(
+            _get_user_related('post_user_mention__user'),
+            _get_post_related('post_user_mention__post'))
+    elif notification_type == Notification.POST_COMMENT_USER_MENTION:
+        return (get_post_comment_user_mention_notification_model(),) + _merge_related(
+            _get_user_related('post_comment_user_mention__user'),
+            _get_post_comment_related('post_comment_user_mention__post_comment'))
+    elif notification_type == Notification.COMMUNITY_NEW_POST:
+        return (get_community_new_post_notification_model(),) + _get_post_related('post')
+    elif notification_type == Notification.USER_NEW_POST:
+        return (get_user_new_post_notification_model(),) + _get_post_related('post')
+
+    raise ValueError('Unknown notification type %s' % notification_type)
+
+
+def _get_user_related(user_path):
+    return ['%s__profile' % user_path], ['%s__profile__badges' % user_path]
+
+
+def _get_post_related(post_path):
+    return _merge_related(
+        (['%s__community' % post_path, '%s__image' % post_path], []),
+        _get_user_related('%s__creator' % post_path))
+
+
+def _get_post_comment_related(post_comment_path):
+    return _merge_related(
+        (['%s__language' % post_comment_path, '%s__parent_comment__language' % post_comment_path],
+         ['%s__hashtags__emoji' % post_comment_path]),
+        _get_user_related('%s__commenter' % post_comment_path),
+        _get_user_related('%s__parent_comment__commenter' % post_comment_path),
+        _get_post_related('%s__post' % post_comment_path))
+
+
+def _merge_related(*related):
+    return [path for select_related, prefetch_related in related for path in select_related], \
+           [path for select_related, prefetch_related in related for path in prefetch_related]
+
+
+@receiver(post_save, sender=User, dispatch_uid='clear_new_user_unread_notifications_counts')
+def clear_new_user_unread_notifications_counts(sender, instance=None, created=False, **kwargs):
+    # The counts are kept by user id, which a database might reuse
+    if created:
+        clear_unread_notifications_counts(user_id=instance.pk)
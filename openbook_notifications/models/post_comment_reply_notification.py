@@ -1,12 +1,13 @@
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 
-from openbook_notifications.models.notification import Notification
+from openbook_notifications.models.notification import Notification, NotificationContentObjectQuerySet
 from openbook_posts.models import PostComment
 
 
 class PostCommentReplyNotification(models.Model):
     notification = GenericRelation(Notification, related_name='post_comment_reply_notifications')
+    objects = NotificationContentObjectQuerySet.as_manager()
     post_comment = models.ForeignKey(PostComment, on_delete=models.CASCADE)
 
     @classmethod
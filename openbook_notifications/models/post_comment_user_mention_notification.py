@@ -1,12 +1,13 @@
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 
-from openbook_notifications.models.notification import Notification
+from openbook_notifications.models.notification import Notification, NotificationContentObjectQuerySet
 from openbook_posts.models import PostCommentUserMention
 
 
 class PostCommentUserMentionNotification(models.Model):
     notification = GenericRelation(Notification, related_name='post_comment_user_mention_notifications')
+    objects = NotificationContentObjectQuerySet.as_manager()
     post_comment_user_mention = models.ForeignKey(PostCommentUserMention, on_delete=models.CASCADE)
 
     @classmethod
@@ -18,6 +19,30 @@ class PostCommentUserMentionNotification(models.Model):
                                          owner_id=owner_id)
         return post_comment_user_mention_notification
 
+    @classmethod
+    def bulk_create_post_comment_user_mention_notifications(cls, post_comment_user_mentions):
+        """
+        Creates the notifications of several post comment user mentions with one insert per table
+        """
+        post_comment_user_mentions_by_id = {post_comment_user_mention.pk: post_comment_user_mention for
+                                            post_comment_user_mention in post_comment_user_mentions}
+
+        cls.objects.bulk_create([cls(post_comment_user_mention_id=post_comment_user_mention_id) for
+                                 post_comment_user_mention_id in post_comment_user_mentions_by_id.keys()])
+
+        # Not every database returns the ids of bulk created rows, they're read back instead
+        post_comment_user_mention_notifications = cls.objects.filter(
+            post_comment_user_mention_id__in=post_comment_user_mentions_by_id.keys(), notification__isnull=True)
+
+        Notification.bulk_create_notifications(
+            type=Notification.POST_COMMENT_USER_MENTION,
+            owners_ids_and_content_objects=[
+                (post_comment_user_mentions_by_id[
+                     post_comment_user_mention_notification.post_comment_user_mention_id].user_id,
+                 post_comment_user_mention_notification) for post_comment_user_mention_notification in
+                post_comment_user_mention_notifications
+            ])
+
     @classmethod
     def delete_post_comment_user_mention_notification(cls, post_comment_user_mention_id, owner_id):
         cls.objects.filter(post_comment_user_mention_id=post_comment_user_mention_id,
@@ -1,11 +1,12 @@
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
-from openbook_notifications.models.notification import Notification
+from openbook_notifications.models.notification import Notification, NotificationContentObjectQuerySet
 from openbook_posts.models import PostReaction
 
 
 class PostReactionNotification(models.Model):
     notification = GenericRelation(Notification, related_name='post_reaction_notifications')
+    objects = NotificationContentObjectQuerySet.as_manager()
     post_reaction = models.ForeignKey(PostReaction, on_delete=models.CASCADE)
 
     @classmethod
@@ -1,12 +1,13 @@
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 
-from openbook_notifications.models.notification import Notification
+from openbook_notifications.models.notification import Notification, NotificationContentObjectQuerySet
 from openbook_posts.models import PostUserMention
 
 
 class PostUserMentionNotification(models.Model):
     notification = GenericRelation(Notification, related_name='post_user_mention_notifications')
+    objects = NotificationContentObjectQuerySet.as_manager()
     post_user_mention = models.ForeignKey(PostUserMention, on_delete=models.CASCADE)
 
     @classmethod
@@ -17,6 +18,26 @@ class PostUserMentionNotification(models.Model):
                                          owner_id=owner_id)
         return post_user_mention_notification
 
+    @classmethod
+    def bulk_create_post_user_mention_notifications(cls, post_user_mentions):
+        """
+        Creates the notifications of several post user mentions with one insert per table
+        """
+        post_user_mentions_by_id = {post_user_mention.pk: post_user_mention for post_user_mention in
+                                    post_user_mentions}
+
+        cls.objects.bulk_create([cls(post_user_mention_id=post_user_mention_id) for post_user_mention_id in
+                                 post_user_mentions_by_id.keys()])
+
+        # Not every database returns the ids of bulk created rows, they're read back instead
+        post_user_mention_notifications = cls.objects.filter(
+            post_user_mention_id__in=post_user_mentions_by_id.keys(), notification__isnull=True)
+
+        Notification.bulk_create_notifications(type=Notification.POST_USER_MENTION, owners_ids_and_content_objects=[
+            (post_user_mentions_by_id[post_user_mention_notification.post_user_mention_id].user_id,
+             post_user_mention_notification) for post_user_mention_notification in post_user_mention_notifications
+        ])
+
     @classmethod
     def delete_post_user_mention_notification(cls, post_user_mention_id, owner_id):
         cls.objects.filter(post_user_mention_id=post_user_mention_id,
@@ -1,12 +1,13 @@
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 from openbook_auth.models import UserNotificationsSubscription
-from openbook_notifications.models.notification import Notification
+from openbook_notifications.models.notification import Notification, NotificationContentObjectQuerySet
 from openbook_posts.models import Post
 
 
 class UserNewPostNotification(models.Model):
     notification = GenericRelation(Notification)
+    objects = NotificationContentObjectQuerySet.as_manager()
     user_notifications_subscription = models.ForeignKey(UserNotificationsSubscription, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
 
@@ -20,6 +21,39 @@ class UserNewPostNotification(models.Model):
                                          owner_id=owner_id)
         return user_new_post_notification
 
+    @classmethod
+    def bulk_create_user_new_post_notifications(cls, user_notifications_subscriptions, post_id):
+        """
+        Creates the new post notifications of several subscriptions with one insert per table.
+        Returns the subscriptions that were notified, the ones already notified of the post are skipped.
+        """
+        subscriptions_by_id = {subscription.pk: subscription for subscription in user_notifications_subscriptions}
+        subscriptions_ids = list(subscriptions_by_id.keys())
+
+        subscriptions_notifications = cls.objects.filter(post_id=post_id,
+                                                         user_notifications_subscription_id__in=subscriptions_ids)
+
+        notified_subscriptions_ids = set(subscriptions_notifications.values_list('user_notifications_subscription_id',
+                                                                                 flat=True))
+
+        cls.objects.bulk_create([cls(post_id=post_id, user_notifications_subscription_id=subscription_id) for
+                                 subscription_id in subscriptions_ids if
+                                 subscription_id not in notified_subscriptions_ids])
+
+        # Not every database returns the ids of bulk created rows, they're read back instead
+        user_new_post_notifications = list(subscriptions_notifications.filter(notification__isnull=True))
+
+        notified_subscriptions = [subscriptions_by_id[user_new_post_notification.user_notifications_subscription_id] for
+                                  user_new_post_notification in user_new_post_notifications]
+
+        Notification.bulk_create_notifications(type=Notification.USER_NEW_POST, owners_ids_and_content_objects=[
+            (subscription.subscriber_id, user_new_post_notification) for
+            subscription, user_new_post_notification in zip(notified_subscriptions,
+                                                              user_new_post_notifications)
+        ])
+
+        return notified_subscriptions
+
     @classmethod
     def delete_user_new_post_notification(cls, user_notifications_subscription_id, post_id, owner_id):
         cls.objects.filter(user_notifications_subscription_id=user_notifications_subscription_id,
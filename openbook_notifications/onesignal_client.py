@@ -0,0 +1,91 @@
+import logging
+from collections import Counter
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class OneSignalClient:
+    """
+    Sends push notifications through the OneSignal API.
+    The requests go through a pooled session, retrying with backoff when OneSignal is rate limiting or unavailable,
+    and the notifications sent are counted in the counters.
+    """
+
+    # OneSignal rejects notifications with more filters than this
+    MAX_FILTERS = 200
+
+    def __init__(self, app_id, api_key, api_root=None, max_retries=3, backoff_factor=0.5, pool_maxsize=10):
+        self.app_id = app_id
+        self.api_root = api_root or 'https://onesignal.com/api/v1'
+        self.counters = Counter()
+
+        # Only the requests OneSignal didn't process are retried, so a notification is never sent twice
+        retry = Retry(total=max_retries, read=0, backoff_factor=backoff_factor, status_forcelist=(429, 503),
+                      method_whitelist=frozenset(['POST']), raise_on_status=False)
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Authorization': 'Basic %s' % api_key})
+
+    def send_notification(self, notification):
+        post_body = dict(notification.post_body)
+        post_body['app_id'] = self.app_id
+
+        try:
+            response = self.session.post(
+                '%s/notifications' % self.api_root,
+                json=post_body,
+                timeout=(3, settings.ONE_SIGNAL_TIMEOUT_IN_SECONDS),
+            )
+            response.raise_for_status()
+        except requests.RequestException:
+            self.counters['failed_requests'] += 1
+            raise
+        finally:
+            self.counters['requests'] += 1
+
+        return response
+
+    def send_notification_to_filters_groups(self, notification, filters_groups):
+        """
+        Sends the notification to everyone matching any of the filters groups, e.g. one group per device.
+        The groups are OR'd together in as few requests as the filters limit allows, returns the requests count.
+        """
+        requests_count = 0
+
+        for filters in self._make_ored_filters_batches(filters_groups=filters_groups):
+            notification.set_filters(filters)
+            self.send_notification(notification)
+            requests_count += 1
+
+        self.counters['notifications'] += 1
+        self.counters['filters_groups'] += len(filters_groups)
+
+        return requests_count
+
+    def _make_ored_filters_batches(self, filters_groups):
+        filters = []
+
+        for filters_group in filters_groups:
+            group_filters = [{'operator': 'OR'}] + filters_group if filters else filters_group
+
+            if filters and len(filters) + len(group_filters) > self.MAX_FILTERS:
+                yield filters
+                filters = []
+                group_filters = filters_group
+
+            filters = filters + group_filters
+
+        if filters:
+            yield filters
+
+
+onesignal_client = OneSignalClient(app_id=settings.ONE_SIGNAL_APP_ID, api_key=settings.ONE_SIGNAL_API_KEY,
+                                   api_root=settings.ONE_SIGNAL_API_ROOT)
@@ -47,6 +47,20 @@ class UnreadNotificationsCountSerializer(serializers.Serializer):
     )
 
 
+class UnreadNotificationsCountChangesSerializer(serializers.Serializer):
+    version = serializers.CharField(
+        required=False,
+        max_length=32,
+    )
+    types = serializers.ListField(
+        child=serializers.ChoiceField(
+            choices=Notification.get_notification_types_values(),
+            required=False,
+        ),
+        required=False,
+    )
+
+
 class GetNotificationsSerializer(serializers.Serializer):
     count = serializers.IntegerField(
         required=False,
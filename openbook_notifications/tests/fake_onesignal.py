@@ -0,0 +1,66 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+class FakeOneSignalServer:
+    """
+    A local stand-in for the OneSignal notifications API, to send push notifications without the network.
+    Records the notifications it receives and answers with the given statuses first, e.g. to test the retries.
+
+        with FakeOneSignalServer() as fake_onesignal:
+            client = OneSignalClient(app_id='app', api_key='key', api_root=fake_onesignal.api_root)
+    """
+
+    def __init__(self, responses_statuses=None):
+        self.responses_statuses = list(responses_statuses or [])
+        self.notifications = []
+        self.requests_count = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def api_root(self):
+        host, port = self._server.server_address
+        return 'http://%s:%d/api/v1' % (host, port)
+
+    def __enter__(self):
+        self._server = HTTPServer(('127.0.0.1', 0), self._make_request_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _make_request_handler(self):
+        fake_server = self
+
+        class FakeOneSignalRequestHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                fake_server.requests_count += 1
+
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+                status = fake_server.responses_statuses.pop(0) if fake_server.responses_statuses else 200
+
+                if status == 200 and self.path == '/api/v1/notifications':
+                    fake_server.notifications.append(json.loads(body.decode('utf-8')))
+                    response_body = {'id': str(len(fake_server.notifications)), 'recipients': 1}
+                else:
+                    response_body = {'errors': ['Fake error']}
+
+                response_content = json.dumps(response_body).encode('utf-8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response_content)))
+                self.end_headers()
+                self.wfile.write(response_content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return FakeOneSignalRequestHandler
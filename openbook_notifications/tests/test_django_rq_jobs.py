@@ -0,0 +1,97 @@
+from unittest import mock
+
+import onesignal as onesignal_sdk
+from faker import Faker
+
+from openbook_common.tests.helpers import make_user, make_device
+from openbook_common.tests.models import OpenbookAPITestCase
+from openbook_notifications.django_rq_jobs import send_notification_to_users_with_ids, \
+    send_notification_to_user_with_id
+from openbook_notifications.onesignal_client import OneSignalClient
+from openbook_notifications.tests.fake_onesignal import FakeOneSignalServer
+
+fake = Faker()
+
+
+class SendNotificationToUsersJobTests(OpenbookAPITestCase):
+    """
+    SendNotificationToUsersJob
+    """
+
+    def test_sends_one_request_for_every_device_of_a_user(self):
+        """
+        should send a single request filtering on every device of the user
+        """
+        user = make_user()
+        devices = [make_device(owner=user) for i in range(0, 3)]
+
+        with FakeOneSignalServer() as fake_onesignal:
+            with self._patch_onesignal_client(fake_onesignal=fake_onesignal):
+                send_notification_to_user_with_id(user_id=user.pk, notification=self._make_notification())
+
+        self.assertEqual(fake_onesignal.requests_count, 1)
+
+        sent_notification = fake_onesignal.notifications[0]
+        devices_uuids = [notification_filter['value'] for notification_filter in sent_notification['filters'] if
+                         notification_filter.get('key') == 'device_uuid']
+
+        self.assertEqual(sorted(devices_uuids), sorted([device.uuid for device in devices]))
+        self.assertEqual(len([notification_filter for notification_filter in sent_notification['filters'] if
+                              notification_filter.get('operator') == 'OR']), 2)
+
+    def test_coalesces_the_devices_of_several_users_within_the_filters_limit(self):
+        """
+        should notify the devices of several users with as few requests as the filters limit allows
+        """
+        users = [make_user() for i in range(0, 5)]
+
+        for user in users:
+            make_device(owner=user)
+
+        with FakeOneSignalServer() as fake_onesignal:
+            # Every device takes two filters and an operator, so two devices fit per request
+            with mock.patch.object(OneSignalClient, 'MAX_FILTERS', 5), \
+                 self._patch_onesignal_client(fake_onesignal=fake_onesignal):
+                send_notification_to_users_with_ids(users_ids=[user.pk for user in users],
+                                                    notification=self._make_notification())
+
+        self.assertEqual(fake_onesignal.requests_count, 3)
+
+        for sent_notification in fake_onesignal.notifications:
+            self.assertLessEqual(len(sent_notification['filters']), 5)
+
+    def test_retries_when_onesignal_is_unavailable(self):
+        """
+        should retry sending the notification when OneSignal is unavailable
+        """
+        user = make_user()
+        make_device(owner=user)
+
+        with FakeOneSignalServer(responses_statuses=[503]) as fake_onesignal:
+            with self._patch_onesignal_client(fake_onesignal=fake_onesignal) as onesignal_client:
+                send_notification_to_user_with_id(user_id=user.pk, notification=self._make_notification())
+
+        self.assertEqual(fake_onesignal.requests_count, 2)
+        self.assertEqual(len(fake_onesignal.notifications), 1)
+        self.assertEqual(onesignal_client.counters['requests'], 1)
+        self.assertEqual(onesignal_client.counters['notifications'], 1)
+
+    def test_does_not_send_without_devices(self):
+        """
+        should not send anything when the users have no devices
+        """
+        user = make_user()
+
+        with FakeOneSignalServer() as fake_onesignal:
+            with self._patch_onesignal_client(fake_onesignal=fake_onesignal):
+                send_notification_to_user_with_id(user_id=user.pk, notification=self._make_notification())
+
+        self.assertEqual(fake_onesignal.requests_count, 0)
+
+    def _make_notification(self):
+        return onesignal_sdk.Notification(post_body={"contents": {"en": fake.text(max_nb_chars=50)}})
+
+    def _patch_onesignal_client(self, fake_onesignal):
+        onesignal_client = OneSignalClient(app_id='app', api_key='key', api_root=fake_onesignal.api_root,
+                                           backoff_factor=0)
+        return mock.patch('openbook_notifications.django_rq_jobs.onesignal_client', onesignal_client)
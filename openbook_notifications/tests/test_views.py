@@ -1,5 +1,8 @@
 import json
+from unittest.mock import patch
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from faker import Faker
 from rest_framework import status
@@ -112,6 +115,40 @@ class NotificationsAPITests(OpenbookAPITestCase):
 
         self.assertFalse(Notification.objects.filter(owner=user).exists())
 
+    def test_retrieving_notifications_queries_dont_grow_with_the_notifications(self):
+        """
+        should load the content objects of the notifications with the same queries regardless of how many there are
+        """
+        user = make_user()
+
+        for i in range(0, 2):
+            make_user().follow_user(user)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+
+        # Cache the token credentials
+        self.client.get(url, **headers)
+
+        with CaptureQueriesContext(connection) as few_notifications_queries:
+            response = self.client.get(url, **headers)
+
+        self.assertEqual(len(json.loads(response.content)), 2)
+
+        for i in range(0, 4):
+            make_user().follow_user(user)
+
+        with CaptureQueriesContext(connection) as many_notifications_queries:
+            response = self.client.get(url, **headers)
+
+        response_notifications = json.loads(response.content)
+
+        self.assertEqual(len(response_notifications), 6)
+        self.assertEqual(len(many_notifications_queries), len(few_notifications_queries))
+
+        for response_notification in response_notifications:
+            self.assertIn('username', response_notification['content_object']['follower'])
+
     def _get_url(self):
         return reverse('notifications')
 
@@ -440,3 +477,147 @@ class UnreadNotificationsCountAPITests(OpenbookAPITestCase):
 
     def _get_url(self):
             return reverse('unread-notifications-count')
+
+
+class UnreadNotificationsCountChangesAPITests(OpenbookAPITestCase):
+    """
+    UnreadNotificationsCountChangesAPI
+    """
+
+    def test_returns_the_count_and_version_right_away_without_version(self):
+        """
+        should return the unread notifications count and its version right away when no version is given
+        """
+        user = make_user()
+        follower = make_user()
+
+        follower.follow_user(user)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual(parsed_response['count'], 1)
+        self.assertEqual(parsed_response['version'], user.get_unread_notifications_version())
+
+    def test_returns_the_new_count_when_it_changed(self):
+        """
+        should return the new unread notifications count when it changed from the given version
+        """
+        user = make_user()
+        follower = make_user()
+
+        version = user.get_unread_notifications_version()
+
+        self.assertEqual(user.count_unread_notifications(), 0)
+
+        follower.follow_user(user)
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+        response = self.client.get(url, {'version': version}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual(parsed_response['count'], 1)
+        self.assertNotEqual(parsed_response['version'], version)
+
+    def test_returns_not_modified_when_the_count_did_not_change(self):
+        """
+        should return not modified right away without counting when the version didn't change
+        """
+        user = make_user()
+
+        version = user.get_unread_notifications_version()
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+
+        # Cache the token credentials
+        self.client.get(url, **headers)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'version': version}, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_counts_follow_the_notifications_being_read_and_deleted(self):
+        """
+        should keep the cached unread notifications count up to date as notifications are read and deleted
+        """
+        user = make_user()
+        followers = [make_user() for i in range(0, 3)]
+
+        self.assertEqual(user.count_unread_notifications(), 0)
+
+        for follower in followers:
+            follower.follow_user(user)
+
+        self.assertEqual(user.count_unread_notifications(), 3)
+
+        notifications = list(user.notifications.all())
+
+        user.read_notification_with_id(notifications[0].pk)
+        user.read_notification_with_id(notifications[0].pk)
+        self.assertEqual(user.count_unread_notifications(), 2)
+
+        with self._run_on_commit_right_away():
+            user.delete_notification_with_id(notifications[1].pk)
+        self.assertEqual(user.count_unread_notifications(), 1)
+
+        user.read_notifications()
+        self.assertEqual(user.count_unread_notifications(types=[Notification.FOLLOW]), 0)
+
+    def test_deleting_notifications_content_objects_clears_the_counts_on_commit(self):
+        """
+        should count the unread notifications again once the deletion of their content objects commits
+        """
+        user = make_user()
+        followers = [make_user() for i in range(0, 3)]
+
+        for follower in followers:
+            follower.follow_user(user)
+
+        self.assertEqual(user.count_unread_notifications(), 3)
+
+        with self._run_on_commit_right_away():
+            followers[0].unfollow_user(user)
+
+        self.assertEqual(user.count_unread_notifications(), 2)
+
+    def test_deleting_notifications_content_objects_keeps_the_counts_until_commit(self):
+        """
+        should keep the unread notifications counts until the deletion of the notifications commits
+        """
+        user = make_user()
+        follower = make_user()
+        follower.follow_user(user)
+
+        self.assertEqual(user.count_unread_notifications(), 1)
+
+        on_commit_callbacks = []
+
+        with patch('openbook_notifications.unread_notifications_counts.transaction.on_commit',
+                   side_effect=on_commit_callbacks.append):
+            follower.unfollow_user(user)
+
+        self.assertEqual(user.count_unread_notifications(), 1)
+        self.assertEqual(len(on_commit_callbacks), 1)
+
+        on_commit_callbacks[0]()
+
+        self.assertEqual(user.count_unread_notifications(), 0)
+
+    def _run_on_commit_right_away(self):
+        # The tests run in a transaction which is never committed
+        return patch('openbook_notifications.unread_notifications_counts.transaction.on_commit',
+                     side_effect=lambda func: func())
+
+    def _get_url(self):
+        return reverse('unread-notifications-count-changes')
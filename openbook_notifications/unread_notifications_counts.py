@@ -0,0 +1,133 @@
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from openbook_common.utils.model_loaders import get_notification_model
+
+
+def get_unread_notifications_counts(user_id):
+    """
+    Returns the unread notifications count of the user for every notification type.
+    The counts are loaded with a single query the first time, then kept in the cache and updated as the
+    notifications are created, read and deleted until they expire.
+    """
+    Notification = get_notification_model()
+    notifications_types = Notification.get_notification_types_values()
+
+    cache_keys = {_make_unread_notifications_count_cache_key(user_id=user_id, notification_type=notification_type):
+                      notification_type for notification_type in notifications_types}
+
+    cached_counts = cache.get_many(list(cache_keys.keys()))
+
+    if len(cached_counts) == len(cache_keys):
+        # A decrement can race with a rebuild
+        return {cache_keys[cache_key]: max(count, 0) for cache_key, count in cached_counts.items()}
+
+    return rebuild_unread_notifications_counts(user_id=user_id)
+
+
+def count_unread_notifications(user_id, types=None):
+    unread_notifications_counts = get_unread_notifications_counts(user_id=user_id)
+
+    if types:
+        return sum(unread_notifications_counts[notification_type] for notification_type in types)
+
+    return sum(unread_notifications_counts.values())
+
+
+def rebuild_unread_notifications_counts(user_id):
+    Notification = get_notification_model()
+
+    unread_notifications_counts = {notification_type: 0 for notification_type in
+                                   Notification.get_notification_types_values()}
+
+    unread_notifications_counts.update(
+        Notification.objects.filter(owner_id=user_id, read=False).values_list('notification_type').annotate(
+            count=Count('id')).order_by())
+
+    cache.set_many({_make_unread_notifications_count_cache_key(user_id=user_id, notification_type=notification_type):
+                        count for notification_type, count in unread_notifications_counts.items()},
+                   timeout=settings.NOTIFICATIONS_UNREAD_COUNTS_CACHE_TIMEOUT_IN_SECONDS)
+
+    return unread_notifications_counts
+
+
+def increment_unread_notifications_counts(users_ids, notification_type):
+    """
+    Increments the unread notifications count of the type for every user id, once per occurrence
+    """
+    for user_id, amount in Counter(users_ids).items():
+        _change_unread_notifications_count(user_id=user_id, notification_type=notification_type, amount=amount)
+
+
+def decrement_unread_notifications_count(user_id, notification_type):
+    _change_unread_notifications_count(user_id=user_id, notification_type=notification_type, amount=-1)
+
+
+def clear_unread_notifications_counts(user_id):
+    """
+    Drops the counts of the user, to be loaded again on the next read, e.g. after reading many notifications at once
+    """
+    Notification = get_notification_model()
+
+    cache.delete_many([_make_unread_notifications_count_cache_key(user_id=user_id, notification_type=notification_type)
+                       for notification_type in Notification.get_notification_types_values()])
+
+    _change_unread_notifications_version(user_id=user_id)
+
+
+def clear_unread_notifications_counts_on_commit(users_ids):
+    """
+    Drops the counts of the users once the current transaction commits, e.g. after deleting their notifications in bulk
+    """
+    users_ids = set(users_ids)
+
+    def clear_users_unread_notifications_counts():
+        for user_id in users_ids:
+            clear_unread_notifications_counts(user_id=user_id)
+
+    if users_ids:
+        transaction.on_commit(clear_users_unread_notifications_counts)
+
+
+def get_unread_notifications_version(user_id):
+    """
+    Returns a token that changes every time the unread notifications counts of the user change
+    """
+    version_cache_key = _make_unread_notifications_version_cache_key(user_id=user_id)
+    version = cache.get(version_cache_key)
+
+    if version is None:
+        cache.add(version_cache_key, uuid.uuid4().hex,
+                  timeout=settings.NOTIFICATIONS_UNREAD_COUNTS_CACHE_TIMEOUT_IN_SECONDS)
+        version = cache.get(version_cache_key)
+
+    return version
+
+
+def _change_unread_notifications_count(user_id, notification_type, amount):
+    try:
+        cache.incr(_make_unread_notifications_count_cache_key(user_id=user_id, notification_type=notification_type),
+                   amount)
+    except ValueError:
+        # The counts aren't loaded, they'll be counted on the next read
+        pass
+
+    _change_unread_notifications_version(user_id=user_id)
+
+
+def _change_unread_notifications_version(user_id):
+    cache.set(_make_unread_notifications_version_cache_key(user_id=user_id), uuid.uuid4().hex,
+              timeout=settings.NOTIFICATIONS_UNREAD_COUNTS_CACHE_TIMEOUT_IN_SECONDS)
+
+
+def _make_unread_notifications_count_cache_key(user_id, notification_type):
+    return 'unread-notifications-count-%s-%s' % (user_id, notification_type)
+
+
+def _make_unread_notifications_version_cache_key(user_id):
+    return 'unread-notifications-version-%s' % user_id
@@ -6,10 +6,14 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from openbook_common.utils.helpers import normalize_list_value_in_request_data
+from openbook_common.utils.pagination import paginate_queryset_by_id
 from openbook_moderation.permissions import IsNotSuspended
+from openbook_notifications.models import Notification
 from openbook_notifications.serializers import GetNotificationsSerializer, GetNotificationsNotificationSerializer, \
     DeleteNotificationSerializer, ReadNotificationSerializer, ReadNotificationsSerializer, \
-    UnreadNotificationsCountSerializer
+    UnreadNotificationsCountSerializer, UnreadNotificationsCountChangesSerializer
+from openbook_notifications.unread_notifications_counts import count_unread_notifications, \
+    get_unread_notifications_version
 
 
 class Notifications(APIView):
@@ -30,7 +34,10 @@ class Notifications(APIView):
         max_id = data.get('max_id')
         types = data.get('types')
 
-        notifications = user.get_notifications(max_id=max_id, types=types).order_by('-created')[:count]
+        notifications = list(
+            paginate_queryset_by_id(user.get_notifications(max_id=max_id, types=types), count=count))
+
+        Notification.load_content_objects(notifications)
 
         response_serializer = GetNotificationsNotificationSerializer(notifications, many=True,
                                                                      context={"request": request})
@@ -87,9 +94,45 @@ class UnreadNotificationsCount(APIView):
         max_id = data.get('max_id')
         types = data.get('types')
 
-        notifications = user.get_unread_notifications(max_id=max_id, types=types)
+        if max_id:
+            count = user.get_unread_notifications(max_id=max_id, types=types).count()
+        else:
+            count = user.count_unread_notifications(types=types)
+
+        return Response({'count': count}, status=status.HTTP_200_OK)
+
+
+class UnreadNotificationsCountChanges(APIView):
+    """
+    Returns the unread notifications count with its version, or Not Modified right away when it didn't change from
+    the given version, so polling clients only read the cache instead of counting their notifications.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        user = request.user
+        query_params = request.query_params.dict()
+
+        normalize_list_value_in_request_data('types', query_params)
+
+        serializer = UnreadNotificationsCountChangesSerializer(data=query_params)
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+
+        version = data.get('version')
+        types = data.get('types')
+
+        # Read by the user id, so the authenticated user isn't loaded
+        current_version = get_unread_notifications_version(user_id=user.pk)
+
+        if version == current_version:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
 
-        return Response({'count': notifications.count()}, status=status.HTTP_200_OK)
+        return Response({
+            'count': count_unread_notifications(user_id=user.pk, types=types),
+            'version': current_version,
+        }, status=status.HTTP_200_OK)
 
 
 class NotificationItem(APIView):
@@ -0,0 +1,296 @@
+"""
+Query-count and latency benchmarks of the feed endpoints.
+
+The module is not collected by the regular test run, it has to be named explicitly:
+
+    python manage.py test openbook_posts.benchmarks.feeds
+
+A social graph is seeded once, then every feed endpoint is requested a few times while recording the
+SQL queries, the rows they read and the wall time. The results are written as JSON to
+BENCHMARK_RESULTS_PATH so they can be diffed between commits. An endpoint exceeding its query
+budget fails the run.
+"""
+import json
+import logging
+import os
+import statistics
+import time
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from openbook_common.tests.helpers import make_user, make_authentication_headers_for_user, make_community, \
+    make_fake_post_text, make_fake_post_comment_text, make_emoji, make_reactions_emoji_group, make_hashtag_name, \
+    make_moderation_category
+from openbook_common.tests.models import OpenbookAPITestCase
+from openbook_posts.jobs import rebuild_timeline_for_user_with_id, curate_top_posts, curate_trending_posts
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_USERS = int(os.environ.get('BENCHMARK_USERS', '2000'))
+BENCHMARK_COMMUNITIES = int(os.environ.get('BENCHMARK_COMMUNITIES', '10'))
+BENCHMARK_COMMUNITY_MEMBERS = int(os.environ.get('BENCHMARK_COMMUNITY_MEMBERS', '200'))
+BENCHMARK_CONNECTIONS = int(os.environ.get('BENCHMARK_CONNECTIONS', '20'))
+BENCHMARK_BLOCKS = int(os.environ.get('BENCHMARK_BLOCKS', '10'))
+BENCHMARK_REPORTS = int(os.environ.get('BENCHMARK_REPORTS', '10'))
+BENCHMARK_REPEATS = int(os.environ.get('BENCHMARK_REPEATS', '5'))
+BENCHMARK_RESULTS_PATH = os.environ.get('BENCHMARK_RESULTS_PATH', 'reports/benchmarks/feeds.json')
+
+# Maximum number of queries a single page of each endpoint may run for each viewer: the count measured on the default
+# graph plus a margin of 5. The viewer without blocks nor reports reads the stored post counters, the one with them
+# has the counts of each page computed in a few grouped queries. A post field querying post by post on a 20 posts page
+# adds 20 queries and goes over budget.
+FEEDS_QUERY_BUDGETS = {
+    'viewer': {
+        'posts': 24,
+        'top_posts': 22,
+        'trending_posts_new': 24,
+        'community_posts': 25,
+        'hashtag_posts': 23,
+    },
+    'viewer_with_blocks': {
+        'posts': 24,
+        'top_posts': 22,
+        'trending_posts_new': 24,
+        'community_posts': 25,
+        'hashtag_posts': 21,
+    },
+}
+
+
+class FeedsBenchmark(OpenbookAPITestCase):
+    """
+    FeedsBenchmark
+    """
+
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
+
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        with patch('openbook_notifications.helpers._send_notification_to_user'):
+            seeding_start = time.perf_counter()
+            cls._seed_social_graph()
+            cls.seeding_duration = time.perf_counter() - seeding_start
+
+        logger.info('Seeded the feeds benchmark social graph in %.2fs' % cls.seeding_duration)
+
+    @classmethod
+    def tearDownClass(cls):
+        super(FeedsBenchmark, cls).tearDownClass()
+        cls._write_results()
+
+    def test_posts(self):
+        self._benchmark_endpoint(name='posts', url=reverse('posts'), query_params={'count': 20})
+
+    def test_top_posts(self):
+        self._benchmark_endpoint(name='top_posts', url=reverse('top-posts'), query_params={'count': 20})
+
+    def test_trending_posts_new(self):
+        self._benchmark_endpoint(name='trending_posts_new', url=reverse('trending-posts-new'),
+                                 query_params={'count': 20})
+
+    def test_community_posts(self):
+        url = reverse('community-posts', kwargs={
+            'community_name': self.community.name
+        })
+        self._benchmark_endpoint(name='community_posts', url=url, query_params={'count': 20})
+
+    def test_hashtag_posts(self):
+        url = reverse('hashtag-posts', kwargs={
+            'hashtag_name': self.hashtag_name
+        })
+        self._benchmark_endpoint(name='hashtag_posts', url=url, query_params={'count': 20})
+
+    def _benchmark_endpoint(self, name, url, query_params):
+        viewers = {
+            'viewer': self.viewer,
+            'viewer_with_blocks': self.viewer_with_blocks,
+        }
+
+        # Every viewer is benchmarked before checking the budgets so a run over budget still records all the results
+        for viewer_name, viewer in viewers.items():
+            self.results.setdefault(viewer_name, {})[name] = self._benchmark_endpoint_for_viewer(
+                viewer=viewer, url=url, query_params=query_params)
+
+        for viewer_name in viewers.keys():
+            queries_count = self.results[viewer_name][name]['queries_count']
+            query_budget = FEEDS_QUERY_BUDGETS[viewer_name][name]
+            self.results[viewer_name][name]['queries_budget'] = query_budget
+
+            self.assertLessEqual(queries_count, query_budget, '%s ran %d queries for the %s, over its budget of %d' % (
+                name, queries_count, viewer_name, query_budget))
+
+    def _benchmark_endpoint_for_viewer(self, viewer, url, query_params):
+        headers = make_authentication_headers_for_user(viewer)
+
+        # The first request warms up the caches and the lazily built state, e.g. the materialized timeline
+        response = self.client.get(url, query_params, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        durations = []
+        queries_counts = []
+        rows_read = None
+
+        for i in range(0, BENCHMARK_REPEATS):
+            queries_recorder = _QueriesRecorder()
+
+            with connection.execute_wrapper(queries_recorder):
+                request_start = time.perf_counter()
+                response = self.client.get(url, query_params, **headers)
+                durations.append(time.perf_counter() - request_start)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            queries_counts.append(queries_recorder.queries_count)
+            rows_read = queries_recorder.rows_read
+
+        return {
+            'url': url,
+            'items_count': len(json.loads(response.content)),
+            'queries_count': max(queries_counts),
+            'rows_read': rows_read,
+            'wall_time_min_ms': round(min(durations) * 1000, 2),
+            'wall_time_median_ms': round(statistics.median(durations) * 1000, 2),
+        }
+
+    @classmethod
+    def _write_results(cls):
+        results_directory = os.path.dirname(BENCHMARK_RESULTS_PATH)
+
+        if results_directory:
+            os.makedirs(results_directory, exist_ok=True)
+
+        with open(BENCHMARK_RESULTS_PATH, 'w') as results_file:
+            json.dump({
+                'created': timezone.now().isoformat(),
+                'database_vendor': connection.vendor,
+                'graph': {
+                    'users': BENCHMARK_USERS,
+                    'follows': cls.follows_count,
+                    'communities': BENCHMARK_COMMUNITIES,
+                    'community_members': BENCHMARK_COMMUNITY_MEMBERS,
+                    'connections': BENCHMARK_CONNECTIONS,
+                    'blocks': BENCHMARK_BLOCKS,
+                    'reports': BENCHMARK_REPORTS,
+                    'seeding_duration_s': round(cls.seeding_duration, 2),
+                },
+                'endpoints': cls.results,
+            }, results_file, indent=4, sort_keys=True)
+
+        logger.info('Wrote the feeds benchmark results to %s' % BENCHMARK_RESULTS_PATH)
+
+    @classmethod
+    def _seed_social_graph(cls):
+        # Both viewers follow, connect with and join the same users and communities, only the second one has blocks
+        # and reports, which make the post counts be computed for it instead of read from the stored counters
+        cls.viewer = make_user()
+        cls.viewer_with_blocks = make_user()
+        viewers = [cls.viewer, cls.viewer_with_blocks]
+
+        users = [make_user() for i in range(0, BENCHMARK_USERS)]
+
+        emoji_group = make_reactions_emoji_group()
+        emojis = [make_emoji(group=emoji_group) for i in range(0, 5)]
+
+        cls.hashtag_name = make_hashtag_name()
+
+        # Followed users, up to the follows limit minus the connections, which follow the connected users too
+        followed_users = users[:min(settings.USER_MAX_FOLLOWS, len(users)) - BENCHMARK_CONNECTIONS]
+
+        for viewer in viewers:
+            for followed_user in followed_users:
+                viewer.follow_user_with_id(followed_user.pk)
+
+        cls.follows_count = len(followed_users)
+
+        # Every user posts, some with the benchmarked hashtag
+        posts = []
+
+        for index, user in enumerate(users):
+            text = make_fake_post_text()[:200]
+
+            if index % 10 == 0:
+                text = '%s #%s' % (text, cls.hashtag_name)
+
+            posts.append(user.create_public_post(text=text))
+
+        # Connections with encircled posts
+        for viewer in viewers:
+            circle = viewer.create_circle(name='Benchmark', color='#ffffff')
+
+            for user in users[-BENCHMARK_CONNECTIONS:]:
+                viewer.connect_with_user_with_id(user.pk, circles_ids=[circle.pk])
+                user.confirm_connection_with_user_with_id(viewer.pk)
+
+        for user in users[-BENCHMARK_CONNECTIONS:]:
+            user.create_encircled_post(circles_ids=[user.connections_circle_id], text=make_fake_post_text()[:200])
+
+        # Communities with many members, posts, reactions and comments
+        communities = []
+
+        for index in range(0, BENCHMARK_COMMUNITIES):
+            community = make_community(creator=users[index])
+            communities.append(community)
+
+            for viewer in viewers:
+                viewer.join_community_with_name(community_name=community.name)
+
+            members = users[BENCHMARK_COMMUNITIES:BENCHMARK_COMMUNITIES + BENCHMARK_COMMUNITY_MEMBERS]
+
+            for member_index, member in enumerate(members):
+                member.join_community_with_name(community_name=community.name)
+
+                if member_index % 5 == 0:
+                    community_post = member.create_community_post(community_name=community.name,
+                                                                  text=make_fake_post_text()[:200])
+
+                    for reactor_index, reactor in enumerate(members[:5]):
+                        reactor.react_to_post_with_id(post_id=community_post.pk,
+                                                      emoji_id=emojis[reactor_index % len(emojis)].pk)
+                        reactor.comment_post(post=community_post, text=make_fake_post_comment_text()[:100])
+
+        cls.community = communities[0]
+
+        # Blocks and reports
+        for user in users[BENCHMARK_USERS // 2:BENCHMARK_USERS // 2 + BENCHMARK_BLOCKS]:
+            cls.viewer_with_blocks.block_user_with_id(user_id=user.pk)
+
+        moderation_category = make_moderation_category()
+
+        for post in posts[:BENCHMARK_REPORTS]:
+            cls.viewer_with_blocks.report_post(post=post, category_id=moderation_category.pk)
+
+        for viewer in viewers:
+            rebuild_timeline_for_user_with_id(user_id=viewer.pk)
+
+        curate_top_posts(full_scan=True)
+        curate_trending_posts()
+
+class _QueriesRecorder:
+    """
+    Counts the executed queries and, on the database backends that report them, the rows they read
+    """
+
+    def __init__(self):
+        self.queries_count = 0
+        self.rows_read = None
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+
+        self.queries_count += 1
+
+        rowcount = getattr(context['cursor'], 'rowcount', -1)
+
+        # SQLite doesn't report the rows read by a select
+        if rowcount >= 0:
+            self.rows_read = (self.rows_read or 0) + rowcount
+
+        return result
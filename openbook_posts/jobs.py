@@ -1,5 +1,9 @@
+import time
+
+from django.db import transaction
 from django.utils import timezone
 from django_rq import job
+from rq import get_current_job
 from video_encoding import tasks
 from datetime import timedelta
 from django.db.models import Q, Count
@@ -7,7 +11,13 @@ from django.conf import settings
 from cursor_pagination import CursorPaginator
 
 from openbook_common.utils.model_loaders import get_post_model, get_post_media_model, get_community_model, \
-    get_top_post_model, get_post_comment_model, get_moderated_object_model, get_trending_post_model
+    get_top_post_model, get_post_comment_model, get_moderated_object_model, get_trending_post_model, \
+    get_timeline_model, get_timeline_post_model, get_user_model, get_post_reaction_model, \
+    get_posts_curation_watermark_model, get_trending_post_score_model, get_post_link_model
+from openbook_common.helpers import get_language_for_text
+from openbook_common.utils.pagination import chunked_queryset_ids_iterator
+from openbook_common.link_previews import are_links_previewable, link_previews_counters
+from openbook_common.peekalink_client import peekalink_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -53,70 +63,310 @@ def process_post_media(post_id):
     logger.info('Processed media of post with id: %d' % post_id)
 
 
+@job('default')
+def fan_out_post_to_timelines(post_id):
+    """
+    This job is called after a post is published to add it to the materialized timelines of its audience
+    """
+    Post = get_post_model()
+    Timeline = get_timeline_model()
+
+    try:
+        post = Post.objects.only('id', 'creator_id', 'community_id').get(pk=post_id)
+    except Post.DoesNotExist:
+        return 'Post with id %d no longer exists' % post_id
+
+    users_ids = post.get_timeline_target_users_ids()
+
+    fanned_out_count = Timeline.add_post_to_timelines_for_users_with_ids(post_id=post_id, users_ids=users_ids)
+
+    return 'Fanned out post with id %d to %d timelines' % (post_id, fanned_out_count)
+
+
+@job('default')
+def fan_out_post_notifications(post_id):
+    """
+    This job is called after a post is published to notify the new post subscribers of its community or creator.
+    The subscribers are notified in chunks, the progress is kept in the job meta.
+    """
+    Post = get_post_model()
+
+    try:
+        post = Post.objects.only('id', 'creator_id', 'community_id').get(pk=post_id)
+    except Post.DoesNotExist:
+        return 'Post with id %d no longer exists' % post_id
+
+    subscriptions_ids = sorted(set(post.get_notification_target_subscriptions().values_list('id', flat=True)))
+    subscriptions_count = len(subscriptions_ids)
+    chunk_size = settings.POST_NOTIFICATIONS_FAN_OUT_CHUNK_SIZE
+
+    notified_count = 0
+
+    for chunk_start in range(0, subscriptions_count, chunk_size):
+        chunk_subscriptions_ids = subscriptions_ids[chunk_start:chunk_start + chunk_size]
+        notified_count += post.notify_subscriptions_with_ids(subscriptions_ids=chunk_subscriptions_ids)
+
+        _set_job_progress(done=chunk_start + len(chunk_subscriptions_ids), total=subscriptions_count)
+        logger.info('Notified %d of %d subscribers of post with id %d' % (
+            chunk_start + len(chunk_subscriptions_ids), subscriptions_count, post_id))
+
+    return 'Notified %d subscribers of post with id %d' % (notified_count, post_id)
+
+
+@job('default')
+def detect_post_language(post_id):
+    """
+    This job is called after a post text is saved to detect its language without holding the request
+    """
+    Post = get_post_model()
+
+    post_text = Post.objects.filter(pk=post_id).values_list('text', flat=True).first()
+
+    if post_text is None:
+        return 'Post with id %d does not exist or has no text' % post_id
+
+    language = get_language_for_text(post_text)
+
+    # Only the language is updated, to keep the changes saved to the post meanwhile
+    Post.objects.filter(pk=post_id).update(language=language)
+
+    return 'Detected the language of the post with id %d: %s' % (post_id, language.code if language else None)
+
+
+@job('default')
+def detect_post_comment_language(post_comment_id):
+    """
+    This job is called after a post comment text is saved to detect its language without holding the request
+    """
+    PostComment = get_post_comment_model()
+
+    post_comment_text = PostComment.objects.filter(pk=post_comment_id).values_list('text', flat=True).first()
+
+    if post_comment_text is None:
+        return 'Post comment with id %d does not exist' % post_comment_id
+
+    language = get_language_for_text(post_comment_text)
+
+    PostComment.objects.filter(pk=post_comment_id).update(language=language)
+
+    return 'Detected the language of the post comment with id %d: %s' % (
+        post_comment_id, language.code if language else None)
+
+
+@job('default')
+def update_post_hashtags_images(post_id):
+    """
+    This job is called after new hashtags are added to a published post to use its image for them
+    """
+    Post = get_post_model()
+
+    post = Post.objects.filter(pk=post_id).first()
+
+    if not post:
+        return 'Post with id %d does not exist' % post_id
+
+    post.update_hashtags_images()
+
+    return 'Updated the hashtags images with the post with id %d' % post_id
+
+
+@job('low')
+def soft_delete_post_comments(post_id):
+    """
+    This job is called after a post with many comments is soft deleted to soft delete its comments
+    """
+    Post = get_post_model()
+
+    # The post might have been restored meanwhile
+    post = Post.objects.filter(pk=post_id, is_deleted=True).first()
+
+    if not post:
+        return 'Post with id %d is not soft deleted' % post_id
+
+    post.soft_delete_comments()
+
+    return 'Soft deleted the comments of the post with id %d' % post_id
+
+
+@job('low')
+def unsoft_delete_post_comments(post_id):
+    """
+    This job is called after a post with many comments is restored to restore its comments
+    """
+    Post = get_post_model()
+
+    # The post might have been soft deleted again meanwhile
+    post = Post.objects.filter(pk=post_id, is_deleted=False).first()
+
+    if not post:
+        return 'Post with id %d is soft deleted' % post_id
+
+    post.unsoft_delete_comments()
+
+    return 'Restored the comments of the post with id %d' % post_id
+
+
+@job('default')
+def refresh_post_links_previews(post_links_ids):
+    """
+    This job is called after the links of a post are created to check whether they can be previewed.
+    The links are checked concurrently and shared with the other posts of the same links through the link
+    previews cache.
+    """
+    PostLink = get_post_link_model()
+
+    post_links = list(PostLink.objects.filter(pk__in=post_links_ids))
+
+    links_are_previewable = are_links_previewable(links=[post_link.link for post_link in post_links])
+
+    previewable_post_links_ids = [post_link.pk for post_link in post_links if links_are_previewable[post_link.link]]
+
+    PostLink.objects.filter(pk__in=previewable_post_links_ids).update(has_preview=True)
+    PostLink.objects.filter(pk__in=post_links_ids).exclude(pk__in=previewable_post_links_ids).update(
+        has_preview=False)
+
+    logger.info('Peekalink metrics: %s, link previews cache: %s' % (peekalink_client.get_metrics(),
+                                                                    dict(link_previews_counters)))
+
+    return 'Refreshed the previews of %d links, %d previewable' % (len(post_links),
+                                                                   len(previewable_post_links_ids))
+
+
+@job('default')
+def rebuild_timeline_for_user_with_id(user_id):
+    """
+    This job is called to (re)build the materialized timeline of a user from the timeline sources query
+    """
+    User = get_user_model()
+    Timeline = get_timeline_model()
+    TimelinePost = get_timeline_post_model()
+
+    try:
+        user = User.objects.get(pk=user_id)
+    except User.DoesNotExist:
+        return 'User with id %d no longer exists' % user_id
+
+    timeline = Timeline.get_or_create_timeline_for_user_with_id(user_id=user_id)
+
+    if not timeline.mark_as_rebuilding():
+        return 'Timeline of user with id %d is already ready' % user_id
+
+    TimelinePost.objects.filter(owner_id=user_id).delete()
+
+    posts_ids = [post.pk for post in
+                 user.get_source_timeline_posts_with_no_filters(count=settings.TIMELINE_MAX_LENGTH)]
+
+    timeline_posts = [TimelinePost(owner_id=user_id, post_id=post_id) for post_id in posts_ids]
+    TimelinePost.bulk_create_timeline_posts(timeline_posts)
+
+    min_post_id = posts_ids[-1] if len(posts_ids) >= settings.TIMELINE_MAX_LENGTH else None
+    timeline.mark_as_ready(min_post_id=min_post_id)
+
+    return 'Rebuilt timeline of user with id %d with %d posts' % (user_id, len(posts_ids))
+
+
 @job('low')
-def curate_top_posts():
+def trim_timelines():
+    """
+    Caps the materialized timelines to the max timeline length.
+    This job should be scheduled to be run every n hours.
+    """
+    Timeline = get_timeline_model()
+    TimelinePost = get_timeline_post_model()
+
+    overgrown_timelines = TimelinePost.objects.values('owner_id'). \
+        annotate(posts_count=Count('id')). \
+        filter(posts_count__gt=settings.TIMELINE_MAX_LENGTH)
+
+    total_trimmed_timelines = 0
+
+    for overgrown_timeline in overgrown_timelines.iterator():
+        owner_id = overgrown_timeline['owner_id']
+        min_post_id = TimelinePost.objects.filter(owner_id=owner_id). \
+            order_by('-post_id'). \
+            values_list('post_id', flat=True)[settings.TIMELINE_MAX_LENGTH - 1]
+
+        TimelinePost.objects.filter(owner_id=owner_id, post_id__lt=min_post_id).delete()
+        Timeline.objects.filter(owner_id=owner_id).update(min_post_id=min_post_id)
+        total_trimmed_timelines += 1
+
+    return 'Trimmed: %d timelines' % total_trimmed_timelines
+
+
+@job('low')
+def curate_top_posts(full_scan=False):
     """
     Curates the top posts.
+    Only posts with new reactions or comments since the last curation are checked, unless full_scan is given.
     This job should be scheduled to be run every n hours.
     """
     Post = get_post_model()
     Community = get_community_model()
     PostComment = get_post_comment_model()
+    PostReaction = get_post_reaction_model()
     ModeratedObject = get_moderated_object_model()
     TopPost = get_top_post_model()
-    logger.info('Processing top posts at %s...' % timezone.now())
+    PostsCurationWatermark = get_posts_curation_watermark_model()
+
+    curation_started = timezone.now()
+    logger.info('Processing top posts at %s...' % curation_started)
+
+    watermark = None if full_scan else PostsCurationWatermark.get_watermark_for_curation_type(
+        curation_type=PostsCurationWatermark.CURATION_TYPE_TOP_POSTS)
 
     top_posts_community_query = Q(top_post__isnull=True)
     top_posts_community_query.add(Q(community__isnull=False, community__type=Community.COMMUNITY_TYPE_PUBLIC), Q.AND)
     top_posts_community_query.add(Q(is_closed=False, is_deleted=False, status=Post.STATUS_PUBLISHED), Q.AND)
     top_posts_community_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
 
-    top_posts_criteria_query = Q(total_comments_count__gte=settings.MIN_UNIQUE_TOP_POST_COMMENTS_COUNT) | \
-                               Q(reactions_count__gte=settings.MIN_UNIQUE_TOP_POST_REACTIONS_COUNT)
+    if watermark:
+        # Only posts with activity since the last curation
+        reacted_posts = PostReaction.objects.filter(created__gte=watermark).values('post_id')
+        commented_posts = PostComment.objects.filter(created__gte=watermark).values('post_id')
+        top_posts_community_query.add(Q(id__in=reacted_posts) | Q(id__in=commented_posts), Q.AND)
 
-    posts_select_related = 'community'
-    posts_prefetch_related = ('comments__commenter', 'reactions__reactor')
-    posts_only = ('id', 'status', 'is_deleted', 'is_closed', 'community__type')
+    posts = Post.objects.filter(top_posts_community_query)
 
-    posts = Post.objects. \
-        select_related(posts_select_related). \
-        prefetch_related(*posts_prefetch_related). \
-        only(*posts_only). \
-        filter(top_posts_community_query). \
-        annotate(total_comments_count=Count('comments__commenter_id'),
-                 reactions_count=Count('reactions__reactor_id')). \
-        filter(top_posts_criteria_query)
+    phases_durations = {
+        'candidates': 0,
+        'counts': 0,
+        'writes': 0,
+    }
 
-    top_posts_objects = []
     total_checked_posts = 0
+    total_scanned_rows = 0
     total_curated_posts = 0
 
-    for post in _chunked_queryset_iterator(posts, 1000):
-        total_checked_posts = total_checked_posts + 1
-        if not post.reactions_count >= settings.MIN_UNIQUE_TOP_POST_REACTIONS_COUNT:
-            unique_comments_count = PostComment.objects.filter(post=post). \
-                values('commenter_id'). \
-                annotate(user_comments_count=Count('commenter_id')).count()
+    for posts_ids in chunked_queryset_ids_iterator(posts, 1000, durations=phases_durations):
+        total_checked_posts += len(posts_ids)
 
-            if unique_comments_count >= settings.MIN_UNIQUE_TOP_POST_COMMENTS_COUNT:
-                top_post = _add_post_to_top_post(post=post)
-                if top_post is not None:
-                    top_posts_objects.append(top_post)
-        else:
-            top_post = _add_post_to_top_post(post=post)
-            if top_post is not None:
-                top_posts_objects.append(top_post)
+        counts_started = time.perf_counter()
+
+        unique_reactors_counts = _get_unique_counts_for_posts_with_ids(PostReaction.objects, posts_ids=posts_ids,
+                                                                       field='reactor_id')
+        unique_commenters_counts = _get_unique_counts_for_posts_with_ids(PostComment.objects, posts_ids=posts_ids,
+                                                                         field='commenter_id')
 
-        if len(top_posts_objects) > 1000:
-            TopPost.objects.bulk_create(top_posts_objects)
-            total_curated_posts += len(top_posts_objects)
-            top_posts_objects = []
+        phases_durations['counts'] += time.perf_counter() - counts_started
+        total_scanned_rows += len(posts_ids) + len(unique_reactors_counts) + len(unique_commenters_counts)
+
+        top_posts_objects = [TopPost(post_id=post_id, created=timezone.now()) for post_id in posts_ids if
+                             unique_reactors_counts.get(post_id, 0) >= settings.MIN_UNIQUE_TOP_POST_REACTIONS_COUNT or
+                             unique_commenters_counts.get(post_id, 0) >= settings.MIN_UNIQUE_TOP_POST_COMMENTS_COUNT]
+
+        writes_started = time.perf_counter()
+        # A post can only be a top post once, already curated ones are ignored
+        TopPost.objects.bulk_create(top_posts_objects, ignore_conflicts=True)
+        phases_durations['writes'] += time.perf_counter() - writes_started
 
-    if len(top_posts_objects) > 0:
         total_curated_posts += len(top_posts_objects)
-        TopPost.objects.bulk_create(top_posts_objects)
 
-    return 'Checked: %d. Curated: %d' % (total_checked_posts, total_curated_posts)
+    PostsCurationWatermark.set_watermark_for_curation_type(
+        curation_type=PostsCurationWatermark.CURATION_TYPE_TOP_POSTS, watermark=curation_started)
+
+    return 'Checked: %d. Curated: %d. Scanned rows: %d. Candidates: %.3fs. Counts: %.3fs. Writes: %.3fs' % (
+        total_checked_posts, total_curated_posts, total_scanned_rows, phases_durations['candidates'],
+        phases_durations['counts'], phases_durations['writes'])
 
 
 @job('low')
@@ -191,62 +441,79 @@ def clean_top_posts():
     TopPost.objects.filter(id__in=delete_ids).delete()
 
 
-def _add_post_to_top_post(post):
-    TopPost = get_top_post_model()
-    if not TopPost.objects.filter(post=post).exists():
-        return TopPost(post=post, created=timezone.now())
-    return None
-
-
 @job('low')
 def curate_trending_posts():
     """
-    Curates the trending posts.
-    This job should be scheduled to be run every n hours.
+    Curates the trending posts from the posts with the highest trending scores.
+    The scores are kept up to date as posts get reactions and comments so this job
+    can be scheduled to be run every few minutes.
     """
     Post = get_post_model()
     Community = get_community_model()
     ModeratedObject = get_moderated_object_model()
     TrendingPost = get_trending_post_model()
+    TrendingPostScore = get_trending_post_score_model()
     logger.info('Processing trending posts at %s...' % timezone.now())
 
-    trending_posts_query = Q(created__gte=timezone.now() - timedelta(
+    trending_posts_query = Q(post__created__gte=timezone.now() - timedelta(
         hours=12))
 
-    trending_posts_community_query = Q(community__isnull=False, community__type=Community.COMMUNITY_TYPE_PUBLIC,
-                                       status=Post.STATUS_PUBLISHED,
-                                       is_closed=False, is_deleted=False)
-    trending_posts_community_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
+    trending_posts_community_query = Q(post__community__isnull=False,
+                                       post__community__type=Community.COMMUNITY_TYPE_PUBLIC,
+                                       post__status=Post.STATUS_PUBLISHED,
+                                       post__is_closed=False, post__is_deleted=False)
+    trending_posts_community_query.add(~Q(post__moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
 
     trending_posts_query.add(trending_posts_community_query, Q.AND)
 
-    posts_select_related = 'community'
-    posts_prefetch_related = 'reactions__reactor'
-    posts_only = ('id', 'status', 'is_deleted', 'is_closed', 'community__type')
-
     trending_posts_criteria_query = Q(reactions_count__gte=settings.MIN_UNIQUE_TRENDING_POST_REACTIONS_COUNT)
 
-    posts = Post.objects. \
-        select_related(posts_select_related). \
-        prefetch_related(posts_prefetch_related). \
-        only(*posts_only). \
+    trending_posts_query.add(trending_posts_criteria_query, Q.AND)
+
+    trending_posts_scores = TrendingPostScore.objects. \
         filter(trending_posts_query). \
-        annotate(reactions_count=Count('reactions__reactor_id')).\
-        filter(trending_posts_criteria_query).\
-        order_by('-reactions_count', '-created')[:30]
+        order_by('-score', '-post__created')
 
-    trending_posts_objects = []
+    trending_posts_ids = list(trending_posts_scores.values_list('post_id', flat=True)[:30])
 
-    for post in posts.iterator():
-        if TrendingPost.objects.filter(post=post).exists():
-            TrendingPost.objects.filter(post=post).delete()
+    current_trending_posts = TrendingPost.objects.order_by('-id')
 
-        trending_post = TrendingPost(post=post, created=timezone.now())
-        trending_posts_objects.insert(0, trending_post)
+    current_trending_posts_ids = list(
+        current_trending_posts.values_list('post_id', flat=True)[:len(trending_posts_ids)])
+
+    if current_trending_posts_ids == trending_posts_ids:
+        return 'Curated: 0 posts'
 
-    TrendingPost.objects.bulk_create(trending_posts_objects)
+    # The most trending post is created last so it ends up on top of the trending posts
+    trending_posts_objects = [TrendingPost(post_id=post_id, created=timezone.now()) for post_id in
+                              reversed(trending_posts_ids)]
+
+    with transaction.atomic():
+        TrendingPost.objects.filter(post_id__in=trending_posts_ids).delete()
+        TrendingPost.objects.bulk_create(trending_posts_objects)
 
-    return 'Curated: %d posts' % posts.count()
+    return 'Curated: %d posts' % len(trending_posts_objects)
+
+
+@job('low')
+def bootstrap_trending_posts_scores():
+    """
+    Bootstraps the trending scores of the community posts that can currently be trending.
+    This job should be run once when the trending scores are introduced.
+    """
+    Post = get_post_model()
+    TrendingPostScore = get_trending_post_score_model()
+
+    posts = Post.objects.filter(community__isnull=False, created__gte=timezone.now() - timedelta(hours=12))
+
+    total_bootstrapped_posts = 0
+
+    for posts_ids in chunked_queryset_ids_iterator(posts, 1000):
+        for post_id in posts_ids:
+            TrendingPostScore.rebuild_score_for_post_with_id(post_id=post_id, create=True)
+        total_bootstrapped_posts += len(posts_ids)
+
+    return 'Bootstrapped: %d' % total_bootstrapped_posts
 
 
 @job('low')
@@ -346,6 +613,10 @@ def clean_trending_posts():
     delete_ids = [trending_post.pk for trending_post in less_than_min_reactions_trending_posts]
     TrendingPost.objects.filter(id__in=delete_ids).delete()
 
+    # Scores of posts too old to be trending are no longer needed
+    TrendingPostScore = get_trending_post_score_model()
+    TrendingPostScore.objects.filter(post__created__lt=timezone.now() - timedelta(hours=12)).delete()
+
 
 def _chunked_queryset_iterator(queryset, size, *, ordering=('id',)):
     """
@@ -368,3 +639,26 @@ def _chunked_queryset_iterator(queryset, size, *, ordering=('id',)):
             break
         # take last item, next page starts after this.
         after = pager.cursor(instance=page[-1])
+
+
+def _get_unique_counts_for_posts_with_ids(manager, posts_ids, field):
+    """
+    Counts the unique values of field per post in a single grouped query
+    """
+    counts = manager.filter(post_id__in=posts_ids). \
+        values('post_id'). \
+        annotate(unique_count=Count(field, distinct=True)). \
+        values_list('post_id', 'unique_count')
+
+    return dict(counts)
+
+
+def _set_job_progress(done, total):
+    current_job = get_current_job()
+
+    # Not running in a worker, e.g. when called synchronously
+    if not current_job:
+        return
+
+    current_job.meta['progress'] = {'done': done, 'total': total}
+    current_job.save_meta()
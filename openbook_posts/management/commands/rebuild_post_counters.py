@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+import logging
+
+from openbook_common.utils.model_loaders import get_post_model, get_post_counter_model
+from openbook_common.utils.pagination import chunked_queryset_ids_iterator
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the Posts\'s comments and reactions counters from the comments and reactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing-only', action='store_true',
+                            help='Only build the counters of posts without counters')
+
+    def handle(self, *args, **options):
+        Post = get_post_model()
+        PostCounter = get_post_counter_model()
+
+        posts_to_process = Post.objects.all()
+
+        if options['missing_only']:
+            posts_to_process = posts_to_process.filter(counter__isnull=True)
+
+        rebuilt_posts = 0
+
+        for posts_ids in chunked_queryset_ids_iterator(posts_to_process, 1000):
+            for post_id in posts_ids:
+                PostCounter.rebuild_counts_for_post_with_id(post_id=post_id)
+            rebuilt_posts += len(posts_ids)
+            logger.info('Rebuilt counters for %d posts' % rebuilt_posts)
+
+        logger.info('Rebuilt counters for %d posts' % rebuilt_posts)
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2020-11-02 10:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('openbook_posts', '0071_auto_20201019_1951'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Timeline',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('C', 'Cold'), ('B', 'Building'), ('R', 'Ready')], default='C', max_length=2)),
+                ('min_post_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('modified', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TimelinePost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_posts', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='openbook_posts.Post')),
+            ],
+            options={
+                'unique_together': {('owner', 'post')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2020-11-04 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_posts', '0072_timeline_timelinepost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostsCurationWatermark',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('curation_type', models.CharField(choices=[('TP', 'Top posts')], max_length=2, unique=True)),
+                ('watermark', models.DateTimeField()),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='postreaction',
+            name='created',
+            field=models.DateTimeField(db_index=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2020-11-06 11:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_posts', '0073_postscurationwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingPostScore',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(db_index=True, null=True)),
+                ('reactions_count', models.PositiveIntegerField(default=0)),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trending_score', to='openbook_posts.Post')),
+            ],
+        ),
+    ]
@@ -1,4 +1,5 @@
 # Create your models here.
+import math
 import os
 import tempfile
 import uuid
@@ -9,8 +10,9 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.files import File
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile, SimpleUploadedFile
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction, connections
+from django.db.models import Q, F, Exists, OuterRef, Value, ExpressionWrapper
+from django.db.models.functions import Greatest, Least, Log, Power
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from django.db.models import Count
@@ -23,14 +25,14 @@ from rest_framework.exceptions import ValidationError
 
 from django.conf import settings
 
-from openbook_common.peekalink_client import peekalink_client
+from openbook_common.link_previews import is_link_previewable
 from openbook_posts.validators import post_text_validators, post_comment_text_validators
 from video_encoding.backends import get_backend
 from video_encoding.fields import VideoField
 from video_encoding.models import Format
 
 from openbook.storage_backends import S3PrivateMediaStorage
-from openbook_auth.models import User
+from openbook_auth.models import User, UserProfile
 
 from openbook_common.models import Emoji, Language
 from openbook_common.utils.helpers import delete_file_field, sha256sum, extract_usernames_from_string, get_magic, \
@@ -42,26 +44,38 @@ from openbook_common.utils.model_loaders import get_emoji_model, \
     get_post_user_mention_model, get_post_comment_user_mention_model, get_community_notifications_subscription_model, \
     get_community_new_post_notification_model, get_user_new_post_notification_model, \
     get_hashtag_model, get_user_notifications_subscription_model, get_trending_post_model, \
-    get_post_comment_reaction_notification_model
+    get_post_comment_reaction_notification_model, get_follow_model, get_connection_model, \
+    get_community_membership_model, get_moderation_report_model, get_user_block_model
 from imagekit.models import ProcessedImageField
 
 from openbook_moderation.models import ModeratedObject
 from openbook_notifications.helpers import send_post_comment_user_mention_push_notification, \
-    send_post_user_mention_push_notification, send_community_new_post_push_notification, \
-    send_user_new_post_push_notification
+    send_post_user_mention_push_notification, send_community_new_post_push_notifications, \
+    send_user_new_post_push_notifications
 from openbook_posts.checkers import check_can_be_updated, check_can_add_media, check_can_be_published, \
     check_mimetype_is_supported_media_mimetypes
 from openbook_posts.helpers import upload_to_post_image_directory, upload_to_post_video_directory, \
     upload_to_post_directory
-from openbook_posts.jobs import process_post_media
+from openbook_posts.jobs import process_post_media, fan_out_post_to_timelines, fan_out_post_notifications, \
+    refresh_post_links_previews, detect_post_language, detect_post_comment_language, update_post_hashtags_images, \
+    soft_delete_post_comments, unsoft_delete_post_comments
+from openbook_posts.queries import make_exclude_posts_hidden_by_visibility_exclusions_query
 
 magic = get_magic()
 from openbook_common.helpers import get_language_for_text, extract_urls_from_string
 
 post_image_storage = S3PrivateMediaStorage() if settings.IS_PRODUCTION else default_storage
 
+# The saved text of posts and comments not saved yet, so their text is processed on the first save
+_UNSAVED_TEXT = object()
+
+_FLOAT_ONE = Value(1.0, output_field=models.FloatField())
+_FLOAT_TWO = Value(2.0, output_field=models.FloatField())
+
 
 class Post(models.Model):
+    _saved_text = _UNSAVED_TEXT
+
     moderated_object = GenericRelation(ModeratedObject, related_query_name='posts')
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True, db_index=True)
     text = models.TextField(_('text'), max_length=settings.POST_MAX_LENGTH, blank=False, null=True,
@@ -129,7 +143,7 @@ class Post(models.Model):
 
         if text:
             post.text = text
-            post.language = get_language_for_text(text)
+            post._process_post_language()
 
         if image:
             post.add_media(file=image)
@@ -157,7 +171,7 @@ class Post(models.Model):
         return Emoji.get_emoji_counts_for_post_with_id(post_id=post_id, emoji_id=emoji_id, reactor_id=reactor_id)
 
     @classmethod
-    def get_trending_posts_for_user_with_id(cls, user_id, max_id=None, min_id=None):
+    def get_trending_posts_for_user(cls, user, max_id=None, min_id=None):
         """
         Gets trending posts (communities only) for authenticated user excluding reported, closed, blocked users posts
         """
@@ -165,29 +179,32 @@ class Post(models.Model):
         TrendingPost = get_trending_post_model()
         Community = get_community_model()
 
-        posts_select_related = ('post__creator', 'post__creator__profile', 'post__community', 'post__image')
-        posts_prefetch_related = ('post__circles', 'post__creator__profile__badges', 'post__reactions__reactor')
+        posts_select_related = ('post__creator', 'post__creator__profile', 'post__community', 'post__image',
+                                'post__language')
+        posts_prefetch_related = ('post__circles', 'post__creator__profile__badges', 'post__reactions__reactor',
+                                  'post__hashtags', 'post__links')
 
-        posts_only = ('id',
+        posts_only = ('id', 'created',
                       'post__text', 'post__id', 'post__uuid', 'post__created', 'post__image__width',
                       'post__image__height', 'post__image__image',
-                      'post__creator__username', 'post__creator__id', 'post__creator__profile__name',
-                      'post__creator__profile__avatar',
+                      'post__comments_enabled', 'post__public_reactions', 'post__is_edited', 'post__is_closed',
+                      'post__language', 'post__media_height', 'post__media_width', 'post__media_thumbnail',
+                      'post__creator__username', 'post__creator__id', 'post__creator__visibility',
+                      'post__creator__profile__name', 'post__creator__profile__avatar',
+                      'post__creator__profile__cover',
                       'post__creator__profile__badges__id', 'post__creator__profile__badges__keyword',
                       'post__creator__profile__id', 'post__community__id', 'post__community__name',
-                      'post__community__avatar',
+                      'post__community__avatar', 'post__community__cover',
                       'post__community__color', 'post__community__title')
 
-        reported_posts_exclusion_query = ~Q(post__moderated_object__reports__reporter_id=user_id)
-
         trending_community_posts_query = Q(post__is_closed=False,
                                            post__is_deleted=False,
                                            post__status=Post.STATUS_PUBLISHED)
 
-        trending_community_posts_query.add(~Q(Q(post__creator__blocked_by_users__blocker_id=user_id) | Q(
-            post__creator__user_blocks__blocked_user_id=user_id)), Q.AND)
+        # Posts of blocked users, reported posts and posts of communities banned from
+        trending_community_posts_query.add(make_exclude_posts_hidden_by_visibility_exclusions_query(
+            visibility_exclusions=user.get_visibility_exclusions(), post_field='post'), Q.AND)
         trending_community_posts_query.add(Q(post__community__type=Community.COMMUNITY_TYPE_PUBLIC), Q.AND)
-        trending_community_posts_query.add(~Q(post__community__banned_users__id=user_id), Q.AND)
 
         if max_id:
             trending_community_posts_query.add(Q(id__lt=max_id), Q.AND)
@@ -197,8 +214,6 @@ class Post(models.Model):
         ModeratedObject = get_moderated_object_model()
         trending_community_posts_query.add(~Q(post__moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
 
-        trending_community_posts_query.add(reported_posts_exclusion_query, Q.AND)
-
         trending_community_posts_queryset = TrendingPost.objects. \
             select_related(*posts_select_related). \
             prefetch_related(*posts_prefetch_related). \
@@ -208,17 +223,14 @@ class Post(models.Model):
         return trending_community_posts_queryset
 
     @classmethod
-    def get_trending_posts_old_for_user_with_id(cls, user_id):
+    def get_trending_posts_old_for_user(cls, user):
         """
         For backwards compatibility reasons
         """
         trending_posts_query = cls._get_trending_posts_old_query()
-        trending_posts_query.add(~Q(community__banned_users__id=user_id), Q.AND)
-
-        trending_posts_query.add(~Q(Q(creator__blocked_by_users__blocker_id=user_id) | Q(
-            creator__user_blocks__blocked_user_id=user_id)), Q.AND)
 
-        trending_posts_query.add(~Q(moderated_object__reports__reporter_id=user_id), Q.AND)
+        trending_posts_query.add(make_exclude_posts_hidden_by_visibility_exclusions_query(
+            visibility_exclusions=user.get_visibility_exclusions()), Q.AND)
 
         trending_posts_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
 
@@ -280,6 +292,90 @@ class Post(models.Model):
         post_creator = User.objects.filter(pk=post.creator.id)
         return other_repliers.union(post_comment_creator, post_creator)
 
+    @classmethod
+    def get_ids_of_users_that_can_see_post(cls, post, users_ids):
+        """
+        Returns the ids of the given users that can see the post, as User.can_see_post would for each one
+        but resolved with a single users query, e.g. for the notification targets or the mentioned users.
+        :return:
+        """
+        users_ids = set(users_ids)
+        visible_users_ids = set()
+
+        if post.creator_id in users_ids:
+            users_ids.discard(post.creator_id)
+            if post.community_id or not post.is_deleted:
+                visible_users_ids.add(post.creator_id)
+
+        if not users_ids or post.is_deleted or post.status != cls.STATUS_PUBLISHED:
+            return visible_users_ids
+
+        users = User.objects.filter(pk__in=users_ids).annotate(
+            has_reported_post=_make_user_has_reported_object_exists(object_type=ModeratedObject.OBJECT_TYPE_POST,
+                                                                    object_id=post.pk),
+            is_blocked_with_creator=_make_user_is_blocked_with_user_exists(user_id=post.creator_id))
+
+        if post.community_id:
+            if ModeratedObject.objects.filter(object_type=ModeratedObject.OBJECT_TYPE_POST, object_id=post.pk,
+                                              status=ModeratedObject.STATUS_APPROVED).exists():
+                return visible_users_ids
+
+            CommunityMembership = get_community_membership_model()
+            Community = get_community_model()
+
+            community = post.community
+            creator_is_staff = community.memberships.filter(
+                Q(user_id=post.creator_id) & Q(Q(is_administrator=True) | Q(is_moderator=True))).exists()
+
+            users = users.annotate(
+                is_member=Exists(CommunityMembership.objects.filter(community_id=community.pk,
+                                                                    user_id=OuterRef('pk'))),
+                is_community_staff=Exists(CommunityMembership.objects.filter(
+                    Q(community_id=community.pk, user_id=OuterRef('pk')) & Q(
+                        Q(is_administrator=True) | Q(is_moderator=True)))),
+                is_banned=Exists(Community.banned_users.through.objects.filter(community_id=community.pk,
+                                                                                user_id=OuterRef('pk'))))
+
+            for user in users.values('pk', 'has_reported_post', 'is_blocked_with_creator', 'is_member',
+                                     'is_community_staff', 'is_banned'):
+                if user['has_reported_post'] or user['is_banned']:
+                    continue
+
+                if not user['is_member'] and community.type != Community.COMMUNITY_TYPE_PUBLIC:
+                    continue
+
+                if not user['is_community_staff']:
+                    if post.is_closed:
+                        continue
+
+                    # Posts of blocked users are only seen if they're staff members
+                    if user['is_blocked_with_creator'] and not creator_is_staff:
+                        continue
+
+                visible_users_ids.add(user['pk'])
+        else:
+            Circle = get_circle_model()
+            Connection = get_connection_model()
+
+            post_circles_ids = list(post.circles.values_list('id', flat=True))
+            is_world_circle_post = Circle.get_world_circle().pk in post_circles_ids
+
+            users = users.annotate(
+                is_in_post_circles=Exists(Connection.objects.filter(circles__id__in=post_circles_ids,
+                                                                    target_user_id=OuterRef('pk'),
+                                                                    target_connection__circles__isnull=False)))
+
+            for user in users.values('pk', 'has_reported_post', 'is_blocked_with_creator', 'is_in_post_circles'):
+                if user['has_reported_post'] or user['is_blocked_with_creator']:
+                    continue
+
+                if not is_world_circle_post and not user['is_in_post_circles']:
+                    continue
+
+                visible_users_ids.add(user['pk'])
+
+        return visible_users_ids
+
     @classmethod
     def get_community_notification_target_subscriptions(cls, post):
         CommunityNotificationsSubscription = get_community_notifications_subscription_model()
@@ -347,31 +443,42 @@ class Post(models.Model):
         return PostComment.count_comments_for_post_with_id(self.pk)
 
     def count_comments_with_user(self, user):
-        # Count comments excluding users blocked by authenticated user
-        count_query = ~Q(Q(commenter__blocked_by_users__blocker_id=user.pk) | Q(
-            commenter__user_blocks__blocked_user_id=user.pk))
+        count_query = PostComment._make_count_comments_with_user_query(community=self.community, user=user)
+        return self.comments.filter(count_query).count()
 
-        if self.community:
-            if not user.is_staff_of_community_with_name(community_name=self.community.name):
-                # Dont retrieve comments except from staff members
-                blocked_users_query_staff_members = Q(
-                    commenter__communities_memberships__community_id=self.community.pk)
-                blocked_users_query_staff_members.add(Q(commenter__communities_memberships__is_administrator=True) | Q(
-                    commenter__communities_memberships__is_moderator=True), Q.AND)
+    @classmethod
+    def get_comments_counts_for_posts_with_user(cls, posts, user):
+        """
+        Returns the comments count of each of the posts, as count_comments_with_user would for each one,
+        with a single query.
+        """
+        posts_ids_by_community_id = {}
+        communities = {}
 
-                count_query.add(~blocked_users_query_staff_members, Q.AND)
+        for post in posts:
+            posts_ids_by_community_id.setdefault(post.community_id, []).append(post.pk)
+            communities[post.community_id] = post.community
 
-            # Don't count items that have been reported and approved by community moderators
-            ModeratedObject = get_moderated_object_model()
-            count_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
+        count_query = Q()
 
-        # Dont count soft deleted items
-        count_query.add(Q(is_deleted=False), Q.AND)
+        for community_id, posts_ids in posts_ids_by_community_id.items():
+            community_count_query = PostComment._make_count_comments_with_user_query(
+                community=communities[community_id], user=user)
+            community_count_query.add(Q(post_id__in=posts_ids), Q.AND)
+            count_query.add(community_count_query, Q.OR)
 
-        # Dont count items we have reported
-        count_query.add(~Q(moderated_object__reports__reporter_id=user.pk), Q.AND)
+        posts_comments_counts = {post.pk: 0 for post in posts}
 
-        return self.comments.filter(count_query).count()
+        if not posts_comments_counts:
+            return posts_comments_counts
+
+        comments_counts = PostComment.objects.filter(count_query).values('post_id').annotate(
+            count=Count('id')).order_by()
+
+        for comments_count in comments_counts:
+            posts_comments_counts[comments_count['post_id']] = comments_count['count']
+
+        return posts_comments_counts
 
     def count_reactions(self, reactor_id=None):
         return PostReaction.count_reactions_for_post_with_id(self.pk, reactor_id=reactor_id)
@@ -433,7 +540,7 @@ class Post(models.Model):
         check_can_be_updated(post=self, text=text)
         self.text = text
         self.is_edited = True
-        self.language = get_language_for_text(text)
+        self._process_post_language()
         self.save()
 
     def get_media(self):
@@ -531,8 +638,14 @@ class Post(models.Model):
     def _publish(self):
         self.status = Post.STATUS_PUBLISHED
         self.created = timezone.now()
-        self._process_post_subscribers()
         self.save()
+        # The mentioned users might not have been able to see the post while it was a draft
+        self._process_post_mentions()
+        # Called right away from a request for posts without media, which have no image to copy
+        self.update_hashtags_images()
+        self._process_post_subscribers()
+        self._process_post_timelines()
+        self.rebuild_creator_posts_counts()
 
     def is_draft(self):
         return self.status == Post.STATUS_DRAFT
@@ -550,69 +663,123 @@ class Post(models.Model):
 
         self.modified = timezone.now()
 
+        is_new_post = not self.id
+        has_text_changed = self._has_text_changed()
+
         post = super(Post, self).save(*args, **kwargs)
 
-        self._process_post_mentions()
-        self._process_post_hashtags()
+        if is_new_post:
+            PostCounter.objects.create(post=self)
+            UserProfile.increment_posts_count_for_user_with_id(user_id=self.creator_id)
+
+        if has_text_changed:
+            self._process_post_mentions()
+            self._process_post_hashtags()
+            self._saved_text = self.text
+
         self._process_post_links()
 
         return post
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super(Post, cls).from_db(db, field_names, values)
+        # The text as saved, to only process its mentions and hashtags again when it changes
+        post._saved_text = post.__dict__.get('text', _UNSAVED_TEXT)
+        return post
+
+    def _has_text_changed(self):
+        # A deferred text that wasn't loaded nor set didn't change
+        return 'text' in self.__dict__ and self.text != self._saved_text
+
     def delete(self, *args, **kwargs):
         self.delete_media()
         super(Post, self).delete(*args, **kwargs)
+        self.rebuild_creator_posts_counts()
+
+    def rebuild_creator_posts_counts(self):
+        UserProfile.rebuild_posts_counts_for_user_with_id(user_id=self.creator_id)
 
     def delete_media(self):
         if self.has_image():
             delete_file_field(self.image.image)
 
     def soft_delete(self):
-        self.delete_notifications()
-        for comment in self.comments.all().iterator():
-            comment.soft_delete()
         self.is_deleted = True
         self.save()
+        self.rebuild_creator_posts_counts()
+
+        if self._has_many_comments():
+            # The comments of big posts are soft deleted in the background, the post is hidden right away
+            post_id = self.pk
+            transaction.on_commit(lambda: soft_delete_post_comments.delay(post_id=post_id))
+        else:
+            self.soft_delete_comments()
 
     def unsoft_delete(self):
         self.is_deleted = False
-        for comment in self.comments.all().iterator():
-            comment.unsoft_delete()
         self.save()
+        self.rebuild_creator_posts_counts()
+
+        if self._has_many_comments():
+            post_id = self.pk
+            transaction.on_commit(lambda: unsoft_delete_post_comments.delay(post_id=post_id))
+        else:
+            self.unsoft_delete_comments()
+
+    def soft_delete_comments(self):
+        """
+        Soft deletes all the comments and replies of the post with a single update and deletes the notifications
+        of the post and its comments
+        """
+        self.delete_notifications()
+        self.comments.update(is_deleted=True, modified=timezone.now())
+        PostCounter.rebuild_comments_count_for_post_with_id(post_id=self.pk)
+
+    def unsoft_delete_comments(self):
+        """
+        Restores all the comments and replies of the post with a single update
+        """
+        self.comments.update(is_deleted=False, modified=timezone.now())
+        PostCounter.rebuild_comments_count_for_post_with_id(post_id=self.pk)
+
+    def _has_many_comments(self):
+        return self.comments.count() >= settings.POST_SOFT_DELETE_IN_BACKGROUND_MIN_COMMENTS_COUNT
 
     def delete_notifications(self):
         # Remove all post reaction notifications
         PostReactionNotification = get_post_reaction_notification_model()
-        PostReactionNotification.objects.filter(post_reaction__post_id=self.pk).delete()
+        _delete_in_chunks(PostReactionNotification.objects.filter(post_reaction__post_id=self.pk))
 
         # Remove all post user mention notifications
         PostUserMentionNotification = get_post_user_mention_notification_model()
-        PostUserMentionNotification.objects.filter(post_user_mention__post_id=self.pk).delete()
+        _delete_in_chunks(PostUserMentionNotification.objects.filter(post_user_mention__post_id=self.pk))
 
         # Remove all post comment notifications
         PostCommentNotification = get_post_comment_notification_model()
-        PostCommentNotification.objects.filter(post_comment__post_id=self.pk).delete()
+        _delete_in_chunks(PostCommentNotification.objects.filter(post_comment__post_id=self.pk))
 
         # Remove all post comment reply notifications
         PostCommentReplyNotification = get_post_comment_reply_notification_model()
-        PostCommentReplyNotification.objects.filter(post_comment__post_id=self.pk).delete()
+        _delete_in_chunks(PostCommentReplyNotification.objects.filter(post_comment__post_id=self.pk))
 
         # Remove all post comment reaction notifications
         PostCommentReactionNotification = get_post_comment_reaction_notification_model()
-        PostCommentReactionNotification.objects.filter(
-            post_comment_reaction__post_comment__post_id=self.pk).delete()
+        _delete_in_chunks(PostCommentReactionNotification.objects.filter(
+            post_comment_reaction__post_comment__post_id=self.pk))
 
         # Remove all post comment user mention notifications
         PostCommentUserMentionNotification = get_post_comment_user_mention_notification_model()
-        PostCommentUserMentionNotification.objects.filter(
-            post_comment_user_mention__post_comment__post_id=self.pk).delete()
+        _delete_in_chunks(PostCommentUserMentionNotification.objects.filter(
+            post_comment_user_mention__post_comment__post_id=self.pk))
 
         # Remove all community new post notifications
         CommunityNewPostNotification = get_community_new_post_notification_model()
-        CommunityNewPostNotification.objects.filter(post_id=self.pk).delete()
+        _delete_in_chunks(CommunityNewPostNotification.objects.filter(post_id=self.pk))
 
         # Remove all user new post notifications
         UserNewPostNotification = get_user_new_post_notification_model()
-        UserNewPostNotification.objects.filter(post_id=self.pk).delete()
+        _delete_in_chunks(UserNewPostNotification.objects.filter(post_id=self.pk))
 
     def delete_notifications_for_user(self, user):
         # Remove all post reaction notifications
@@ -723,93 +890,176 @@ class Post(models.Model):
         return result
 
     def _process_post_mentions(self):
-        if not self.text:
-            self.user_mentions.all().delete()
-        else:
-            usernames = extract_usernames_from_string(string=self.text)
-            if not usernames:
-                self.user_mentions.all().delete()
-            else:
-                existing_mention_usernames = []
-                for existing_mention in self.user_mentions.only('id', 'user__username').all().iterator():
-                    existing_mention_username = existing_mention.user.username.lower()
-                    if existing_mention_username not in usernames:
-                        existing_mention.delete()
-                    else:
-                        existing_mention_usernames.append(existing_mention_username)
-
-                PostUserMention = get_post_user_mention_model()
-                User = get_user_model()
-
-                for username in usernames:
-                    username = username.lower()
-                    if username not in existing_mention_usernames:
-                        try:
-                            user = User.objects.only('id', 'username').get(username__iexact=username)
-                            user_is_post_creator = user.pk == self.creator_id
-                            if user.can_see_post(post=self) and not user_is_post_creator:
-                                PostUserMention.create_post_user_mention(user=user, post=self)
-                                existing_mention_usernames.append(username)
-                        except User.DoesNotExist:
-                            pass
+        usernames = set(username.lower() for username in extract_usernames_from_string(string=self.text or ''))
+
+        existing_mentions = list(self.user_mentions.values_list('id', 'user__username'))
+
+        removed_mentions_ids = [mention_id for mention_id, username in existing_mentions if
+                                username.lower() not in usernames]
+
+        if removed_mentions_ids:
+            self.user_mentions.filter(pk__in=removed_mentions_ids).delete()
+
+        existing_mention_usernames = set(username.lower() for mention_id, username in existing_mentions)
+
+        mentioned_users = _get_users_with_usernames(usernames=[username for username in usernames if
+                                                              username not in existing_mention_usernames])
+
+        if not mentioned_users:
+            return
+
+        users_ids_that_can_see_post = Post.get_ids_of_users_that_can_see_post(
+            post=self, users_ids=[user.pk for user in mentioned_users])
+
+        PostUserMention = get_post_user_mention_model()
+
+        PostUserMention.bulk_create_post_user_mentions(
+            users_ids=[user.pk for user in mentioned_users if
+                       user.pk in users_ids_that_can_see_post and user.pk != self.creator_id],
+            post=self)
 
     def _process_post_hashtags(self):
-        if not self.text:
-            self.hashtags.all().delete()
-        else:
-            hashtags = extract_hashtags_from_string(string=self.text)
-            if not hashtags:
-                self.hashtags.all().delete()
-            else:
-                existing_hashtags = []
-                for existing_hashtag in self.hashtags.only('id', 'name').all().iterator():
-                    if existing_hashtag.name not in hashtags:
-                        self.hashtags.remove(existing_hashtag)
-                    else:
-                        existing_hashtags.append(existing_hashtag.name)
+        hashtags_names = set(hashtag.lower() for hashtag in extract_hashtags_from_string(string=self.text or ''))
 
-                Hashtag = get_hashtag_model()
+        existing_hashtags = list(self.hashtags.only('id', 'name'))
 
-                for hashtag in hashtags:
-                    hashtag = hashtag.lower()
-                    hashtag_obj = Hashtag.get_or_create_hashtag(name=hashtag, post=self)
-                    if hashtag not in existing_hashtags:
-                        self.hashtags.add(hashtag_obj)
+        removed_hashtags = [hashtag for hashtag in existing_hashtags if hashtag.name not in hashtags_names]
 
-    def _process_post_subscribers(self):
-        if self.community:
+        if removed_hashtags:
+            self.hashtags.remove(*removed_hashtags)
+
+        existing_hashtags_names = set(hashtag.name for hashtag in existing_hashtags)
+        new_hashtags_names = hashtags_names - existing_hashtags_names
+
+        if not new_hashtags_names:
+            return
+
+        Hashtag = get_hashtag_model()
+        self.hashtags.add(*Hashtag.get_or_create_hashtags_with_names(names=new_hashtags_names))
+
+        if self.status == Post.STATUS_PUBLISHED:
+            # The hashtags images are copied in the background, saving the post doesn't wait on them
+            post_id = self.pk
+            transaction.on_commit(lambda: update_post_hashtags_images.delay(post_id=post_id))
+
+    def update_hashtags_images(self):
+        """
+        Uses the first image of the post for its hashtags without an image, if the post is publicly visible
+        """
+        if not self.get_first_media_image() or not self.is_publicly_visible():
+            return
+
+        for hashtag in self.hashtags.filter(Q(image__isnull=True) | Q(image='')):
+            hashtag.attempt_update_media_with_post(post=self)
+
+    def get_notification_target_subscriptions(self):
+        if self.community_id:
+            return Post.get_community_notification_target_subscriptions(post=self)
+        return Post.get_user_notification_target_subscriptions(post=self)
+
+    def notify_subscriptions_with_ids(self, subscriptions_ids):
+        """
+        Notifies the new post subscriptions with the given ids at once, returns the number of notified ones
+        """
+        if self.community_id:
+            CommunityNotificationsSubscription = get_community_notifications_subscription_model()
             CommunityNewPostNotification = get_community_new_post_notification_model()
-            community_subscriptions = Post.get_community_notification_target_subscriptions(post=self)
 
-            for subscription in community_subscriptions:
-                CommunityNewPostNotification.create_community_new_post_notification(
-                    post_id=self.pk,
-                    owner_id=subscription.subscriber.pk, community_notifications_subscription_id=subscription.pk)
-                send_community_new_post_push_notification(community_notifications_subscription=subscription)
+            community_subscriptions = CommunityNotificationsSubscription.objects.select_related(
+                'community', 'subscriber__notifications_settings', 'subscriber__language').filter(
+                pk__in=subscriptions_ids)
+
+            with transaction.atomic():
+                notified_subscriptions = CommunityNewPostNotification.bulk_create_community_new_post_notifications(
+                    post_id=self.pk, community_notifications_subscriptions=community_subscriptions)
+
+            send_community_new_post_push_notifications(community_notifications_subscriptions=notified_subscriptions)
         else:
+            UserNotificationsSubscription = get_user_notifications_subscription_model()
             UserNewPostNotification = get_user_new_post_notification_model()
-            user_subscriptions = Post.get_user_notification_target_subscriptions(post=self)
 
-            for subscription in user_subscriptions:
-                UserNewPostNotification.create_user_new_post_notification(
-                    post_id=self.pk, owner_id=subscription.subscriber.pk,
-                    user_notifications_subscription_id=subscription.pk)
-                send_user_new_post_push_notification(user_notifications_subscription=subscription, post=self)
+            user_subscriptions = UserNotificationsSubscription.objects.select_related(
+                'user__profile', 'subscriber__notifications_settings', 'subscriber__language').filter(
+                pk__in=subscriptions_ids)
 
-    def _process_post_links(self):
-        if self.has_text():
-            if not self.has_media():
-                link_urls = extract_urls_from_string(self.text)
-                if link_urls:
-                    self.links.all().delete()
-                    for link_url in link_urls:
-                        link_url = normalize_url(link_url)
-                        post_link = PostLink.create_link(link=link_url, post_id=self.pk)
-                        post_link.refresh_has_preview()
-            else:
-                self.links.all().delete()
+            with transaction.atomic():
+                notified_subscriptions = UserNewPostNotification.bulk_create_user_new_post_notifications(
+                    post_id=self.pk, user_notifications_subscriptions=user_subscriptions)
+
+            send_user_new_post_push_notifications(user_notifications_subscriptions=notified_subscriptions)
+
+        return len(notified_subscriptions)
+
+    def _process_post_subscribers(self):
+        # The subscribers are notified in the background, publishing doesn't wait on them
+        post_id = self.pk
+        transaction.on_commit(lambda: fan_out_post_notifications.delay(post_id=post_id))
+
+    def get_timeline_target_users_ids(self):
+        """
+        Returns the ids of the users whose home timeline the post belongs to.
+        Blocks, reports and moderation are applied when the timeline is read.
+        """
+        if self.community_id:
+            CommunityMembership = get_community_membership_model()
+            return list(CommunityMembership.objects.filter(community_id=self.community_id).values_list('user_id',
+                                                                                                      flat=True))
+
+        followers_query = Q(followed_user_id=self.creator_id)
+
+        if not self.is_public_post():
+            # Only followers that are part of the circles of the post
+            Connection = get_connection_model()
+            circles_connections = Connection.objects.filter(user_id=self.creator_id, circles__posts__id=self.pk,
+                                                            target_connection__circles__isnull=False). \
+                values('target_user_id')
+            followers_query.add(Q(user_id__in=circles_connections), Q.AND)
+
+        Follow = get_follow_model()
+        followers_ids = Follow.objects.filter(followers_query).values_list('user_id', flat=True)
+
+        return [self.creator_id] + list(followers_ids)
+
+    def _process_post_timelines(self):
+        # Add it right away to the creator timeline, the rest are fanned out in the background
+        Timeline.add_post_to_timelines_for_users_with_ids(post_id=self.pk, users_ids=[self.creator_id])
+        post_id = self.pk
+        transaction.on_commit(lambda: fan_out_post_to_timelines.delay(post_id=post_id))
+
+    def _process_post_language(self):
+        if settings.LANGUAGE_DETECTION_IN_BACKGROUND:
+            # The language is detected in the background, saving the post doesn't wait on it
+            post_id = self.pk
+            transaction.on_commit(lambda: detect_post_language.delay(post_id=post_id))
         else:
+            self.language = get_language_for_text(self.text)
+
+    def _process_post_links(self):
+        if not self.has_text() or self.has_media():
             self.links.all().delete()
+            return
+
+        links = []
+
+        for link_url in extract_urls_from_string(self.text):
+            link = normalize_url(link_url)
+            if link not in links:
+                links.append(link)
+
+        existing_links = []
+
+        for existing_post_link in self.links.all():
+            if existing_post_link.link not in links or existing_post_link.link in existing_links:
+                existing_post_link.delete()
+            else:
+                existing_links.append(existing_post_link.link)
+
+        new_post_links_ids = [PostLink.create_link(link=link, post_id=self.pk).pk for link in links if
+                              link not in existing_links]
+
+        if new_post_links_ids:
+            # The previews are checked in the background, saving the post doesn't wait on them
+            transaction.on_commit(lambda: refresh_post_links_previews.delay(post_links_ids=new_post_links_ids))
 
 
 class TopPost(models.Model):
@@ -838,6 +1088,359 @@ class TrendingPost(models.Model):
         return super(TrendingPost, self).save(*args, **kwargs)
 
 
+class TrendingPostScore(models.Model):
+    """
+    The decayed trending score of a community post, kept up to date as the post gets reactions and comments.
+    Every activity adds 2 ** (activity_created / half_life) to the score, which is stored in log2 space so that
+    older activity decays relative to newer activity without ever having to be updated.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, related_name='trending_score')
+    score = models.FloatField(null=True, db_index=True)
+    reactions_count = models.PositiveIntegerField(default=0)
+
+    # Subtracting an activity making up almost all of the score loses its precision, it's rebuilt instead
+    MIN_SUBTRACTED_SCORE_MARGIN = 0.001
+
+    @classmethod
+    def get_activity_score(cls, activity_created):
+        return activity_created.timestamp() / (settings.TRENDING_POST_SCORE_HALF_LIFE_IN_HOURS * 3600)
+
+    @classmethod
+    def add_activity_to_post_with_id(cls, post_id, activity_created, is_reaction=False):
+        """
+        Adds the activity to the score with a single update, so the activity of a post doesn't queue on a row lock.
+        The score is only rebuilt for the first activity of the post.
+        """
+        activity_score = cls.get_activity_score(activity_created=activity_created)
+        reactions_count = F('reactions_count') + 1 if is_reaction else F('reactions_count')
+
+        if not cls.objects.filter(post_id=post_id, score__isnull=False).update(
+                score=cls._make_add_score_expression(activity_score), reactions_count=reactions_count):
+            cls.rebuild_score_for_post_with_id(post_id=post_id, create=True)
+
+    @classmethod
+    def remove_activity_from_post_with_id(cls, post_id, activity_created, is_reaction=False):
+        """
+        Subtracts the activity from the score with a single update. The score is only rebuilt when the activity
+        made up almost all of it, and posts without a score, e.g. outside of communities, are left alone.
+        """
+        activity_score = cls.get_activity_score(activity_created=activity_created)
+        reactions_count = F('reactions_count') - 1 if is_reaction else F('reactions_count')
+
+        if cls.objects.filter(post_id=post_id, score__gt=activity_score + cls.MIN_SUBTRACTED_SCORE_MARGIN).update(
+                score=cls._make_subtract_score_expression(activity_score), reactions_count=reactions_count):
+            return
+
+        if cls.objects.filter(post_id=post_id).exists():
+            cls.rebuild_score_for_post_with_id(post_id=post_id)
+
+    @classmethod
+    def rebuild_score_for_post_with_id(cls, post_id, create=False):
+        """
+        Recomputes the score from the reactions and comments of the post
+        """
+        reactions_created = PostReaction.objects.filter(post_id=post_id).values_list('created', flat=True)
+        comments_created = PostComment.objects.filter(post_id=post_id).values_list('created', flat=True)
+
+        score = None
+        reactions_count = 0
+
+        for reaction_created in reactions_created.iterator():
+            score = cls._add_scores(score, cls.get_activity_score(activity_created=reaction_created))
+            reactions_count += 1
+
+        for comment_created in comments_created.iterator():
+            score = cls._add_scores(score, cls.get_activity_score(activity_created=comment_created))
+
+        if create:
+            cls.objects.update_or_create(post_id=post_id,
+                                         defaults={'score': score, 'reactions_count': reactions_count})
+        else:
+            cls.objects.filter(post_id=post_id).update(score=score, reactions_count=reactions_count)
+
+    @classmethod
+    def _add_scores(cls, score_a, score_b):
+        # log2(2 ** score_a + 2 ** score_b) without overflowing
+        if score_a is None:
+            return score_b
+        max_score = max(score_a, score_b)
+        return max_score + math.log2(1 + 2 ** (min(score_a, score_b) - max_score))
+
+    @classmethod
+    def _make_add_score_expression(cls, activity_score):
+        # _add_scores of the stored score and the activity score, in SQL
+        activity_score = Value(activity_score, output_field=models.FloatField())
+        max_score = Greatest(F('score'), activity_score)
+        min_score = Least(F('score'), activity_score)
+
+        return ExpressionWrapper(max_score + Log(_FLOAT_TWO, _FLOAT_ONE + Power(_FLOAT_TWO, min_score - max_score)),
+                                 output_field=models.FloatField())
+
+    @classmethod
+    def _make_subtract_score_expression(cls, activity_score):
+        # log2(2 ** score - 2 ** activity_score) without overflowing, in SQL
+        activity_score = Value(activity_score, output_field=models.FloatField())
+
+        return ExpressionWrapper(
+            F('score') + Log(_FLOAT_TWO, _FLOAT_ONE - Power(_FLOAT_TWO, activity_score - F('score'))),
+            output_field=models.FloatField())
+
+
+class PostCounter(models.Model):
+    """
+    Denormalized comments and reactions counts of a post, as seen by users without blocks or reports affecting them.
+    Changes that can't be applied as an increment rebuild the counts from the source tables.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, related_name='counter')
+    comments_count = models.PositiveIntegerField(default=0)
+    reactions_count = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def increment_comments_count_for_post_with_id(cls, post_id):
+        if not cls.objects.filter(post_id=post_id).update(comments_count=F('comments_count') + 1):
+            cls.rebuild_counts_for_post_with_id(post_id=post_id)
+
+    @classmethod
+    def increment_reactions_count_for_post_with_id(cls, post_id, emoji_id):
+        with transaction.atomic():
+            if not cls.objects.filter(post_id=post_id).update(reactions_count=F('reactions_count') + 1):
+                cls.rebuild_counts_for_post_with_id(post_id=post_id)
+                return
+
+            PostReactionEmojiCount.increment_count_for_post_with_id(post_id=post_id, emoji_id=emoji_id)
+
+    @classmethod
+    def rebuild_counts_for_post_with_id(cls, post_id):
+        cls.rebuild_comments_count_for_post_with_id(post_id=post_id)
+        cls.rebuild_reactions_counts_for_post_with_id(post_id=post_id)
+
+    @classmethod
+    def rebuild_comments_count_for_post_with_id(cls, post_id):
+        comments_count_query = Q(post_id=post_id, is_deleted=False)
+
+        if Post.objects.filter(pk=post_id, community__isnull=False).exists():
+            # Comments reported and approved by community moderators are not counted
+            comments_count_query.add(~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED), Q.AND)
+
+        comments_count = PostComment.objects.filter(comments_count_query).count()
+
+        cls.objects.update_or_create(post_id=post_id, defaults={'comments_count': comments_count})
+
+    @classmethod
+    def rebuild_reactions_counts_for_post_with_id(cls, post_id):
+        emoji_counts = PostReaction.objects.filter(post_id=post_id). \
+            values('emoji_id'). \
+            annotate(count=Count('id')). \
+            values_list('emoji_id', 'count')
+
+        post_reaction_emoji_counts = [PostReactionEmojiCount(post_id=post_id, emoji_id=emoji_id, count=count) for
+                                      emoji_id, count in emoji_counts]
+
+        with transaction.atomic():
+            cls.objects.update_or_create(post_id=post_id, defaults={
+                'reactions_count': sum(
+                    post_reaction_emoji_count.count for post_reaction_emoji_count in post_reaction_emoji_counts)
+            })
+            PostReactionEmojiCount.objects.filter(post_id=post_id).delete()
+            PostReactionEmojiCount.objects.bulk_create(post_reaction_emoji_counts)
+
+
+class PostReactionEmojiCount(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='reaction_emoji_counts')
+    emoji = models.ForeignKey(Emoji, on_delete=models.CASCADE, related_name='post_reaction_emoji_counts')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('post', 'emoji',)
+
+    @classmethod
+    def increment_count_for_post_with_id(cls, post_id, emoji_id):
+        if cls.objects.filter(post_id=post_id, emoji_id=emoji_id).update(count=F('count') + 1):
+            return
+
+        cls.objects.bulk_create([cls(post_id=post_id, emoji_id=emoji_id, count=0)], ignore_conflicts=True)
+        cls.objects.filter(post_id=post_id, emoji_id=emoji_id).update(count=F('count') + 1)
+
+    @classmethod
+    def get_emoji_counts_for_post_with_id(cls, post_id):
+        post_reaction_emoji_counts = cls.objects.filter(post_id=post_id, count__gt=0). \
+            select_related('emoji'). \
+            order_by('-count')
+
+        return [{'emoji': post_reaction_emoji_count.emoji, 'count': post_reaction_emoji_count.count} for
+                post_reaction_emoji_count in post_reaction_emoji_counts]
+
+
+class Timeline(models.Model):
+    """
+    The state of the materialized home timeline of a user.
+    The timeline posts are only used to serve the timeline while it is ready, the
+    sources union query is used as fallback while its cold or being rebuilt.
+    """
+    owner = models.OneToOneField(User, on_delete=models.CASCADE, related_name='timeline')
+    STATUS_COLD = 'C'
+    STATUS_BUILDING = 'B'
+    STATUS_READY = 'R'
+    STATUSES = (
+        (STATUS_COLD, 'Cold'),
+        (STATUS_BUILDING, 'Building'),
+        (STATUS_READY, 'Ready'),
+    )
+    status = models.CharField(blank=False, null=False, choices=STATUSES, default=STATUS_COLD, max_length=2)
+    # When the timeline was capped, posts older than this id are not in the timeline
+    min_post_id = models.PositiveIntegerField(null=True, blank=True)
+    modified = models.DateTimeField(db_index=True, default=timezone.now)
+
+    @classmethod
+    def get_or_create_timeline_for_user_with_id(cls, user_id):
+        timeline, created = cls.objects.get_or_create(owner_id=user_id)
+        return timeline
+
+    @classmethod
+    def invalidate_timelines_for_users_with_ids(cls, users_ids):
+        cls.objects.filter(owner_id__in=users_ids).update(status=cls.STATUS_COLD, min_post_id=None,
+                                                           modified=timezone.now())
+        TimelinePost.objects.filter(owner_id__in=users_ids).delete()
+
+    @classmethod
+    def add_post_to_timelines_for_users_with_ids(cls, post_id, users_ids):
+        """
+        Adds the post to the timelines of the given users that are ready or being rebuilt
+        """
+        live_timelines_owners_ids = cls.objects.filter(owner_id__in=users_ids,
+                                                       status__in=[cls.STATUS_READY, cls.STATUS_BUILDING]). \
+            values_list('owner_id', flat=True)
+
+        timeline_posts = [TimelinePost(owner_id=owner_id, post_id=post_id) for owner_id in
+                          live_timelines_owners_ids.iterator()]
+
+        TimelinePost.bulk_create_timeline_posts(timeline_posts)
+
+        return len(timeline_posts)
+
+    @classmethod
+    def remove_posts_of_creator_with_id_from_timeline_for_user_with_id(cls, creator_id, user_id,
+                                                                        only_circles_posts=False):
+        timeline_posts_query = Q(owner_id=user_id, post__creator_id=creator_id)
+
+        if only_circles_posts:
+            timeline_posts_query.add(Q(post__community__isnull=True), Q.AND)
+
+        TimelinePost.objects.filter(timeline_posts_query).delete()
+
+    @classmethod
+    def remove_posts_of_community_with_id_from_timeline_for_user_with_id(cls, community_id, user_id):
+        TimelinePost.objects.filter(owner_id=user_id, post__community_id=community_id).delete()
+
+    def is_ready(self):
+        return self.status == Timeline.STATUS_READY
+
+    def is_cold(self):
+        return self.status == Timeline.STATUS_COLD
+
+    def is_stale_build(self):
+        return self.status == Timeline.STATUS_BUILDING and \
+               self.modified < timezone.now() - timedelta(minutes=settings.TIMELINE_BUILD_TIMEOUT_IN_MINUTES)
+
+    def can_serve_posts_with_max_id(self, max_id=None):
+        if not self.is_ready():
+            return False
+
+        if max_id and self.min_post_id and max_id <= self.min_post_id:
+            # Older than what the capped timeline holds
+            return False
+
+        return True
+
+    def mark_as_building(self):
+        """
+        Marks the timeline as building if it's cold or its build went stale, returns whether it did.
+        Parallel requests of a cold timeline race for it, so only one of them enqueues a rebuild.
+        """
+        stale_build_modified = timezone.now() - timedelta(minutes=settings.TIMELINE_BUILD_TIMEOUT_IN_MINUTES)
+
+        return self._mark_as_building_if(
+            Q(status=Timeline.STATUS_COLD) | Q(status=Timeline.STATUS_BUILDING, modified__lt=stale_build_modified))
+
+    def mark_as_rebuilding(self):
+        """
+        Marks the timeline as building unless it's ready, returns whether it did, e.g. as its rebuild job starts
+        """
+        return self._mark_as_building_if(~Q(status=Timeline.STATUS_READY))
+
+    def _mark_as_building_if(self, timeline_query):
+        modified = timezone.now()
+
+        marked = Timeline.objects.filter(Q(pk=self.pk) & timeline_query).update(status=Timeline.STATUS_BUILDING,
+                                                                                 modified=modified) == 1
+
+        if marked:
+            self.status = Timeline.STATUS_BUILDING
+            self.modified = modified
+
+        return marked
+
+    def mark_as_ready(self, min_post_id=None):
+        # If invalidated while building, it stays cold
+        Timeline.objects.filter(pk=self.pk, status=Timeline.STATUS_BUILDING).update(status=Timeline.STATUS_READY,
+                                                                                     min_post_id=min_post_id,
+                                                                                     modified=timezone.now())
+
+    def save(self, *args, **kwargs):
+        ''' On save, update timestamps '''
+        self.modified = timezone.now()
+        return super(Timeline, self).save(*args, **kwargs)
+
+
+class TimelinePost(models.Model):
+    """
+    A post fanned out on write to the materialized timeline of a user.
+    The (owner, post) unique index makes every timeline page a key range read.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_posts')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+
+    BULK_CREATE_BATCH_SIZE = 1000
+
+    class Meta:
+        unique_together = ('owner', 'post',)
+
+    @classmethod
+    def bulk_create_timeline_posts(cls, timeline_posts):
+        """
+        Creates the timeline posts skipping the ones already in their timeline.
+        Django 2.2 doesn't cap a given batch size to what the database allows (e.g. SQLite), so it's capped here.
+        """
+        fields = [cls._meta.get_field('owner'), cls._meta.get_field('post')]
+        database_batch_size = connections[cls.objects.db].ops.bulk_batch_size(fields, timeline_posts)
+        batch_size = max(min(cls.BULK_CREATE_BATCH_SIZE, database_batch_size), 1)
+
+        cls.objects.bulk_create(timeline_posts, batch_size=batch_size, ignore_conflicts=True)
+
+
+class PostsCurationWatermark(models.Model):
+    """
+    The time up to which the activity of posts was already taken into account by a curation job
+    """
+    CURATION_TYPE_TOP_POSTS = 'TP'
+    CURATION_TYPES = (
+        (CURATION_TYPE_TOP_POSTS, 'Top posts'),
+    )
+    curation_type = models.CharField(choices=CURATION_TYPES, max_length=2, unique=True)
+    watermark = models.DateTimeField()
+
+    @classmethod
+    def get_watermark_for_curation_type(cls, curation_type):
+        posts_curation_watermark = cls.objects.filter(curation_type=curation_type).first()
+        if not posts_curation_watermark:
+            return None
+        return posts_curation_watermark.watermark
+
+    @classmethod
+    def set_watermark_for_curation_type(cls, curation_type, watermark):
+        cls.objects.update_or_create(curation_type=curation_type, defaults={'watermark': watermark})
+
+
 class TopPostCommunityExclusion(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='top_posts_community_exclusions')
     community = models.ForeignKey('openbook_communities.Community', on_delete=models.CASCADE,
@@ -979,6 +1582,8 @@ class PostVideo(models.Model):
 
 
 class PostComment(models.Model):
+    _saved_text = _UNSAVED_TEXT
+
     moderated_object = GenericRelation(ModeratedObject, related_query_name='post_comments')
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     parent_comment = models.ForeignKey('self', on_delete=models.CASCADE, related_name='replies', null=True, blank=True)
@@ -996,11 +1601,73 @@ class PostComment(models.Model):
     def create_comment(cls, text, commenter, post, parent_comment=None):
         post_comment = PostComment.objects.create(text=text, commenter=commenter, post=post,
                                                   parent_comment=parent_comment)
-        post_comment.language = get_language_for_text(text)
+        post_comment._process_post_comment_language()
         post_comment.save()
 
+        PostCounter.increment_comments_count_for_post_with_id(post_id=post.pk)
+
+        if post.community_id:
+            TrendingPostScore.add_activity_to_post_with_id(post_id=post.pk, activity_created=post_comment.created)
+
         return post_comment
 
+    @classmethod
+    def get_ids_of_users_that_can_see_post_comment(cls, post_comment, users_ids):
+        """
+        Returns the ids of the given users that can see the post comment, as User.can_see_post_comment would
+        for each one but resolved with a single users query on top of the post one.
+        :return:
+        """
+        post = post_comment.post
+        users_ids = Post.get_ids_of_users_that_can_see_post(post=post, users_ids=users_ids)
+
+        if not users_ids or post_comment.is_deleted:
+            return set()
+
+        users = User.objects.filter(pk__in=users_ids).annotate(
+            has_reported_post_comment=_make_user_has_reported_object_exists(
+                object_type=ModeratedObject.OBJECT_TYPE_POST_COMMENT, object_id=post_comment.pk),
+            is_blocked_with_commenter=_make_user_is_blocked_with_user_exists(user_id=post_comment.commenter_id))
+
+        visible_users_ids = set()
+
+        if post.community_id:
+            CommunityMembership = get_community_membership_model()
+            community_staff_query = Q(community_id=post.community_id) & Q(
+                Q(is_administrator=True) | Q(is_moderator=True))
+
+            post_comment_is_approved = ModeratedObject.objects.filter(
+                object_type=ModeratedObject.OBJECT_TYPE_POST_COMMENT, object_id=post_comment.pk,
+                status=ModeratedObject.STATUS_APPROVED).exists()
+            commenter_is_staff = CommunityMembership.objects.filter(
+                community_staff_query & Q(user_id=post_comment.commenter_id)).exists()
+
+            users = users.annotate(is_community_staff=Exists(CommunityMembership.objects.filter(
+                community_staff_query & Q(user_id=OuterRef('pk')))))
+
+            for user in users.values('pk', 'has_reported_post_comment', 'is_blocked_with_commenter',
+                                     'is_community_staff'):
+                if user['has_reported_post_comment']:
+                    continue
+
+                if not user['is_community_staff']:
+                    if post_comment_is_approved:
+                        continue
+
+                    # Comments of blocked users are only seen if they're staff members
+                    if user['is_blocked_with_commenter'] and not commenter_is_staff:
+                        continue
+
+                visible_users_ids.add(user['pk'])
+        else:
+            for user in users.values('pk', 'has_reported_post_comment', 'is_blocked_with_commenter'):
+                if user['has_reported_post_comment'] or user['is_blocked_with_commenter']:
+                    continue
+
+                visible_users_ids.add(user['pk'])
+
+        return visible_users_ids
+
     @classmethod
     def count_comments_for_post_with_id(cls, post_id):
         count_query = Q(post_id=post_id, parent_comment__isnull=True, is_deleted=False)
@@ -1016,15 +1683,38 @@ class PostComment(models.Model):
         return self.replies.count()
 
     def count_replies_with_user(self, user):
-        # Count replies excluding users blocked by authenticated user
+        count_query = self._make_count_comments_with_user_query(community=self.post.community, user=user)
+        return self.replies.filter(count_query).count()
+
+    @classmethod
+    def get_replies_counts_for_post_comments_with_ids_with_user(cls, post, post_comments_ids, user):
+        count_query = cls._make_count_comments_with_user_query(community=post.community, user=user)
+        count_query.add(Q(parent_comment_id__in=post_comments_ids), Q.AND)
+
+        replies_counts = cls.objects.filter(count_query).values('parent_comment_id').annotate(
+            count=Count('id')).order_by()
+
+        post_comments_replies_counts = {post_comment_id: 0 for post_comment_id in post_comments_ids}
+
+        for replies_count in replies_counts:
+            post_comments_replies_counts[replies_count['parent_comment_id']] = replies_count['count']
+
+        return post_comments_replies_counts
+
+    @classmethod
+    def _make_count_comments_with_user_query(cls, community, user):
+        """
+        The comments of a post of the given community (or None) that the user gets counted
+        """
+        # Count comments excluding users blocked by authenticated user
         count_query = ~Q(Q(commenter__blocked_by_users__blocker_id=user.pk) | Q(
             commenter__user_blocks__blocked_user_id=user.pk))
 
-        if self.post.community:
-            if not user.is_staff_of_community_with_name(community_name=self.post.community.name):
+        if community:
+            if not user.is_staff_of_community_with_name(community_name=community.name):
                 # Dont retrieve comments except from staff members
                 blocked_users_query_staff_members = Q(
-                    commenter__communities_memberships__community_id=self.post.community.pk)
+                    commenter__communities_memberships__community_id=community.pk)
                 blocked_users_query_staff_members.add(Q(commenter__communities_memberships__is_administrator=True) | Q(
                     commenter__communities_memberships__is_moderator=True), Q.AND)
 
@@ -1040,14 +1730,10 @@ class PostComment(models.Model):
         # Dont count items we have reported
         count_query.add(~Q(moderated_object__reports__reporter_id=user.pk), Q.AND)
 
-        return self.replies.filter(count_query).count()
+        return count_query
 
     def reply_to_comment(self, commenter, text):
-        post_comment = PostComment.create_comment(text=text, commenter=commenter, post=self.post, parent_comment=self)
-        post_comment.language = get_language_for_text(text)
-        post_comment.save()
-
-        return post_comment
+        return PostComment.create_comment(text=text, commenter=commenter, post=self.post, parent_comment=self)
 
     def react(self, reactor, emoji_id):
         return PostCommentReaction.create_reaction(reactor=reactor, emoji_id=emoji_id, post_comment=self)
@@ -1061,99 +1747,119 @@ class PostComment(models.Model):
 
         self.full_clean(exclude=['language'])
 
+        has_text_changed = self._has_text_changed()
+
         post_comment = super(PostComment, self).save(*args, **kwargs)
 
-        self._process_post_comment_mentions()
-        self._process_post_comment_hashtags()
+        if has_text_changed:
+            self._process_post_comment_mentions()
+            self._process_post_comment_hashtags()
+            self._saved_text = self.text
 
         return post_comment
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post_comment = super(PostComment, cls).from_db(db, field_names, values)
+        # The text as saved, to only process its mentions and hashtags again when it changes
+        post_comment._saved_text = post_comment.__dict__.get('text', _UNSAVED_TEXT)
+        return post_comment
+
+    def _has_text_changed(self):
+        # A deferred text that wasn't loaded nor set didn't change
+        return 'text' in self.__dict__ and self.text != self._saved_text
+
+    def delete(self, *args, **kwargs):
+        super(PostComment, self).delete(*args, **kwargs)
+        PostCounter.rebuild_comments_count_for_post_with_id(post_id=self.post_id)
+        TrendingPostScore.remove_activity_from_post_with_id(post_id=self.post_id, activity_created=self.created)
+
     def _process_post_comment_mentions(self):
-        usernames = extract_usernames_from_string(string=self.text)
+        usernames = set(username.lower() for username in extract_usernames_from_string(string=self.text))
+
+        existing_mentions = list(self.user_mentions.values_list('id', 'user__username'))
+
+        removed_mentions_ids = [mention_id for mention_id, username in existing_mentions if
+                                username.lower() not in usernames]
+
+        if removed_mentions_ids:
+            self.user_mentions.filter(pk__in=removed_mentions_ids).delete()
+
+        existing_mention_usernames = set(username.lower() for mention_id, username in existing_mentions)
+
+        mentioned_users = _get_users_with_usernames(usernames=[username for username in usernames if
+                                                              username not in existing_mention_usernames])
+
+        if not mentioned_users:
+            return
+
+        mentioned_users_ids = [user.pk for user in mentioned_users]
+
+        users_ids_that_can_see_post_comment = PostComment.get_ids_of_users_that_can_see_post_comment(
+            post_comment=self, users_ids=mentioned_users_ids)
 
-        if not usernames:
-            self.user_mentions.all().delete()
+        if self.parent_comment_id:
+            # Its a reply to a comment, if the user previously replied to the comment
+            # or if he's the creator of the parent comment he will already be alerted of the reply,
+            # no need for mention
+            already_alerted_users_ids = set(self.parent_comment.replies.filter(
+                commenter_id__in=mentioned_users_ids).values_list('commenter_id', flat=True))
+            already_alerted_users_ids.add(self.parent_comment.commenter_id)
         else:
-            existing_mention_usernames = []
-            for existing_mention in self.user_mentions.only('id', 'user__username').all().iterator():
-                existing_mention_username = existing_mention.user.username.lower()
-                if existing_mention_username not in usernames:
-                    existing_mention.delete()
-                else:
-                    existing_mention_usernames.append(existing_mention_username)
-
-            PostCommentUserMention = get_post_comment_user_mention_model()
-            User = get_user_model()
-
-            for username in usernames:
-                username = username.lower()
-                if username not in existing_mention_usernames:
-                    try:
-                        user = User.objects.only('id', 'username').get(username__iexact=username)
-                        user_can_see_post_comment = user.can_see_post_comment(post_comment=self)
-                        user_is_commenter = user.pk == self.commenter_id
-
-                        if not user_can_see_post_comment or user_is_commenter:
-                            continue
-
-                        if self.parent_comment:
-                            user_is_parent_comment_creator = self.parent_comment.commenter_id == user.pk
-                            user_has_replied_before = self.parent_comment.replies.filter(commenter_id=user.pk).exists()
-
-                            if user_has_replied_before or user_is_parent_comment_creator:
-                                # Its a reply to a comment, if the user previously replied to the comment
-                                # or if he's the creator of the parent comment he will already be alerted of the reply,
-                                # no need for mention
-                                continue
-                        else:
-                            user_has_commented_before = self.post.comments.filter(commenter_id=user.pk).exists()
-                            if user_has_commented_before:
-                                # Its a comment to a post, if the user previously commented on the post
-                                # he will already be alerted of the comment, no need for mention
-                                continue
-
-                        PostCommentUserMention.create_post_comment_user_mention(user=user, post_comment=self)
-                        existing_mention_usernames.append(username)
-                    except User.DoesNotExist:
-                        pass
+            # Its a comment to a post, if the user previously commented on the post
+            # he will already be alerted of the comment, no need for mention
+            already_alerted_users_ids = set(self.post.comments.filter(
+                commenter_id__in=mentioned_users_ids).values_list('commenter_id', flat=True))
+
+        PostCommentUserMention = get_post_comment_user_mention_model()
+
+        PostCommentUserMention.bulk_create_post_comment_user_mentions(
+            users_ids=[user_id for user_id in mentioned_users_ids if
+                       user_id in users_ids_that_can_see_post_comment and user_id != self.commenter_id and
+                       user_id not in already_alerted_users_ids],
+            post_comment=self)
 
     def _process_post_comment_hashtags(self):
-        if not self.text:
-            self.hashtags.all().delete()
-        else:
-            hashtags = extract_hashtags_from_string(string=self.text)
-            if not hashtags:
-                self.hashtags.all().delete()
-            else:
-                existing_hashtags = []
-                for existing_hashtag in self.hashtags.only('id', 'name').all().iterator():
-                    if existing_hashtag.name not in hashtags:
-                        self.hashtags.remove(existing_hashtag)
-                    else:
-                        existing_hashtags.append(existing_hashtag.name)
+        hashtags_names = set(hashtag.lower() for hashtag in extract_hashtags_from_string(string=self.text or ''))
+
+        existing_hashtags = list(self.hashtags.only('id', 'name'))
+
+        removed_hashtags = [hashtag for hashtag in existing_hashtags if hashtag.name not in hashtags_names]
 
-                Hashtag = get_hashtag_model()
+        if removed_hashtags:
+            self.hashtags.remove(*removed_hashtags)
 
-                for hashtag in hashtags:
-                    hashtag = hashtag.lower()
-                    if hashtag not in existing_hashtags:
-                        hashtag_obj = Hashtag.get_or_create_hashtag(name=hashtag)
-                        self.hashtags.add(hashtag_obj)
+        existing_hashtags_names = set(hashtag.name for hashtag in existing_hashtags)
+        new_hashtags_names = hashtags_names - existing_hashtags_names
+
+        if new_hashtags_names:
+            Hashtag = get_hashtag_model()
+            self.hashtags.add(*Hashtag.get_or_create_hashtags_with_names(names=new_hashtags_names))
 
     def update_comment(self, text):
         self.text = text
         self.is_edited = True
-        self.language = get_language_for_text(text)
+        self._process_post_comment_language()
         self.save()
 
+    def _process_post_comment_language(self):
+        if settings.LANGUAGE_DETECTION_IN_BACKGROUND:
+            # The language is detected in the background, saving the comment doesn't wait on it
+            post_comment_id = self.pk
+            transaction.on_commit(lambda: detect_post_comment_language.delay(post_comment_id=post_comment_id))
+        else:
+            self.language = get_language_for_text(self.text)
+
     def soft_delete(self):
         self.is_deleted = True
         self.delete_notifications()
         self.save()
+        PostCounter.rebuild_comments_count_for_post_with_id(post_id=self.post_id)
 
     def unsoft_delete(self):
         self.is_deleted = False
         self.save()
+        PostCounter.rebuild_comments_count_for_post_with_id(post_id=self.post_id)
 
     def delete_notifications(self):
         # Delete all post comment notifications
@@ -1209,7 +1915,7 @@ class PostComment(models.Model):
 
 class PostReaction(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='reactions')
-    created = models.DateTimeField(editable=False)
+    created = models.DateTimeField(editable=False, db_index=True)
     reactor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='post_reactions')
     emoji = models.ForeignKey(Emoji, on_delete=models.CASCADE, related_name='post_reactions')
 
@@ -1218,7 +1924,15 @@ class PostReaction(models.Model):
 
     @classmethod
     def create_reaction(cls, reactor, emoji_id, post):
-        return PostReaction.objects.create(reactor=reactor, emoji_id=emoji_id, post=post)
+        post_reaction = PostReaction.objects.create(reactor=reactor, emoji_id=emoji_id, post=post)
+
+        PostCounter.increment_reactions_count_for_post_with_id(post_id=post.pk, emoji_id=emoji_id)
+
+        if post.community_id:
+            TrendingPostScore.add_activity_to_post_with_id(post_id=post.pk, activity_created=post_reaction.created,
+                                                           is_reaction=True)
+
+        return post_reaction
 
     @classmethod
     def count_reactions_for_post_with_id(cls, post_id, reactor_id=None):
@@ -1231,9 +1945,24 @@ class PostReaction(models.Model):
 
     def save(self, *args, **kwargs):
         ''' On save, update timestamps '''
-        if not self.id:
+        is_new_reaction = not self.id
+
+        if is_new_reaction:
             self.created = timezone.now()
-        return super(PostReaction, self).save(*args, **kwargs)
+
+        post_reaction = super(PostReaction, self).save(*args, **kwargs)
+
+        if not is_new_reaction:
+            # The emoji of the reaction might have changed
+            PostCounter.rebuild_reactions_counts_for_post_with_id(post_id=self.post_id)
+
+        return post_reaction
+
+    def delete(self, *args, **kwargs):
+        super(PostReaction, self).delete(*args, **kwargs)
+        PostCounter.rebuild_reactions_counts_for_post_with_id(post_id=self.post_id)
+        TrendingPostScore.remove_activity_from_post_with_id(post_id=self.post_id, activity_created=self.created,
+                                                            is_reaction=True)
 
 
 class PostCommentReaction(models.Model):
@@ -1300,12 +2029,7 @@ class PostLink(models.Model):
         return cls.objects.create(link=link, post_id=post_id)
 
     def refresh_has_preview(self):
-        try:
-            self.has_preview = peekalink_client.is_peekable(self.link)
-        except Exception as e:
-            # We dont care whether it succeeded or not
-            self.has_preview = False
-
+        self.has_preview = is_link_previewable(self.link)
         self.save()
 
 class PostUserMention(models.Model):
@@ -1324,6 +2048,26 @@ class PostUserMention(models.Model):
         send_post_user_mention_push_notification(post_user_mention=post_user_mention)
         return post_user_mention
 
+    @classmethod
+    def bulk_create_post_user_mentions(cls, users_ids, post):
+        """
+        Creates the mentions of several users in the post and their notifications with one insert per table
+        """
+        cls.objects.bulk_create([cls(user_id=user_id, post_id=post.pk) for user_id in users_ids])
+
+        # Not every database returns the ids of bulk created rows, they're read back instead
+        post_user_mentions = list(cls.objects.select_related('user', 'post__creator__profile').filter(
+            post_id=post.pk, user_id__in=users_ids))
+
+        PostUserMentionNotification = get_post_user_mention_notification_model()
+        PostUserMentionNotification.bulk_create_post_user_mention_notifications(
+            post_user_mentions=post_user_mentions)
+
+        for post_user_mention in post_user_mentions:
+            send_post_user_mention_push_notification(post_user_mention=post_user_mention)
+
+        return post_user_mentions
+
 
 class PostCommentUserMention(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='post_comment_mentions')
@@ -1341,3 +2085,69 @@ class PostCommentUserMention(models.Model):
             owner_id=user.pk)
         send_post_comment_user_mention_push_notification(post_comment_user_mention=post_comment_user_mention)
         return post_comment_user_mention
+
+    @classmethod
+    def bulk_create_post_comment_user_mentions(cls, users_ids, post_comment):
+        """
+        Creates the mentions of several users in the post comment and their notifications with one insert per table
+        """
+        cls.objects.bulk_create([cls(user_id=user_id, post_comment_id=post_comment.pk) for user_id in users_ids])
+
+        # Not every database returns the ids of bulk created rows, they're read back instead
+        post_comment_user_mentions = list(
+            cls.objects.select_related('user', 'post_comment__commenter__profile', 'post_comment__post').filter(
+                post_comment_id=post_comment.pk, user_id__in=users_ids))
+
+        PostCommentUserMentionNotification = get_post_comment_user_mention_notification_model()
+        PostCommentUserMentionNotification.bulk_create_post_comment_user_mention_notifications(
+            post_comment_user_mentions=post_comment_user_mentions)
+
+        for post_comment_user_mention in post_comment_user_mentions:
+            send_post_comment_user_mention_push_notification(post_comment_user_mention=post_comment_user_mention)
+
+        return post_comment_user_mentions
+
+
+def _make_user_has_reported_object_exists(object_type, object_id):
+    ModerationReport = get_moderation_report_model()
+    return Exists(ModerationReport.objects.filter(reporter_id=OuterRef('pk'),
+                                                  moderated_object__object_type=object_type,
+                                                  moderated_object__object_id=object_id))
+
+
+def _make_user_is_blocked_with_user_exists(user_id):
+    UserBlock = get_user_block_model()
+    return Exists(UserBlock.objects.filter(Q(blocker_id=OuterRef('pk'), blocked_user_id=user_id) | Q(
+        blocker_id=user_id, blocked_user_id=OuterRef('pk'))))
+
+
+def _delete_in_chunks(queryset):
+    """
+    Deletes the objects of the queryset a chunk of ids at a time, so deleting many of them along with their
+    related objects doesn't hold the tables locked for long
+    """
+    chunk_size = settings.POST_SOFT_DELETE_NOTIFICATIONS_CHUNK_SIZE
+
+    while True:
+        ids = list(queryset.values_list('id', flat=True)[:chunk_size])
+
+        if not ids:
+            return
+
+        queryset.model.objects.filter(pk__in=ids).delete()
+
+        if len(ids) < chunk_size:
+            return
+
+
+def _get_users_with_usernames(usernames):
+    if not usernames:
+        return []
+
+    usernames_query = Q()
+
+    for username in set(username.lower() for username in usernames):
+        usernames_query.add(Q(username__iexact=username), Q.OR)
+
+    User = get_user_model()
+    return list(User.objects.only('id', 'username').filter(usernames_query))
@@ -40,12 +40,16 @@ def make_exclude_reported_and_approved_posts_query():
     return ~Q(moderated_object__status=ModeratedObject.STATUS_APPROVED)
 
 
-def make_exclude_reported_posts_by_user_with_id_query(user_id):
-    return ~Q(moderated_object__reports__reporter_id=user_id)
+def make_exclude_posts_with_ids_query(posts_ids, post_field=None):
+    if not posts_ids:
+        return Q()
+    return ~Q(**{_make_post_lookup('id__in', post_field=post_field): posts_ids})
 
 
-def make_exclude_community_posts_banned_from_for_user_with_id_query(user_id):
-    return ~Q(community__banned_users__id=user_id)
+def make_exclude_posts_of_communities_with_ids_query(communities_ids, post_field=None):
+    if not communities_ids:
+        return Q()
+    return ~Q(**{_make_post_lookup('community_id__in', post_field=post_field): communities_ids})
 
 
 def make_exclude_closed_posts_in_community_for_user_with_id_query(user_id):
@@ -82,9 +86,27 @@ def make_exclude_community_posts_query():
     return Q(community__isnull=True)
 
 
-def make_exclude_blocked_posts_for_user_with_id_query(user_id):
-    return ~Q(Q(creator__blocked_by_users__blocker_id=user_id) | Q(
-        creator__user_blocks__blocked_user_id=user_id))
+def make_exclude_posts_of_users_with_ids_query(users_ids, post_field=None):
+    if not users_ids:
+        return Q()
+    return ~Q(**{_make_post_lookup('creator_id__in', post_field=post_field): users_ids})
+
+
+def make_exclude_posts_hidden_by_visibility_exclusions_query(visibility_exclusions, post_field=None):
+    """
+    Excludes the posts of the users blocked with, the reported posts and the posts of the communities banned from,
+    given the visibility exclusions of a user. post_field is the post relation when querying another model.
+    """
+    posts_query = make_exclude_posts_of_users_with_ids_query(visibility_exclusions['blocked_users_ids'],
+                                                             post_field=post_field)
+
+    posts_query.add(make_exclude_posts_with_ids_query(visibility_exclusions['reported_posts_ids'],
+                                                      post_field=post_field), Q.AND)
+
+    posts_query.add(make_exclude_posts_of_communities_with_ids_query(visibility_exclusions['banned_communities_ids'],
+                                                                     post_field=post_field), Q.AND)
+
+    return posts_query
 
 
 def make_only_public_community_posts_query():
@@ -102,7 +124,7 @@ def make_only_public_posts_query():
     return make_only_public_community_posts_query() | make_only_world_circle_posts_query()
 
 
-def make_get_hashtag_posts_for_user_with_id_query(hashtag, user_id):
+def make_get_hashtag_posts_for_user_query(hashtag, user):
     # Retrieve posts with the given hashtag
     hashtag_posts_query = make_only_posts_with_hashtag_with_id_query(hashtag_id=hashtag.pk)
 
@@ -112,20 +134,15 @@ def make_get_hashtag_posts_for_user_with_id_query(hashtag, user_id):
     # Dont retrieve soft deleted posts
     hashtag_posts_query.add(make_exclude_soft_deleted_posts_query(), Q.AND)
 
-    # Dont retrieve posts from blocked people
-    hashtag_posts_query.add(make_exclude_blocked_posts_for_user_with_id_query(user_id=user_id), Q.AND)
-
     # Only retrieve published posts
     hashtag_posts_query.add(make_only_published_posts_query(), Q.AND)
 
     # Don't retrieve items that have been reported and approved
     hashtag_posts_query.add(make_exclude_reported_and_approved_posts_query(), Q.AND)
 
-    # Dont retrieve items we have reported
-    hashtag_posts_query.add(make_exclude_reported_posts_by_user_with_id_query(user_id=user_id), Q.AND)
-
-    # Dont retrieve posts from communities we're  banned from
-    hashtag_posts_query.add(make_exclude_community_posts_banned_from_for_user_with_id_query(user_id=user_id), Q.AND)
+    # Dont retrieve posts from blocked people, items we have reported or posts from communities we're banned from
+    hashtag_posts_query.add(make_exclude_posts_hidden_by_visibility_exclusions_query(
+        visibility_exclusions=user.get_visibility_exclusions()), Q.AND)
 
     # Dont retrieve closed posts
     hashtag_posts_query.add(make_exclude_closed_posts_query(), Q.AND)
@@ -142,3 +159,9 @@ def make_circles_posts_query_for_user(user):
 
 def make_community_posts_query_for_user(user):
     return make_only_visible_community_posts_for_user_with_id_query(user_id=user.pk)
+
+
+def _make_post_lookup(lookup, post_field=None):
+    if post_field:
+        return '%s__%s' % (post_field, lookup)
+    return lookup
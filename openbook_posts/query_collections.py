@@ -3,7 +3,8 @@ from django.db.models import Q
 from openbook_common.utils.model_loaders import get_post_model, get_moderated_object_model
 from openbook_posts.queries import \
     make_community_posts_query_for_user, make_only_posts_with_max_id, \
-    make_only_posts_with_min_id, make_circles_posts_query_for_user
+    make_only_posts_with_min_id, make_circles_posts_query_for_user, \
+    make_exclude_posts_hidden_by_visibility_exclusions_query
 
 
 def get_posts_for_user_collection(target_user, source_user, posts_only=None, posts_prefetch_related=None,
@@ -57,15 +58,12 @@ def get_posts_for_user_collection(target_user, source_user, posts_only=None, pos
     posts_visibility_exclude_query = Q(
         # Excluded communities posts
         Q(community__profile_posts_community_exclusions__user=target_user.pk) |
-        # Reported posts
-        Q(moderated_object__reports__reporter_id=source_user.pk) |
         # Approved reported posts
-        Q(moderated_object__status=ModeratedObject.STATUS_APPROVED) |
-        # Posts of users we blocked or that have blocked us
-        Q(creator__blocked_by_users__blocker_id=source_user.pk) | Q(
-            creator__user_blocks__blocked_user_id=source_user.pk) |
-        # Posts of communities banned from
-        Q(community__banned_users__id=source_user.pk)
+        Q(moderated_object__status=ModeratedObject.STATUS_APPROVED)
     )
 
+    # Reported posts, posts of users we blocked or that have blocked us and posts of communities banned from
+    query.add(make_exclude_posts_hidden_by_visibility_exclusions_query(
+        visibility_exclusions=source_user.get_visibility_exclusions()), Q.AND)
+
     return posts_collection_manager.filter(query).exclude(posts_visibility_exclude_query).distinct()
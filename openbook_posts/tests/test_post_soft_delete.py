@@ -0,0 +1,88 @@
+from django.test import override_settings
+
+from openbook_common.tests.helpers import make_user, make_fake_post_text, make_fake_post_comment_text
+from openbook_common.tests.models import OpenbookAPITestCase
+from openbook_notifications.models import PostCommentNotification, PostCommentReplyNotification
+from openbook_posts.jobs import soft_delete_post_comments, unsoft_delete_post_comments
+from openbook_posts.models import PostComment, PostCounter
+
+
+class PostSoftDeleteTests(OpenbookAPITestCase):
+    """
+    Post.soft_delete and Post.unsoft_delete
+    """
+
+    def test_soft_deletes_comments_and_replies(self):
+        """
+        should soft delete all the comments and replies of the post and their notifications
+        """
+        post, post_comments_ids = self._make_commented_post()
+
+        post.soft_delete()
+
+        self.assertFalse(PostComment.objects.filter(pk__in=post_comments_ids, is_deleted=False).exists())
+        self.assertFalse(PostCommentNotification.objects.filter(post_comment__post_id=post.pk).exists())
+        self.assertFalse(PostCommentReplyNotification.objects.filter(post_comment__post_id=post.pk).exists())
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).comments_count, 0)
+
+    def test_unsoft_deletes_comments_and_replies(self):
+        """
+        should restore all the comments and replies of the post
+        """
+        post, post_comments_ids = self._make_commented_post()
+
+        post.soft_delete()
+        post.unsoft_delete()
+
+        self.assertFalse(PostComment.objects.filter(pk__in=post_comments_ids, is_deleted=True).exists())
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).comments_count, len(post_comments_ids))
+
+    @override_settings(POST_SOFT_DELETE_IN_BACKGROUND_MIN_COMMENTS_COUNT=2)
+    def test_soft_deletes_comments_of_big_posts_in_background(self):
+        """
+        should hide a post with many comments right away and soft delete its comments in the background
+        """
+        post, post_comments_ids = self._make_commented_post()
+
+        post.soft_delete()
+
+        post.refresh_from_db()
+        self.assertTrue(post.is_deleted)
+        self.assertFalse(PostComment.objects.filter(pk__in=post_comments_ids, is_deleted=True).exists())
+
+        soft_delete_post_comments(post_id=post.pk)
+
+        self.assertFalse(PostComment.objects.filter(pk__in=post_comments_ids, is_deleted=False).exists())
+
+        post.unsoft_delete()
+        unsoft_delete_post_comments(post_id=post.pk)
+
+        self.assertFalse(PostComment.objects.filter(pk__in=post_comments_ids, is_deleted=True).exists())
+
+    @override_settings(POST_SOFT_DELETE_IN_BACKGROUND_MIN_COMMENTS_COUNT=2)
+    def test_does_not_soft_delete_comments_of_restored_post_in_background(self):
+        """
+        should not soft delete the comments of a post restored before the background job ran
+        """
+        post, post_comments_ids = self._make_commented_post()
+
+        post.soft_delete()
+        post.unsoft_delete()
+
+        soft_delete_post_comments(post_id=post.pk)
+
+        self.assertFalse(PostComment.objects.filter(pk__in=post_comments_ids, is_deleted=True).exists())
+
+    def _make_commented_post(self):
+        creator = make_user()
+        commenter = make_user()
+        replier = make_user()
+
+        post = creator.create_public_post(text=make_fake_post_text())
+
+        post_comment = commenter.comment_post(post=post, text=make_fake_post_comment_text())
+        other_post_comment = creator.comment_post(post=post, text=make_fake_post_comment_text())
+        post_comment_reply = replier.reply_to_comment_for_post(post_comment=post_comment, post=post,
+                                                               text=make_fake_post_comment_text())
+
+        return post, [post_comment.pk, other_post_comment.pk, post_comment_reply.pk]
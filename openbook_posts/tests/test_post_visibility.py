@@ -0,0 +1,107 @@
+from openbook_common.tests.helpers import make_user, make_community, make_circle, make_fake_post_text, \
+    make_fake_post_comment_text, make_moderation_category, make_private_community
+from openbook_common.tests.models import OpenbookAPITestCase
+from openbook_posts.models import Post, PostComment
+
+
+class PostVisibilityTests(OpenbookAPITestCase):
+    """
+    Post.get_ids_of_users_that_can_see_post and PostComment.get_ids_of_users_that_can_see_post_comment
+    """
+
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
+
+    def test_agrees_with_can_see_post_for_an_encircled_post(self):
+        """
+        should return the same users that can_see_post allows for an encircled post
+        """
+        creator = make_user()
+        circle = make_circle(creator=creator)
+
+        connected_user = make_user()
+        connected_user.connect_with_user_with_id(creator.pk)
+        creator.confirm_connection_with_user_with_id(connected_user.pk, circles_ids=[circle.pk])
+
+        pending_connection_user = make_user()
+        pending_connection_user.connect_with_user_with_id(creator.pk)
+
+        blocked_user = make_user()
+        blocked_user.connect_with_user_with_id(creator.pk)
+        creator.confirm_connection_with_user_with_id(blocked_user.pk, circles_ids=[circle.pk])
+
+        reporter = make_user()
+        reporter.connect_with_user_with_id(creator.pk)
+        creator.confirm_connection_with_user_with_id(reporter.pk, circles_ids=[circle.pk])
+
+        post = creator.create_encircled_post(text=make_fake_post_text(), circles_ids=[circle.pk])
+
+        creator.block_user_with_id(user_id=blocked_user.pk)
+        reporter.report_post(post=post, category_id=make_moderation_category().pk)
+
+        users = [creator, connected_user, pending_connection_user, blocked_user, reporter, make_user()]
+
+        self._assert_agrees_with_can_see_post(post=post, users=users)
+        self.assertEqual(Post.get_ids_of_users_that_can_see_post(post=post, users_ids=[user.pk for user in users]),
+                         {creator.pk, connected_user.pk})
+
+    def test_agrees_with_can_see_post_for_a_private_community_post(self):
+        """
+        should return the same users that can_see_post allows for a closed private community post
+        """
+        community_creator = make_user()
+        community = make_private_community(creator=community_creator)
+
+        member = make_user()
+        community_creator.invite_user_with_username_to_community_with_name(username=member.username,
+                                                                         community_name=community.name)
+        member.join_community_with_name(community_name=community.name)
+
+        moderator = make_user()
+        community_creator.invite_user_with_username_to_community_with_name(username=moderator.username,
+                                                                         community_name=community.name)
+        moderator.join_community_with_name(community_name=community.name)
+        community_creator.add_moderator_with_username_to_community_with_name(username=moderator.username,
+                                                                           community_name=community.name)
+
+        post = member.create_community_post(community_name=community.name, text=make_fake_post_text())
+        community_creator.close_post(post=post)
+
+        users = [community_creator, member, moderator, make_user()]
+
+        self._assert_agrees_with_can_see_post(post=post, users=users)
+
+    def test_agrees_with_can_see_post_comment_for_a_public_community_post(self):
+        """
+        should return the same users that can_see_post_comment allows for a public community post comment
+        """
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+
+        post = community_creator.create_community_post(community_name=community.name, text=make_fake_post_text())
+
+        commenter = make_user()
+        commenter.join_community_with_name(community_name=community.name)
+        post_comment = commenter.comment_post(post=post, text=make_fake_post_comment_text())
+
+        blocking_user = make_user()
+        blocking_user.block_user_with_id(user_id=commenter.pk)
+
+        reporter = make_user()
+        reporter.report_comment_for_post(post_comment=post_comment, post=post,
+                                        category_id=make_moderation_category().pk)
+
+        users = [community_creator, commenter, blocking_user, reporter, make_user()]
+
+        visible_users_ids = PostComment.get_ids_of_users_that_can_see_post_comment(
+            post_comment=post_comment, users_ids=[user.pk for user in users])
+
+        for user in users:
+            self.assertEqual(user.pk in visible_users_ids, user.can_see_post_comment(post_comment=post_comment))
+
+    def _assert_agrees_with_can_see_post(self, post, users):
+        visible_users_ids = Post.get_ids_of_users_that_can_see_post(post=post, users_ids=[user.pk for user in users])
+
+        for user in users:
+            self.assertEqual(user.pk in visible_users_ids, user.can_see_post(post=post))
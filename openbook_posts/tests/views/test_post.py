@@ -31,8 +31,11 @@ from openbook_common.utils.model_loaders import get_language_model, get_communit
 from openbook_communities.models import Community
 from openbook_hashtags.models import Hashtag
 from openbook_notifications.models import PostUserMentionNotification, Notification
+from openbook_posts.jobs import fan_out_post_notifications
 from openbook_posts.models import Post, PostUserMention, PostMedia
 from openbook_common.models import ProxyBlacklistedDomain
+from openbook_translation import translation_strategy
+from openbook_translation.translations import translate_texts
 
 logger = logging.getLogger(__name__)
 fake = Faker()
@@ -1807,6 +1810,8 @@ class PostCloseAPITests(OpenbookAPITestCase):
 
         post = community_post_creator.create_community_post(community.name, text=make_fake_post_text())
 
+        fan_out_post_notifications(post_id=post.pk)
+
         url = self._get_url(post)
         headers = make_authentication_headers_for_user(admin)
         # close post
@@ -1973,6 +1978,8 @@ class PostCloseAPITests(OpenbookAPITestCase):
 
         post = community_post_creator.create_community_post(community.name, text=make_fake_post_text())
 
+        fan_out_post_notifications(post_id=post.pk)
+
         url = self._get_url(post)
         headers = make_authentication_headers_for_user(admin)
         # close post
@@ -2203,6 +2210,49 @@ class TranslatePostAPITests(OpenbookAPITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_translates_post_text_once_for_all_readers(self):
+        """
+        should translate the post text once for all the users reading it in the same language
+        """
+        Language = get_language_model()
+        post_creator = make_user()
+        post = post_creator.create_public_post(text='Hallo %s' % fake.uuid4()[:8])
+        post.language = Language.objects.get(code='de')
+        post.save()
+
+        url = self._get_url(post=post)
+
+        with mock.patch.object(translation_strategy, 'translate_text',
+                               wraps=translation_strategy.translate_text) as mock_translate_text:
+            for i in range(0, 3):
+                user = make_user()
+                user.translation_language = Language.objects.get(code='en')
+                user.save()
+                headers = make_authentication_headers_for_user(user)
+
+                response = self.client.post(url, **headers)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(json.loads(response.content)['translated_text'], '[en] %s' % post.text)
+
+        self.assertEqual(mock_translate_text.call_count, 1)
+
+    def test_translates_uncached_texts_in_one_batch(self):
+        """
+        should translate the texts not translated before in a single batch
+        """
+        texts = ['Hallo %s' % fake.uuid4()[:8] for i in range(0, 4)]
+
+        translate_texts(texts=texts[:1], source_language_code='de', target_language_code='en')
+
+        translation_strategy.translated_texts_batches_sizes.clear()
+
+        translations = translate_texts(texts=texts, source_language_code='de', target_language_code='en')
+
+        self.assertEqual(translation_strategy.translated_texts_batches_sizes, [3])
+        self.assertEqual([translation['translated_text'] for translation in translations],
+                         ['[en] %s' % text for text in texts])
+
     def _get_url(self, post):
         return reverse('translate-post', kwargs={
             'post_uuid': post.uuid
@@ -12,12 +12,13 @@ import random
 
 from openbook_common.tests.helpers import make_authentication_headers_for_user, make_fake_post_text, \
     make_fake_post_comment_text, make_user, make_circle, make_community, make_private_community, \
-    make_moderation_category, get_test_usernames, make_hashtag_name, make_hashtag
+    make_moderation_category, get_test_usernames, make_hashtag_name, make_hashtag, make_emoji, \
+    make_reactions_emoji_group
 from openbook_hashtags.models import Hashtag
 from openbook_moderation.models import ModeratedObject
 from openbook_notifications.models import PostCommentNotification, PostCommentReplyNotification, \
     PostCommentUserMentionNotification, Notification
-from openbook_posts.models import PostComment, PostCommentUserMention, Post
+from openbook_posts.models import PostComment, PostCommentUserMention, Post, PostCounter
 
 logger = logging.getLogger(__name__)
 fake = Faker()
@@ -1803,6 +1804,47 @@ class PostCommentsAPITests(OpenbookAPITestCase):
         self.assertTrue(len(comments_after_min_id) == count_min)
         self.assertTrue(len(comments_before_max_id) == count_max)
 
+    def test_should_retrieve_first_replies_and_counts_of_every_comment(self):
+        """
+        should retrieve the count_replies first replies, the replies count and the reactions of every comment
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+        post = user.create_public_post(text=make_fake_post_text())
+
+        emoji = make_emoji(group=make_reactions_emoji_group())
+
+        amount_of_post_comments = 3
+        amount_of_replies = 3
+        count_replies = 2
+        post_comments_replies_ids = {}
+
+        for i in range(amount_of_post_comments):
+            post_comment = user.comment_post(post=post, text=make_fake_post_comment_text())
+            user.react_to_post_comment(post_comment=post_comment, emoji_id=emoji.pk)
+            post_comments_replies_ids[post_comment.pk] = [
+                user.reply_to_comment_for_post(post_comment=post_comment, post=post,
+                                               text=make_fake_post_comment_text()).pk for j in
+                range(amount_of_replies)]
+
+        url = self._get_url(post)
+        response = self.client.get(url, {
+            'count_replies': count_replies
+        }, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual(len(parsed_response), amount_of_post_comments)
+
+        for response_comment in parsed_response:
+            replies_ids = post_comments_replies_ids[response_comment['id']]
+            self.assertEqual(response_comment['replies_count'], amount_of_replies)
+            self.assertEqual([reply['id'] for reply in response_comment['replies']],
+                             sorted(replies_ids, reverse=True)[:count_replies])
+            self.assertEqual(response_comment['reactions_emoji_counts'][0]['emoji']['id'], emoji.pk)
+            self.assertEqual(response_comment['reactions_emoji_counts'][0]['count'], 1)
+
     def test_cannot_retrieve_comments_of_own_soft_deleted_post(self):
         """
         should not be able to retrieve the comments of a soft deleted post
@@ -2057,6 +2099,106 @@ class PostCommentsAPITests(OpenbookAPITestCase):
         for post_id in post_comments_ids:
             self.assertIn(post_id, response_post_comments_ids)
 
+    def test_commenting_increments_post_comments_counter(self):
+        """
+        should increment the post comments counter when commenting a post
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        number_of_post_comments = 3
+
+        for i in range(0, number_of_post_comments):
+            commenter = make_user()
+            commenter.comment_post(post=post, text=make_fake_post_comment_text())
+
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).comments_count, number_of_post_comments)
+
+    def test_deleting_comment_decrements_post_comments_counter(self):
+        """
+        should decrement the post comments counter when deleting a post comment
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        commenter = make_user()
+        post_comment = commenter.comment_post(post=post, text=make_fake_post_comment_text())
+        commenter.comment_post(post=post, text=make_fake_post_comment_text())
+
+        commenter.delete_comment_with_id_for_post_with_id(post_comment_id=post_comment.pk, post_id=post.pk)
+
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).comments_count, 1)
+
+    def test_soft_deleting_comment_decrements_post_comments_counter(self):
+        """
+        should decrement the post comments counter when soft deleting a post comment
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+
+        commenter = make_user()
+        post_comment = commenter.comment_post(post=post, text=make_fake_post_comment_text())
+
+        post_comment.soft_delete()
+
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).comments_count, 0)
+
+        post_comment.unsoft_delete()
+
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).comments_count, 1)
+
+    def test_approving_community_post_comment_decrements_post_comments_counter(self):
+        """
+        should decrement the post comments counter when a community post comment report is approved
+        """
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+
+        post_comment_creator = make_user()
+        post_comment_creator.join_community_with_name(community_name=community.name)
+
+        post = post_comment_creator.create_community_post(community_name=community.name,
+                                                          text=make_fake_post_text())
+        post_comment = post_comment_creator.comment_post(post=post, text=make_fake_post_comment_text())
+
+        report_category = make_moderation_category()
+        post_reporter = make_user()
+        post_reporter.report_comment_for_post(post=post, post_comment=post_comment,
+                                              category_id=report_category.pk)
+
+        moderated_object = ModeratedObject.get_or_create_moderated_object_for_post_comment(
+            post_comment=post_comment,
+            category_id=report_category.pk)
+        community_creator.approve_moderated_object(moderated_object=moderated_object)
+
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).comments_count, 0)
+
+    def test_comments_count_excludes_blocked_users_comments(self):
+        """
+        should not count the comments of blocked users in the post comments count
+        """
+        user = make_user()
+        post_creator = make_user()
+        post = post_creator.create_public_post(text=make_fake_post_text())
+
+        blocked_user = make_user()
+        blocked_user.comment_post(post=post, text=make_fake_post_comment_text())
+        post_creator.comment_post(post=post, text=make_fake_post_comment_text())
+
+        user.block_user_with_id(user_id=blocked_user.pk)
+
+        headers = make_authentication_headers_for_user(user)
+        url = reverse('post', kwargs={
+            'post_uuid': post.uuid,
+        })
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_post = json.loads(response.content)
+
+        self.assertEqual(response_post['comments_count'], 1)
+
     def _get_create_post_comment_request_data(self, post_comment_text):
         return {
             'text': post_comment_text
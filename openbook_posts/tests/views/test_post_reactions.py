@@ -10,7 +10,7 @@ from openbook_common.tests.helpers import make_authentication_headers_for_user,
     make_fake_post_comment_text, make_user, make_circle, make_emoji, make_emoji_group, make_reactions_emoji_group, \
     make_community
 from openbook_notifications.models import PostReactionNotification
-from openbook_posts.models import PostReaction
+from openbook_posts.models import PostReaction, PostCounter, PostReactionEmojiCount
 
 logger = logging.getLogger(__name__)
 fake = Faker()
@@ -846,6 +846,35 @@ class PostReactionsEmojiCountAPITests(OpenbookAPITestCase):
         self.assertEqual(response_emoji_id, emoji.pk)
         self.assertEqual(1, response_emoji_count)
 
+    def test_reacting_updates_post_reactions_counters(self):
+        """
+        should update the post reactions counters when reacting, changing the reaction emoji and deleting it
+        """
+        user = make_user()
+        post = user.create_public_post(text=make_fake_post_text())
+        emoji_group = make_reactions_emoji_group()
+
+        emoji = make_emoji(group=emoji_group)
+        other_emoji = make_emoji(group=emoji_group)
+
+        reactor = make_user()
+        post_reaction = reactor.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+        make_user().react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).reactions_count, 2)
+        self.assertEqual(PostReactionEmojiCount.objects.get(post_id=post.pk, emoji_id=emoji.pk).count, 2)
+
+        reactor.react_to_post_with_id(post_id=post.pk, emoji_id=other_emoji.pk)
+
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).reactions_count, 2)
+        self.assertEqual(PostReactionEmojiCount.objects.get(post_id=post.pk, emoji_id=emoji.pk).count, 1)
+        self.assertEqual(PostReactionEmojiCount.objects.get(post_id=post.pk, emoji_id=other_emoji.pk).count, 1)
+
+        reactor.delete_reaction_with_id_for_post_with_id(post_reaction_id=post_reaction.pk, post_id=post.pk)
+
+        self.assertEqual(PostCounter.objects.get(post_id=post.pk).reactions_count, 1)
+        self.assertFalse(PostReactionEmojiCount.objects.filter(post_id=post.pk, emoji_id=other_emoji.pk).exists())
+
     def _get_url(self, post):
         return reverse('post-reactions-emoji-count', kwargs={
             'post_uuid': post.uuid
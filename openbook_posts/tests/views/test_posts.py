@@ -6,7 +6,11 @@ from PIL import Image
 from django.conf import settings
 from django.core.files import File
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django_rq import get_worker
 from faker import Faker
 from rest_framework import status
@@ -28,14 +32,17 @@ from openbook_common.tests.helpers import make_user, make_users, make_fake_post_
     get_test_usernames, get_test_videos, get_test_image, make_global_moderator, \
     make_fake_post_comment_text, make_reactions_emoji_group, make_emoji, make_hashtag_name, make_hashtag, \
     get_test_valid_hashtags, get_test_invalid_hashtags, get_post_links
+from openbook_common.peekalink_client import peekalink_client
 from openbook_common.utils.helpers import sha256sum, normalize_url
 from openbook_communities.models import Community
 from openbook_hashtags.models import Hashtag
 from openbook_lists.models import List
 from openbook_moderation.models import ModeratedObject
 from openbook_notifications.models import PostUserMentionNotification, Notification, UserNewPostNotification
-from openbook_posts.jobs import curate_top_posts, curate_trending_posts
-from openbook_posts.models import Post, PostUserMention, PostMedia, TopPost, TrendingPost, PostLink
+from openbook_posts.jobs import curate_top_posts, curate_trending_posts, rebuild_timeline_for_user_with_id, \
+    fan_out_post_to_timelines, fan_out_post_notifications, refresh_post_links_previews, detect_post_language
+from openbook_posts.models import Post, PostUserMention, PostMedia, TopPost, TrendingPost, PostLink, Timeline, \
+    TimelinePost, PostsCurationWatermark, TrendingPostScore
 
 logger = logging.getLogger(__name__)
 fake = Faker()
@@ -131,6 +138,31 @@ class PostsAPITests(OpenbookAPITestCase):
 
         self.assertTrue(user.posts.get(text=post_text).language.code is not None)
 
+    @override_settings(LANGUAGE_DETECTION_IN_BACKGROUND=True)
+    def test_create_text_post_detects_language_in_background(self):
+        """
+        should create a text post without waiting on its language and detect it in the background
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+
+        post_text = fake.text(max_nb_chars=POST_MAX_LENGTH)
+
+        url = self._get_url()
+
+        response = self.client.put(url, {'text': post_text}, **headers, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        post = user.posts.get(text=post_text)
+        self.assertIsNone(post.language)
+
+        detect_post_language(post_id=post.pk)
+
+        post.refresh_from_db()
+        self.assertIsNotNone(post.language)
+
     def test_create_text_post_with_hashtag_creates_hashtag_if_not_exist(self):
         """
         when ccreating a post with a hashtag, should create it if not exists
@@ -445,6 +477,45 @@ class PostsAPITests(OpenbookAPITestCase):
                                                                     notification__notification_type=Notification.POST_USER_MENTION).count(),
                          1)
 
+    def test_create_text_post_creates_mention_notifications_for_all_mentioned_users(self):
+        """
+        should create a mention and a mention notification for each of the users mentioned in a post
+        """
+        user = make_user()
+        mentioned_users = [make_user() for i in range(0, 3)]
+
+        post = user.create_public_post(
+            text=' '.join(['@%s' % mentioned_user.username for mentioned_user in mentioned_users]))
+
+        for mentioned_user in mentioned_users:
+            post_user_mention = PostUserMention.objects.get(user_id=mentioned_user.pk, post_id=post.pk)
+            self.assertEqual(PostUserMentionNotification.objects.filter(
+                post_user_mention_id=post_user_mention.pk,
+                notification__owner_id=mentioned_user.pk,
+                notification__notification_type=Notification.POST_USER_MENTION).count(), 1)
+
+    def test_saving_post_without_changing_text_does_not_process_it_again(self):
+        """
+        should only process the mentions and hashtags of a post when its text changes
+        """
+        user = make_user()
+        post = user.create_public_post(text='#%s' % make_hashtag_name())
+
+        post = Post.objects.get(pk=post.pk)
+
+        with mock.patch.object(Post, '_process_post_mentions') as mock_process_post_mentions, \
+                mock.patch.object(Post, '_process_post_hashtags') as mock_process_post_hashtags:
+            post.save()
+
+            mock_process_post_mentions.assert_not_called()
+            mock_process_post_hashtags.assert_not_called()
+
+            post.text = '#%s' % make_hashtag_name()
+            post.save()
+
+            mock_process_post_mentions.assert_called_once()
+            mock_process_post_hashtags.assert_called_once()
+
     def test_create_text_post_does_not_detect_mention_if_encircled(self):
         """
         should not detect mention if the post is encircled and the mentioned person is outside the circle
@@ -601,6 +672,44 @@ class PostsAPITests(OpenbookAPITestCase):
 
         self.assertEqual(len(result_links), 1)
 
+    def test_updating_post_text_keeps_the_links_still_in_it(self):
+        """
+        should only create the new links and delete the removed ones when updating the post text
+        """
+        user = make_user()
+
+        kept_link = 'https://%s.com/' % fake.uuid4()
+        removed_link = 'https://%s.com/' % fake.uuid4()
+        added_link = 'https://%s.com/' % fake.uuid4()
+
+        post = user.create_public_post(text='%s %s' % (kept_link, removed_link))
+        kept_post_link = PostLink.objects.get(post_id=post.pk, link=normalize_url(kept_link))
+
+        user.update_post(post=post, text='%s %s' % (kept_link, added_link))
+
+        post_links = PostLink.objects.filter(post_id=post.pk)
+
+        self.assertEqual(sorted([post_link.link for post_link in post_links]),
+                         sorted([normalize_url(kept_link), normalize_url(added_link)]))
+        self.assertTrue(post_links.filter(pk=kept_post_link.pk).exists())
+
+    def test_post_links_previews_are_checked_once_per_link(self):
+        """
+        should check whether a link can be previewed once for all the posts with it
+        """
+        user = make_user()
+        link = 'https://%s.com/' % fake.uuid4()
+
+        posts = [user.create_public_post(text=link) for i in range(0, 3)]
+
+        post_links_ids = list(PostLink.objects.filter(post__in=posts).values_list('id', flat=True))
+
+        with mock.patch.object(peekalink_client, 'is_peekable', return_value=True) as mock_is_peekable:
+            refresh_post_links_previews(post_links_ids=post_links_ids)
+
+        mock_is_peekable.assert_called_once()
+        self.assertEqual(PostLink.objects.filter(pk__in=post_links_ids, has_preview=True).count(), len(posts))
+
     def test_create_post_is_added_to_world_circle(self):
         """
         the created text post should automatically added to world circle
@@ -3859,6 +3968,9 @@ class PostsAPITests(OpenbookAPITestCase):
 
         url = self._get_url()
         response = self.client.put(url, data, **headers, format='multipart')
+        response_post = json.loads(response.content)
+
+        fan_out_post_notifications(post_id=response_post['id'])
 
         user_notifications_subscription = UserNotificationsSubscription.objects.get(subscriber=subscriber, user=user)
 
@@ -3866,6 +3978,28 @@ class PostsAPITests(OpenbookAPITestCase):
         self.assertTrue(UserNewPostNotification.objects.filter(
             user_notifications_subscription=user_notifications_subscription).count() == 1)
 
+    @override_settings(POST_NOTIFICATIONS_FAN_OUT_CHUNK_SIZE=2)
+    def test_fan_out_post_notifications_notifies_every_chunk_of_subscribers_once(self):
+        """
+        should notify the subscribers of every chunk once, even if the fan out runs again
+        """
+        user = make_user()
+        subscribers = [make_user() for i in range(0, 5)]
+
+        for subscriber in subscribers:
+            subscriber.enable_new_post_notifications_for_user_with_username(user.username)
+
+        post = user.create_public_post(text=make_fake_post_text())
+
+        fan_out_post_notifications(post_id=post.pk)
+        fan_out_post_notifications(post_id=post.pk)
+
+        for subscriber in subscribers:
+            self.assertEqual(UserNewPostNotification.objects.filter(post=post,
+                                                                    notification__owner_id=subscriber.pk).count(), 1)
+
+        self.assertEqual(Notification.objects.filter(notification_type=Notification.USER_NEW_POST).count(), 5)
+
     def test_create_post_does_not_notify_subscribers_if_post_creator_is_blocked(self):
         """
         should NOT notify subscribers if creator is blocked when a post is created
@@ -3885,6 +4019,8 @@ class PostsAPITests(OpenbookAPITestCase):
         response_post = json.loads(response.content)
         post = Post.objects.get(id=response_post['id'])
 
+        fan_out_post_notifications(post_id=post.pk)
+
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(UserNewPostNotification.objects.filter(
             post=post).count() == 0)
@@ -3908,6 +4044,8 @@ class PostsAPITests(OpenbookAPITestCase):
         response_post = json.loads(response.content)
         post = Post.objects.get(id=response_post['id'])
 
+        fan_out_post_notifications(post_id=post.pk)
+
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(UserNewPostNotification.objects.filter(
             post=post).count() == 0)
@@ -3938,6 +4076,9 @@ class PostsAPITests(OpenbookAPITestCase):
 
         url = self._get_url()
         response = self.client.put(url, data, **headers, format='multipart')
+        response_post = json.loads(response.content)
+
+        fan_out_post_notifications(post_id=response_post['id'])
 
         other_subscriber_notifications_subscription = UserNotificationsSubscription.objects.get(
             subscriber=other_subscriber, user=post_creator)
@@ -3955,6 +4096,325 @@ class PostsAPITests(OpenbookAPITestCase):
         return reverse('posts')
 
 
+class TimelinePostsAPITests(OpenbookAPITestCase):
+    """
+    TimelinePostsAPITests
+    """
+
+    fixtures = [
+        'openbook_circles/fixtures/circles.json'
+    ]
+
+    def test_retrieves_posts_from_sources_when_timeline_cold(self):
+        """
+        should retrieve the timeline posts from its sources and request a rebuild when the timeline is cold
+        """
+        user = make_user()
+        followed_user = make_user()
+        user.follow_user_with_id(followed_user.pk)
+
+        post = followed_user.create_public_post(text=make_fake_post_text())
+
+        headers = make_authentication_headers_for_user(user)
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual(1, len(response_posts))
+        self.assertEqual(response_posts[0]['id'], post.pk)
+        self.assertTrue(Timeline.objects.filter(owner=user, status=Timeline.STATUS_BUILDING).exists())
+
+    def test_pages_posts_from_sources_newest_first(self):
+        """
+        should page the own, community and followed users posts together newest first with max_id and count
+        """
+        user = make_user()
+        followed_user = make_user()
+        user.follow_user_with_id(followed_user.pk)
+
+        community = make_community(creator=followed_user)
+        user.join_community_with_name(community_name=community.name)
+
+        posts_ids = []
+
+        for i in range(0, 3):
+            posts_ids.append(user.create_public_post(text=make_fake_post_text()).pk)
+            posts_ids.append(followed_user.create_public_post(text=make_fake_post_text()).pk)
+            posts_ids.append(followed_user.create_community_post(community_name=community.name,
+                                                                 text=make_fake_post_text()).pk)
+
+        posts_ids.sort(reverse=True)
+
+        headers = make_authentication_headers_for_user(user)
+        url = self._get_url()
+
+        response = self.client.get(url, {'count': 4}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page_posts_ids = [response_post['id'] for response_post in json.loads(response.content)]
+
+        response = self.client.get(url, {'count': 4, 'max_id': first_page_posts_ids[-1]}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        second_page_posts_ids = [response_post['id'] for response_post in json.loads(response.content)]
+
+        self.assertEqual(first_page_posts_ids, posts_ids[:4])
+        self.assertEqual(second_page_posts_ids, posts_ids[4:8])
+
+    def test_retrieves_fanned_out_post_from_ready_timeline(self):
+        """
+        should retrieve a followed user post fanned out to a ready timeline
+        """
+        user = make_user()
+        followed_user = make_user()
+        user.follow_user_with_id(followed_user.pk)
+
+        own_post = user.create_public_post(text=make_fake_post_text())
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+
+        post = followed_user.create_public_post(text=make_fake_post_text())
+        fan_out_post_to_timelines(post_id=post.pk)
+
+        headers = make_authentication_headers_for_user(user)
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts_ids = [response_post['id'] for response_post in json.loads(response.content)]
+
+        self.assertEqual([post.pk, own_post.pk], response_posts_ids)
+        self.assertTrue(Timeline.objects.filter(owner=user, status=Timeline.STATUS_READY).exists())
+
+    def test_retrieves_posts_from_ready_timeline_with_as_many_queries_for_any_number_of_posts(self):
+        """
+        should retrieve a page of a ready timeline running the same number of queries no matter how many posts it has
+        """
+        user = make_user()
+        headers = make_authentication_headers_for_user(user)
+
+        followed_user = make_user()
+        user.follow_user_with_id(followed_user.pk)
+
+        community = make_community(creator=followed_user)
+        user.join_community_with_name(community_name=community.name)
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+
+        url = self._get_url()
+
+        queries_counts = []
+
+        for posts_count in [2, 6]:
+            while Post.objects.filter(creator_id=followed_user.pk).count() < posts_count:
+                text = '%s #%s https://www.okuna.io' % (make_fake_post_text()[:100], make_hashtag_name())
+                post = followed_user.create_public_post(text=text)
+                fan_out_post_to_timelines(post_id=post.pk)
+                community_post = followed_user.create_community_post(community_name=community.name, text=text)
+                fan_out_post_to_timelines(post_id=community_post.pk)
+
+            # The first request warms up the caches, e.g. the one of the request user relationships
+            self.client.get(url, **headers)
+
+            with CaptureQueriesContext(connection) as queries_context:
+                response = self.client.get(url, **headers)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response_posts = json.loads(response.content)
+            self.assertEqual(len(response_posts), posts_count)
+
+            for response_post in response_posts:
+                self.assertEqual(len(response_post['hashtags']), 1)
+                self.assertEqual(len(response_post['links']), 1)
+
+                if response_post['community']:
+                    self.assertEqual(len(response_post['community']['memberships']), 1)
+
+            queries_counts.append(len(queries_context.captured_queries))
+
+        self.assertEqual(queries_counts[0], queries_counts[1])
+
+    def test_marks_a_cold_timeline_as_building_once(self):
+        """
+        should mark a cold timeline as building once, even if several requests found it cold
+        """
+        user = make_user()
+
+        timeline = Timeline.get_or_create_timeline_for_user_with_id(user_id=user.pk)
+        parallel_request_timeline = Timeline.objects.get(pk=timeline.pk)
+
+        self.assertTrue(timeline.mark_as_building())
+        self.assertFalse(parallel_request_timeline.mark_as_building())
+
+        self.assertTrue(parallel_request_timeline.is_cold())
+
+    def test_enqueues_a_single_rebuild_of_a_cold_timeline(self):
+        """
+        should enqueue the rebuild of a cold timeline once for several requests
+        """
+        user = make_user()
+
+        headers = make_authentication_headers_for_user(user)
+        url = self._get_url()
+
+        with mock.patch('openbook_auth.models.rebuild_timeline_for_user_with_id.delay') as mock_delay:
+            for i in range(0, 2):
+                response = self.client.get(url, **headers)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(mock_delay.call_count, 1)
+
+    def test_does_not_mark_a_ready_timeline_as_building(self):
+        """
+        should not mark a timeline rebuilt in the meantime as building from a previously loaded cold timeline
+        """
+        user = make_user()
+
+        timeline = Timeline.get_or_create_timeline_for_user_with_id(user_id=user.pk)
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+
+        self.assertFalse(timeline.mark_as_building())
+        self.assertTrue(Timeline.objects.filter(owner=user, status=Timeline.STATUS_READY).exists())
+
+    def test_rebuilds_timeline_with_more_posts_than_a_database_batch(self):
+        """
+        should rebuild a timeline with more posts than the database can insert in a single batch
+        """
+        user = make_user()
+
+        posts_count = 600
+
+        Post.objects.bulk_create([Post(creator=user, text=make_fake_post_text(), created=timezone.now(),
+                                       status=Post.STATUS_PUBLISHED) for i in range(0, posts_count)])
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+
+        self.assertEqual(TimelinePost.objects.filter(owner=user).count(), posts_count)
+        self.assertTrue(Timeline.objects.filter(owner=user, status=Timeline.STATUS_READY).exists())
+
+    def test_does_not_fan_out_encircled_post_to_followers_outside_circle(self):
+        """
+        should not fan out an encircled post to followers that are not part of the circle
+        """
+        user = make_user()
+        post_creator = make_user()
+        user.follow_user_with_id(post_creator.pk)
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+
+        circle = make_circle(creator=post_creator)
+        post = post_creator.create_encircled_post(text=make_fake_post_text(), circles_ids=[circle.pk])
+        fan_out_post_to_timelines(post_id=post.pk)
+
+        self.assertFalse(TimelinePost.objects.filter(owner=user, post=post).exists())
+
+    def test_unfollow_removes_posts_from_timeline(self):
+        """
+        should remove the posts of an unfollowed user from the timeline
+        """
+        user = make_user()
+        followed_user = make_user()
+        user.follow_user_with_id(followed_user.pk)
+
+        post = followed_user.create_public_post(text=make_fake_post_text())
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+
+        self.assertTrue(TimelinePost.objects.filter(owner=user, post=post).exists())
+
+        user.unfollow_user_with_id(followed_user.pk)
+
+        self.assertFalse(TimelinePost.objects.filter(owner=user, post=post).exists())
+
+        headers = make_authentication_headers_for_user(user)
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(0, len(json.loads(response.content)))
+
+    def test_leave_community_removes_posts_from_timeline(self):
+        """
+        should remove the posts of a left community from the timeline
+        """
+        user = make_user()
+        community_creator = make_user()
+        community = make_community(creator=community_creator)
+        user.join_community_with_name(community_name=community.name)
+
+        post = community_creator.create_community_post(community_name=community.name, text=make_fake_post_text())
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+
+        self.assertTrue(TimelinePost.objects.filter(owner=user, post=post).exists())
+
+        user.leave_community_with_name(community_name=community.name)
+
+        self.assertFalse(TimelinePost.objects.filter(owner=user, post=post).exists())
+
+    def test_block_removes_posts_from_both_timelines(self):
+        """
+        should remove the posts of the blocked user and of the blocker from each other timelines
+        """
+        user = make_user()
+        user_to_block = make_user()
+        user.follow_user_with_id(user_to_block.pk)
+        user_to_block.follow_user_with_id(user.pk)
+
+        post = user.create_public_post(text=make_fake_post_text())
+        blocked_user_post = user_to_block.create_public_post(text=make_fake_post_text())
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+        rebuild_timeline_for_user_with_id(user_id=user_to_block.pk)
+
+        user.block_user_with_id(user_id=user_to_block.pk)
+
+        self.assertFalse(TimelinePost.objects.filter(owner=user, post=blocked_user_post).exists())
+        self.assertFalse(TimelinePost.objects.filter(owner=user_to_block, post=post).exists())
+
+    def test_cant_retrieve_reported_post_from_ready_timeline(self):
+        """
+        should not retrieve a reported post from a ready timeline
+        """
+        user = make_user()
+        followed_user = make_user()
+        user.follow_user_with_id(followed_user.pk)
+
+        post = followed_user.create_public_post(text=make_fake_post_text())
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+
+        moderation_category = make_moderation_category()
+        user.report_post(post=post, category_id=moderation_category.pk)
+
+        headers = make_authentication_headers_for_user(user)
+        url = self._get_url()
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(0, len(json.loads(response.content)))
+
+    def test_follow_invalidates_timeline(self):
+        """
+        should invalidate the timeline when following a user
+        """
+        user = make_user()
+        user_to_follow = make_user()
+
+        rebuild_timeline_for_user_with_id(user_id=user.pk)
+
+        user.follow_user_with_id(user_to_follow.pk)
+
+        self.assertTrue(Timeline.objects.filter(owner=user, status=Timeline.STATUS_COLD).exists())
+
+    def _get_url(self):
+        return reverse('posts')
+
+
 class TrendingPostsAPITests(OpenbookAPITestCase):
     """
     TrendingPostsAPITests
@@ -4132,6 +4592,43 @@ class TrendingPostsAPITests(OpenbookAPITestCase):
 
         self.assertEqual(0, len(response_posts))
 
+    def test_cant_retrieve_post_of_user_blocked_after_retrieving_posts(self):
+        """
+        should not be able to retrieve posts of a user blocked after having retrieved the trending posts
+        """
+        user = make_user()
+        community = make_community(creator=user)
+        user_to_retrieve_posts_from = make_user()
+        user_to_retrieve_posts_from.join_community_with_name(community_name=community.name)
+
+        post = user_to_retrieve_posts_from.create_community_post(text=make_fake_post_text(),
+                                                                 community_name=community.name)
+
+        # react once, min required while testing
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        user.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+
+        curate_trending_posts()
+
+        url = self._get_url()
+        headers = make_authentication_headers_for_user(user)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(1, len(json.loads(response.content)))
+
+        user.block_user_with_id(user_id=user_to_retrieve_posts_from.pk)
+
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_posts = json.loads(response.content)
+
+        self.assertEqual(0, len(response_posts))
+
     def test_cant_retrieve_post_of_blocking_user(self):
         """
         should not be able to retrieve posts of a blocking user
@@ -4434,6 +4931,135 @@ class TrendingPostsAPITests(OpenbookAPITestCase):
         response_post = response_posts[0]
         self.assertEqual(response_post['post']['id'], post_two.pk)
 
+    def test_displays_posts_with_highest_trending_score_first(self):
+        """
+        should display the posts with the highest trending score first
+        """
+        user = make_user()
+        reactor = make_user()
+        community = make_community(creator=user)
+        reactor.join_community_with_name(community_name=community.name)
+
+        post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+        post_two = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        user.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+        reactor.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+        user.react_to_post_with_id(post_id=post_two.pk, emoji_id=emoji.pk)
+
+        curate_trending_posts()
+
+        headers = make_authentication_headers_for_user(user)
+
+        url = self._get_url()
+
+        response = self.client.get(url, **headers, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_posts = json.loads(response.content)
+        self.assertEqual(2, len(response_posts))
+        self.assertEqual(response_posts[0]['post']['id'], post.pk)
+        self.assertEqual(response_posts[1]['post']['id'], post_two.pk)
+
+    def test_deleting_reaction_updates_trending_score(self):
+        """
+        should update the trending score of a post when a reaction is deleted
+        """
+        user = make_user()
+        community = make_community(creator=user)
+
+        post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        post_reaction = user.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+
+        trending_post_score = TrendingPostScore.objects.get(post_id=post.pk)
+        self.assertEqual(1, trending_post_score.reactions_count)
+        self.assertIsNotNone(trending_post_score.score)
+
+        user.delete_reaction_with_id_for_post_with_id(post_reaction_id=post_reaction.pk, post_id=post.pk)
+
+        trending_post_score.refresh_from_db()
+        self.assertEqual(0, trending_post_score.reactions_count)
+        self.assertIsNone(trending_post_score.score)
+
+        curate_trending_posts()
+
+        self.assertFalse(TrendingPost.objects.filter(post_id=post.pk).exists())
+
+    def test_deleting_one_of_many_reactions_subtracts_it_from_trending_score(self):
+        """
+        should subtract a deleted reaction from the trending score of a post with other reactions
+        """
+        user = make_user()
+        community = make_community(creator=user)
+
+        post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        reactors = [make_user() for i in range(0, 3)]
+        post_reactions = []
+
+        for reactor in reactors:
+            reactor.join_community_with_name(community_name=community.name)
+            post_reactions.append(reactor.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk))
+
+        reactors[0].delete_reaction_with_id_for_post_with_id(post_reaction_id=post_reactions[0].pk, post_id=post.pk)
+
+        trending_post_score = TrendingPostScore.objects.get(post_id=post.pk)
+        self.assertEqual(2, trending_post_score.reactions_count)
+
+        TrendingPostScore.rebuild_score_for_post_with_id(post_id=post.pk)
+
+        rebuilt_trending_post_score = TrendingPostScore.objects.get(post_id=post.pk)
+        self.assertEqual(2, rebuilt_trending_post_score.reactions_count)
+        self.assertAlmostEqual(rebuilt_trending_post_score.score, trending_post_score.score, places=6)
+
+    def test_deleting_reaction_of_post_outside_communities_does_not_score_it(self):
+        """
+        should not create a trending score when deleting a reaction to a post outside of communities
+        """
+        user = make_user()
+
+        post = user.create_public_post(text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        post_reaction = user.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+        user.delete_reaction_with_id_for_post_with_id(post_reaction_id=post_reaction.pk, post_id=post.pk)
+
+        self.assertFalse(TrendingPostScore.objects.filter(post_id=post.pk).exists())
+
+    def test_curating_unchanged_trending_posts_keeps_them(self):
+        """
+        should not recreate the trending posts if the most trending posts did not change
+        """
+        user = make_user()
+        community = make_community(creator=user)
+
+        post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+
+        emoji_group = make_reactions_emoji_group()
+        emoji = make_emoji(group=emoji_group)
+
+        user.react_to_post_with_id(post_id=post.pk, emoji_id=emoji.pk)
+
+        curate_trending_posts()
+
+        trending_post = TrendingPost.objects.get(post_id=post.pk)
+
+        curate_trending_posts()
+
+        self.assertTrue(TrendingPost.objects.filter(pk=trending_post.pk, post_id=post.pk).exists())
+
     def _get_url(self):
         return reverse('trending-posts-new')
 
@@ -5058,6 +5684,51 @@ class TopPostsAPITests(OpenbookAPITestCase):
         response_posts = json.loads(response.content)
         self.assertEqual(5, len(response_posts))
 
+    def test_curate_top_posts_only_checks_posts_with_new_activity(self):
+        """
+        should only check posts with reactions or comments since the last curation
+        """
+        user = make_user()
+        community = make_community(creator=user)
+
+        post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+        user.comment_post(post, text=make_fake_post_comment_text())
+
+        curate_top_posts()
+
+        self.assertTrue(PostsCurationWatermark.get_watermark_for_curation_type(
+            curation_type=PostsCurationWatermark.CURATION_TYPE_TOP_POSTS) is not None)
+
+        TopPost.objects.filter(post_id=post.pk).delete()
+
+        curate_top_posts()
+
+        self.assertFalse(TopPost.objects.filter(post_id=post.pk).exists())
+
+        user.comment_post(post, text=make_fake_post_comment_text())
+
+        curate_top_posts()
+
+        self.assertTrue(TopPost.objects.filter(post_id=post.pk).exists())
+
+    def test_curate_top_posts_full_scan_checks_all_posts(self):
+        """
+        should check all posts regardless of the last curation if full_scan is true
+        """
+        user = make_user()
+        community = make_community(creator=user)
+
+        post = user.create_community_post(community_name=community.name, text=make_fake_post_text())
+        user.comment_post(post, text=make_fake_post_comment_text())
+
+        curate_top_posts()
+
+        TopPost.objects.filter(post_id=post.pk).delete()
+
+        curate_top_posts(full_scan=True)
+
+        self.assertTrue(TopPost.objects.filter(post_id=post.pk).exists())
+
     def _get_url(self):
         return reverse('top-posts')
 
@@ -14,11 +14,18 @@ class RepliesField(Field):
     def to_representation(self, post_comment):
         request = self.context.get('request')
         sort_query = self.context.get('sort_query', '-created')
+        post_comments_replies = self.context.get('post_comments_replies')
         request_user = request.user
 
-        replies = request_user.get_comment_replies_for_comment_with_id_with_post_with_uuid(
-            post_uuid=post_comment.post.uuid,
-            post_comment_id=post_comment.pk
-        ).order_by(sort_query)[:self.DEFAULT_REPLY_COUNT]
+        if post_comments_replies is not None:
+            replies = post_comments_replies.get(post_comment.pk, [])
+        else:
+            replies = request_user.get_comment_replies_for_comment_with_id_with_post_with_uuid(
+                post_uuid=post_comment.post.uuid,
+                post_comment_id=post_comment.pk
+            ).order_by(sort_query)[:self.DEFAULT_REPLY_COUNT]
 
-        return self.post_comment_reply_serializer(replies, many=True, context={"request": request}).data
+        return self.post_comment_reply_serializer(replies, many=True, context={
+            "request": request,
+            "post_comments_reactions_emoji_counts": self.context.get('post_comments_reactions_emoji_counts')
+        }).data
@@ -182,6 +182,11 @@ class GetPostCommentsSerializer(serializers.Serializer):
         required=False,
         max_value=20
     )
+    count_replies = serializers.IntegerField(
+        required=False,
+        min_value=0,
+        max_value=20
+    )
     sort = serializers.ChoiceField(required=False, choices=[
         'ASC',
         'DESC'
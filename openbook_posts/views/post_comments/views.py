@@ -1,18 +1,19 @@
 from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from itertools import chain
-import operator
 
 # TODO Use post uuid also internally, not only as API resource identifier
 # In order to prevent enumerable posts API in alpha, this is done as a hotfix
 from openbook_common.utils.model_loaders import get_post_model
+from openbook_common.utils.pagination import paginate_window_by_id
 from openbook_moderation.permissions import IsNotSuspended
 from openbook_posts.views.post_comments.serializers import EnableDisableCommentsPostSerializer, \
     EnableCommentsPostSerializer, DisableCommentsPostSerializer, GetPostCommentsSerializer, PostCommentSerializer, \
     CommentPostSerializer
+from openbook_posts.views.post_comments.serializer_fields import RepliesField
 
 
 def get_post_id_for_post_uuid(post_uuid):
@@ -39,40 +40,30 @@ class PostComments(APIView):
         min_id = data.get('min_id')
         count_max = data.get('count_max', 10)
         count_min = data.get('count_min', 10)
+        count_replies = data.get('count_replies', RepliesField.DEFAULT_REPLY_COUNT)
         sort = data.get('sort', 'DESC')
         post_uuid = data.get('post_uuid')
 
         user = request.user
-        post_id = get_post_id_for_post_uuid(post_uuid)
+        Post = get_post_model()
+        post = Post.objects.select_related('community').get(uuid=post_uuid)
 
         sort_query = self.SORT_CHOICE_TO_QUERY[sort]
 
+        post_comments = user.get_comments_for_post(post=post).prefetch_related('commenter__profile__badges',
+                                                                                'language', 'hashtags')
+
         if not max_id and not min_id:
-            all_comments = user.get_comments_for_post_with_id(post_id).order_by(sort_query)[:count_max].all()
+            all_comments = list(post_comments.order_by(sort_query)[:count_max])
         else:
-            post_comments_max = []
-            post_comments_min = []
-            if max_id:
-                post_comments_max = user.get_comments_for_post_with_id(post_id,
-                                                                       max_id=max_id).order_by('-pk')[:count_max]
-                post_comments_max = sorted(post_comments_max.all(),
-                                           key=operator.attrgetter('created'),
-                                           reverse=sort_query == self.SORT_CHOICE_TO_QUERY['DESC'])
-
-            if min_id:
-                post_comments_min = user.get_comments_for_post_with_id(post_id,
-                                                                       min_id=min_id).order_by('pk')[:count_min]
-                post_comments_min = sorted(post_comments_min.all(),
-                                           key=operator.attrgetter('created'),
-                                           reverse=sort_query == self.SORT_CHOICE_TO_QUERY['DESC'])
-
-            if sort_query == self.SORT_CHOICE_TO_QUERY['ASC']:
-                all_comments = list(chain(post_comments_max, post_comments_min))
-            elif sort_query == self.SORT_CHOICE_TO_QUERY['DESC']:
-                all_comments = list(chain(post_comments_min, post_comments_max))
-
-        post_comments_serializer = PostCommentSerializer(all_comments, many=True, context={"request": request,
-                                                                                           "sort_query": sort_query})
+            all_comments = paginate_window_by_id(post_comments, max_id=max_id, min_id=min_id,
+                                                 count_max=count_max, count_min=count_min,
+                                                 reverse=sort_query == self.SORT_CHOICE_TO_QUERY['DESC'])
+
+        post_comments_serializer = PostCommentSerializer(all_comments, many=True,
+                                                         context=self._make_comments_thread_context(
+                                                             request=request, post=post, post_comments=all_comments,
+                                                             count_replies=count_replies, sort_query=sort_query))
 
         return Response(post_comments_serializer.data, status=status.HTTP_200_OK)
 
@@ -95,6 +86,41 @@ class PostComments(APIView):
         post_comment_serializer = PostCommentSerializer(post_comment, context={"request": request})
         return Response(post_comment_serializer.data, status=status.HTTP_201_CREATED)
 
+    def _make_comments_thread_context(self, request, post, post_comments, count_replies, sort_query):
+        """
+        Loads the replies, the replies counts and the reactions emoji counts of the whole page at once,
+        instead of the queries the serializer fields would make for every comment
+        """
+        user = request.user
+        post_comments_ids = [post_comment.pk for post_comment in post_comments]
+
+        post_comments_replies = user.get_first_replies_for_post_comments(post=post,
+                                                                         post_comments_ids=post_comments_ids,
+                                                                         count=count_replies, sort_query=sort_query)
+
+        post_comments_by_id = {post_comment.pk: post_comment for post_comment in post_comments}
+        replies = [reply for post_comment_replies in post_comments_replies.values() for reply in
+                   post_comment_replies]
+
+        prefetch_related_objects(replies, 'commenter__profile__badges', 'language', 'hashtags')
+
+        for post_comment in post_comments:
+            post_comment.post = post
+
+        for reply in replies:
+            reply.post = post
+            reply.parent_comment = post_comments_by_id[reply.parent_comment_id]
+
+        return {
+            "request": request,
+            "sort_query": sort_query,
+            "post_comments_replies": post_comments_replies,
+            "post_comments_replies_counts": user.get_replies_counts_for_post_comments(
+                post=post, post_comments_ids=post_comments_ids),
+            "post_comments_reactions_emoji_counts": user.get_emoji_counts_for_post_comments(
+                post=post, post_comments_ids=post_comments_ids + [reply.pk for reply in replies]),
+        }
+
     def _get_request_data(self, request, post_uuid):
         request_data = request.data.copy()
         query_params = request.query_params.dict()
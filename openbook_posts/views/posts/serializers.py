@@ -7,7 +7,7 @@ from openbook_circles.validators import circle_id_exists
 from openbook_common.models import Emoji, Badge
 from openbook_common.serializers import CommonHashtagSerializer, CommonPublicUserSerializer, CommonPostLinkSerializer
 from openbook_common.serializers_fields.post import ReactionField, CommentsCountField, PostReactionsEmojiCountField, \
-    CirclesField, PostCreatorField, PostIsMutedField, IsEncircledField
+    CirclesField, PostCreatorField, PostIsMutedField, IsEncircledField, PostListSerializer
 from openbook_common.serializers_fields.request import RestrictedImageFileSizeField, RestrictedFileSizeField
 from openbook_common.models import Language
 from openbook_communities.models import Community, CommunityMembership
@@ -212,6 +212,7 @@ class AuthenticatedUserPostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
+        list_serializer_class = PostListSerializer
         fields = (
             'id',
             'uuid',
@@ -243,6 +244,7 @@ class AuthenticatedUserTopPostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = TopPost
+        list_serializer_class = PostListSerializer
         fields = (
             'id',
             'post',
@@ -255,6 +257,7 @@ class AuthenticatedUserTrendingPostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = TrendingPost
+        list_serializer_class = PostListSerializer
         fields = (
             'id',
             'post',
@@ -273,6 +276,7 @@ class UnauthenticatedUserPostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
+        list_serializer_class = PostListSerializer
         fields = (
             'id',
             'uuid',
@@ -6,12 +6,13 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.utils.translation import ugettext_lazy as _
 
-from openbook_common.peekalink_client import peekalink_client
+from openbook_common.link_previews import is_link_previewable
 from openbook_common.responses import ApiMessageResponse
 from openbook_common.serializers import CommonSearchCommunitiesSerializer, CommonSearchCommunitiesCommunitySerializer, \
     CommonCommunityNameSerializer
 from openbook_moderation.permissions import IsNotSuspended
 from openbook_common.utils.helpers import normalize_list_value_in_request_data, normalise_request_data
+from openbook_common.utils.pagination import paginate_queryset_by_id
 from openbook_posts.permissions import IsGetOrIsAuthenticated
 from openbook_posts.views.posts.serializers import AuthenticatedUserPostSerializer, \
     GetPostsSerializer, UnauthenticatedUserPostSerializer, CreatePostSerializer, GetTopPostsSerializer, \
@@ -77,6 +78,8 @@ class Posts(APIView):
                 posts = user.get_posts(max_id=max_id)
             else:
                 posts = user.get_posts_for_user_with_username(username, max_id=max_id, min_id=min_id)
+
+            posts = paginate_queryset_by_id(posts, count=count)
         else:
             posts = user.get_timeline_posts(
                 circles_ids=circles_ids,
@@ -86,8 +89,6 @@ class Posts(APIView):
                 count=count
             )
 
-        posts = posts.order_by('-id')[:count]
-
         post_serializer_data = AuthenticatedUserPostSerializer(posts, many=True, context={"request": request}).data
 
         return Response(post_serializer_data, status=status.HTTP_200_OK)
@@ -141,7 +142,8 @@ class TrendingPostsNew(APIView):
         count = data.get('count', 30)
         user = request.user
 
-        trending_posts = user.get_trending_posts(max_id=max_id, min_id=min_id).order_by('-id')[:count]
+        trending_posts = paginate_queryset_by_id(user.get_trending_posts(max_id=max_id, min_id=min_id),
+                                                 count=count)
         posts_serializer = AuthenticatedUserTrendingPostSerializer(trending_posts, many=True,
                                                                    context={"request": request})
         return Response(posts_serializer.data, status=status.HTTP_200_OK)
@@ -165,7 +167,8 @@ class TopPosts(APIView):
         user = request.user
 
         top_posts = user.get_top_posts(max_id=max_id, min_id=min_id,
-                                       exclude_joined_communities=exclude_joined_communities).order_by('-id')[:count]
+                                       exclude_joined_communities=exclude_joined_communities)
+        top_posts = paginate_queryset_by_id(top_posts, count=count)
         posts_serializer = AuthenticatedUserTopPostSerializer(top_posts, many=True, context={"request": request})
         return Response(posts_serializer.data, status=status.HTTP_200_OK)
 
@@ -362,11 +365,7 @@ class LinkIsPreviewable(APIView):
 
         link = data.get('link')
 
-        try:
-            is_previewable = peekalink_client.is_peekable(link)
-        except Exception as e:
-            # We dont care whether it succeeded or not
-            is_previewable = False
+        is_previewable = is_link_previewable(link)
 
         return Response({
             'is_previewable': is_previewable
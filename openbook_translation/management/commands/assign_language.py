@@ -1,49 +1,113 @@
+import os
+import time
+from collections import defaultdict
+from multiprocessing import Pool
+
+from django.core.cache import cache
 from django.core.management.base import BaseCommand
-from langdetect.lang_detect_exception import LangDetectException
+from django.db import connections
+import logging
 
-from openbook_common.helpers import get_language_for_text
+from openbook_common.helpers import get_detected_language_code, get_language_with_code
 from openbook_common.utils.model_loaders import get_post_model, get_post_comment_model
 
+logger = logging.getLogger(__name__)
+
 
 class Command(BaseCommand):
     help = 'Assigns Language to Post and PostComment models, usage python manage.py assign_language --type posts|comments'
 
     def add_arguments(self, parser):
         parser.add_argument('--type', type=str, help='Type of model to assign lang to, valid values: posts, comments')
+        parser.add_argument('--missing-only', action='store_true',
+                            help='Only assign the language of the items without language')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='How many items to process at a time')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='How many processes detect the languages, defaults to the number of CPUs')
+        parser.add_argument('--restart', action='store_true',
+                            help='Start from the first item instead of resuming after the last processed one')
 
     def handle(self, *args, **options):
         if options['type'] == 'posts':
-            self.assign_language_posts()
-
-        if options['type'] == 'comments':
-            self.assign_language_comments()
-
-    def assign_language_posts(self):
-        Post = get_post_model()
-        posts = Post.objects.filter(text__isnull=False)
-        for post in posts:
-            try:
-                language = get_language_for_text(post.text)
-            except LangDetectException as e:
-                print('Caught exception while detecting language, skipping')
-
-            if language:
-                post.language = language
-                post.save()
-            else:
-                print('Could not detect language for id', post.id)
-
-    def assign_language_comments(self):
-        PostComment = get_post_comment_model()
-        post_comments = PostComment.objects.filter(text__isnull=False)
-        for post_comment in post_comments:
-            try:
-                language = get_language_for_text(post_comment.text)
-            except LangDetectException as e:
-                print('Caught exception while detecting language, skipping')
-
-            if language:
-                post_comment.language = language
-                post_comment.save()
-            else:
-                print('Could not detect language for id', post_comment.id)
+            Post = get_post_model()
+            queryset = Post.objects.filter(text__isnull=False)
+        elif options['type'] == 'comments':
+            PostComment = get_post_comment_model()
+            queryset = PostComment.objects.filter(text__isnull=False)
+        else:
+            logger.error('Invalid type %s, valid values: posts, comments' % options['type'])
+            return
+
+        checkpoint_key = 'assign-language-checkpoint-%s' % options['type']
+
+        if options['missing_only']:
+            queryset = queryset.filter(language__isnull=True)
+            # Each filter mode has its own checkpoint, so a run never resumes after another mode's last item
+            checkpoint_key = '%s-missing-only' % checkpoint_key
+
+        assign_language(queryset=queryset, checkpoint_key=checkpoint_key,
+                        chunk_size=options['chunk_size'], processes=options['processes'],
+                        restart=options['restart'])
+
+
+def assign_language(queryset, checkpoint_key, chunk_size, processes=None, restart=False):
+    """
+    Detects the language of the text of every item of the queryset and assigns it with an UPDATE per language,
+    so the save() side effects of the items, e.g. their mentions, hashtags and links, aren't processed again.
+    The items are streamed in id chunks whose languages are detected across a pool of processes, and the last
+    processed id is kept in the cache as a checkpoint to resume from.
+    """
+    last_id = 0 if restart else cache.get(checkpoint_key, 0)
+
+    if last_id:
+        logger.info('Resuming after the item with id %d' % last_id)
+
+    processed_count = 0
+    assigned_count = 0
+    started_at = time.monotonic()
+
+    processes = processes or os.cpu_count()
+
+    # The forked processes must not share the database connections
+    connections.close_all()
+
+    with Pool(processes=processes) as pool:
+        while True:
+            items = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', 'text')[:chunk_size])
+
+            if not items:
+                break
+
+            detected_languages_codes = pool.map(get_detected_language_code, [text for item_id, text in items],
+                                                chunksize=max(1, len(items) // (4 * processes)))
+
+            items_ids_by_language_code = defaultdict(list)
+
+            for (item_id, text), language_code in zip(items, detected_languages_codes):
+                if language_code is not None:
+                    items_ids_by_language_code[language_code].append(item_id)
+
+            for language_code, items_ids in items_ids_by_language_code.items():
+                language = get_language_with_code(language_code)
+
+                if language is None:
+                    continue
+
+                queryset.model.objects.filter(pk__in=items_ids).update(language=language)
+                assigned_count += len(items_ids)
+
+            last_id = items[-1][0]
+            cache.set(checkpoint_key, last_id, timeout=None)
+
+            processed_count += len(items)
+            elapsed_seconds = time.monotonic() - started_at
+
+            logger.info('Processed %d items, assigned %d languages, %.1f items per second, last id %d' % (
+                processed_count, assigned_count, processed_count / elapsed_seconds, last_id))
+
+            if len(items) < chunk_size:
+                break
+
+    cache.delete(checkpoint_key)
+
+    logger.info('Assigned the language of %d out of %d items' % (assigned_count, processed_count))
@@ -39,3 +39,11 @@ class BaseTranslationStrategy(ABC):
     def translate_text(self, *args, **kwargs):
         pass
 
+    def translate_texts(self, texts, source_language_code, target_language_code):
+        """
+        Returns the translation of each of the texts.
+        Strategies whose service translates several texts in a single request should override it.
+        """
+        return [self.translate_text(text=text, source_language_code=source_language_code,
+                                    target_language_code=target_language_code) for text in texts]
+
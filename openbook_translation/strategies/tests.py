@@ -5,6 +5,11 @@ from openbook_translation.strategies.base import BaseTranslationStrategy, Unsupp
 class MockAmazonTranslate(BaseTranslationStrategy):
     # Both methods are hardcoded to respond to the tests
 
+    def __init__(self, params):
+        super().__init__(params)
+        # The size of every batch of texts translated, e.g. to check the cached ones aren't translated again
+        self.translated_texts_batches_sizes = []
+
     def get_detected_language_code(self, text):
         if text == 'Ik ben en man 😀. Jij bent en vrouw.':
             return 'nl'
@@ -28,4 +33,11 @@ class MockAmazonTranslate(BaseTranslationStrategy):
         if target_language_code == 'ar' and source_language_code == 'no':
             raise UnsupportedLanguagePairException
 
+        return {'translated_text': '[%s] %s' % (target_language_code, text)}
+
+    def translate_texts(self, texts, source_language_code, target_language_code):
+        self.translated_texts_batches_sizes.append(len(texts))
+        return super().translate_texts(texts=texts, source_language_code=source_language_code,
+                                       target_language_code=target_language_code)
+
 
@@ -0,0 +1,57 @@
+from collections import Counter
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+
+from openbook_translation import translation_strategy
+
+# The translations found in the cache or not, e.g. to see how many translations the cache saves
+translations_counters = Counter()
+
+
+def translate_text(text, source_language_code, target_language_code):
+    """
+    Returns the translation of the text, translated once for everyone reading the same text in the same language
+    """
+    return translate_texts(texts=[text], source_language_code=source_language_code,
+                           target_language_code=target_language_code)[0]
+
+
+def translate_texts(texts, source_language_code, target_language_code):
+    """
+    Returns the translation of each of the texts, the ones not in the cache are translated in a single batch.
+    The translations are kept under the hash of their text, so editing a post or a comment translates it again.
+    """
+    cache_keys = [_make_translation_cache_key(text=text, source_language_code=source_language_code,
+                                              target_language_code=target_language_code) for text in texts]
+
+    translations = cache.get_many(list(set(cache_keys)))
+
+    untranslated_texts_by_cache_key = {}
+
+    for cache_key, text in zip(cache_keys, texts):
+        if cache_key not in translations:
+            untranslated_texts_by_cache_key[cache_key] = text
+
+    translations_counters['hits'] += len(texts) - len(untranslated_texts_by_cache_key)
+    translations_counters['misses'] += len(untranslated_texts_by_cache_key)
+
+    if untranslated_texts_by_cache_key:
+        new_translations = translation_strategy.translate_texts(
+            texts=list(untranslated_texts_by_cache_key.values()),
+            source_language_code=source_language_code,
+            target_language_code=target_language_code
+        )
+
+        new_translations_by_cache_key = dict(zip(untranslated_texts_by_cache_key.keys(), new_translations))
+
+        cache.set_many(new_translations_by_cache_key, timeout=settings.TRANSLATION_CACHE_TIMEOUT_IN_SECONDS)
+        translations.update(new_translations_by_cache_key)
+
+    return [translations[cache_key] for cache_key in cache_keys]
+
+
+def _make_translation_cache_key(text, source_language_code, target_language_code):
+    return 'translation-%s-%s-%s' % (source_language_code, target_language_code,
+                                     sha256(text.encode('utf-8')).hexdigest())